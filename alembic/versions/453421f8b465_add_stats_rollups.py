@@ -0,0 +1,145 @@
+"""Add the member and server stats rollup tables.
+
+Revision ID: 453421f8b465
+Revises: c312a100be82
+Create Date: 2026-10-17 01:14:22.331289
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "453421f8b465"
+down_revision: Union[str, Sequence[str], None] = "c312a100be82"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches ledger_bot.storage.stats_storage.member_rollups_query
+BACKFILL_MEMBER_STATS = """
+INSERT INTO member_stats (
+    member_id, role, unapproved, approved, paid, delivered, completed, cancelled,
+    total_count, total_price, first_transaction_id, most_expensive_transaction_id
+)
+WITH priced AS (
+    SELECT
+        transactions.*,
+        CASE
+            WHEN transactions.currency_code = 'GBP' THEN transactions.price
+            WHEN coalesce(currencies.rate, 0) != 0 THEN transactions.price * currencies.rate
+            ELSE transactions.price
+        END AS gbp_price
+    FROM transactions
+    LEFT OUTER JOIN currencies ON currencies.code = transactions.currency_code
+),
+role_transactions AS (
+    SELECT
+        buyer_id AS member_id, 'buyer' AS role, *,
+        row_number() OVER (
+            PARTITION BY buyer_id ORDER BY price DESC, creation_date, id
+        ) AS price_rank
+    FROM priced
+    UNION ALL
+    SELECT
+        seller_id AS member_id, 'seller' AS role, *,
+        row_number() OVER (
+            PARTITION BY seller_id ORDER BY price DESC, creation_date, id
+        ) AS price_rank
+    FROM priced
+)
+SELECT
+    member_id,
+    role,
+    sum(CASE WHEN sale_approved IS 0 AND buyer_delivered IS 0 AND seller_delivered IS 0
+        AND buyer_paid IS 0 AND seller_paid IS 0 AND cancelled IS 0 THEN 1 ELSE 0 END),
+    sum(CASE WHEN sale_approved IS 1 AND (buyer_delivered IS 0 OR seller_delivered IS 0)
+        AND (buyer_paid IS 0 OR seller_paid IS 0) AND cancelled IS 0 THEN 1 ELSE 0 END),
+    sum(CASE WHEN buyer_paid IS 1 AND seller_paid IS 1 AND cancelled IS 0 THEN 1 ELSE 0 END),
+    sum(CASE WHEN buyer_delivered IS 1 AND seller_delivered IS 1 AND cancelled IS 0
+        THEN 1 ELSE 0 END),
+    sum(CASE WHEN sale_approved IS 1 AND buyer_delivered IS 1 AND seller_delivered IS 1
+        AND buyer_paid IS 1 AND seller_paid IS 1 AND cancelled IS 0 THEN 1 ELSE 0 END),
+    sum(CASE WHEN cancelled IS 1 THEN 1 ELSE 0 END),
+    count(*),
+    sum(gbp_price),
+    min(id),
+    max(CASE WHEN price_rank = 1 THEN id END)
+FROM role_transactions
+GROUP BY member_id, role
+"""
+
+BACKFILL_SERVER_STATS = """
+INSERT INTO server_stats (id, total_count, total_value, most_expensive_transaction_id)
+SELECT
+    1,
+    count(id),
+    coalesce(sum(price), 0),
+    (SELECT id FROM transactions ORDER BY price DESC, id LIMIT 1)
+FROM transactions
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "member_stats",
+        sa.Column("member_id", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("unapproved", sa.Integer(), nullable=False),
+        sa.Column("approved", sa.Integer(), nullable=False),
+        sa.Column("paid", sa.Integer(), nullable=False),
+        sa.Column("delivered", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.Column("cancelled", sa.Integer(), nullable=False),
+        sa.Column("total_count", sa.Integer(), nullable=False),
+        sa.Column("total_price", sa.Float(), nullable=False),
+        sa.Column("first_transaction_id", sa.Integer(), nullable=True),
+        sa.Column("most_expensive_transaction_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["member_id"],
+            ["members.id"],
+            name=op.f("fk_member_stats_member_id_members"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["most_expensive_transaction_id"],
+            ["transactions.id"],
+            name=op.f("fk_member_stats_most_expensive_transaction_id_transactions"),
+            ondelete="SET NULL",
+        ),
+        sa.PrimaryKeyConstraint("member_id", "role", name=op.f("pk_member_stats")),
+    )
+    op.create_index(
+        "ix_member_stats_role_total_count",
+        "member_stats",
+        ["role", "total_count"],
+        unique=False,
+    )
+    op.create_table(
+        "server_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("total_count", sa.Integer(), nullable=False),
+        sa.Column("total_value", sa.Float(), nullable=False),
+        sa.Column("most_expensive_transaction_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["most_expensive_transaction_id"],
+            ["transactions.id"],
+            name=op.f("fk_server_stats_most_expensive_transaction_id_transactions"),
+            ondelete="SET NULL",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_server_stats")),
+    )
+    op.create_index("ix_transactions_price", "transactions", ["price"], unique=False)
+
+    op.execute(BACKFILL_MEMBER_STATS)
+    op.execute(BACKFILL_SERVER_STATS)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_transactions_price", table_name="transactions")
+    op.drop_table("server_stats")
+    op.drop_index("ix_member_stats_role_total_count", table_name="member_stats")
+    op.drop_table("member_stats")
@@ -0,0 +1,79 @@
+"""Add indexes for the hot query paths.
+
+Revision ID: c312a100be82
+Revises: 21bce503eccb
+Create Date: 2026-10-17 01:03:28.052163
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c312a100be82"
+down_revision: Union[str, Sequence[str], None] = "21bce503eccb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_TRANSACTION = sa.text(
+    "cancelled IS 0 AND (sale_approved IS 0 OR buyer_paid IS 0 OR seller_paid IS 0"
+    " OR buyer_delivered IS 0 OR seller_delivered IS 0)"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        op.f("ix_bot_messages_transaction_id"),
+        "bot_messages",
+        ["transaction_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_reminders_reminder_date"), "reminders", ["reminder_date"], unique=False
+    )
+    op.create_index(
+        op.f("ix_reminders_transaction_id"),
+        "reminders",
+        ["transaction_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_transactions_buyer_id_creation_date",
+        "transactions",
+        ["buyer_id", "creation_date"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_transactions_display_id"), "transactions", ["display_id"], unique=False
+    )
+    # Only transactions still waiting on the buyer or seller, matching Transaction.open_filter()
+    op.create_index(
+        "ix_transactions_open",
+        "transactions",
+        ["creation_date"],
+        unique=False,
+        sqlite_where=OPEN_TRANSACTION,
+    )
+    op.create_index(
+        "ix_transactions_seller_id_creation_date",
+        "transactions",
+        ["seller_id", "creation_date"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_transactions_seller_id_creation_date", table_name="transactions")
+    op.drop_index(
+        "ix_transactions_open", table_name="transactions", sqlite_where=OPEN_TRANSACTION
+    )
+    op.drop_index(op.f("ix_transactions_display_id"), table_name="transactions")
+    op.drop_index("ix_transactions_buyer_id_creation_date", table_name="transactions")
+    op.drop_index(op.f("ix_reminders_transaction_id"), table_name="reminders")
+    op.drop_index(op.f("ix_reminders_reminder_date"), table_name="reminders")
+    op.drop_index(op.f("ix_bot_messages_transaction_id"), table_name="bot_messages")
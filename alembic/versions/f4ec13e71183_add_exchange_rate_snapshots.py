@@ -0,0 +1,74 @@
+"""Add exchange rate snapshots to transactions, and the currency rate history.
+
+Revision ID: f4ec13e71183
+Revises: 453421f8b465
+Create Date: 2026-10-17 01:23:01.427087
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4ec13e71183"
+down_revision: Union[str, Sequence[str], None] = "453421f8b465"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot the rates in use until now, so converted prices and the stats rollups don't change
+BACKFILL_EXCHANGE_RATES = """
+UPDATE transactions
+SET exchange_rate = CASE
+    WHEN currency_code = 'GBP' THEN 1.0
+    ELSE (SELECT rate FROM currencies WHERE currencies.code = transactions.currency_code)
+END
+"""
+
+BACKFILL_CURRENCY_RATES = """
+INSERT INTO currency_rates (currency_code, base_currency, rate, recorded_at)
+SELECT code, 'GBP', rate, last_updated
+FROM currencies
+WHERE rate IS NOT NULL
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "currency_rates",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("currency_code", sa.String(), nullable=False),
+        sa.Column("base_currency", sa.String(), nullable=False),
+        sa.Column("rate", sa.Float(), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["currency_code"],
+            ["currencies.code"],
+            name=op.f("fk_currency_rates_currency_code_currencies"),
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_currency_rates")),
+    )
+    op.create_index(
+        "ix_currency_rates_currency_code_recorded_at",
+        "currency_rates",
+        ["currency_code", "recorded_at"],
+        unique=False,
+    )
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.add_column(sa.Column("exchange_rate", sa.Float(), nullable=True))
+
+    op.execute(BACKFILL_EXCHANGE_RATES)
+    op.execute(BACKFILL_CURRENCY_RATES)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("transactions") as batch_op:
+        batch_op.drop_column("exchange_rate")
+    op.drop_index(
+        "ix_currency_rates_currency_code_recorded_at", table_name="currency_rates"
+    )
+    op.drop_table("currency_rates")
@@ -1,17 +1,26 @@
 """The LedgerBot class is the actual implimentation of the Discord bot.  Extends discord.Client."""
 
+import asyncio
 import logging
-from typing import Any, Dict
+from functools import partial
+from typing import Any, Dict, Hashable
 
 import discord
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from discord.abc import GuildChannel
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from .clients import ExtendedClient, ReactionRolesClient, TransactionsClient
 from .commands_dm import is_dm, process_dm
+from .commands_scheduled import perf_summary, refresh_rates
 from .core import Config
+from .database import profile_handler
+from .errors import MemberStorageError
+from .metrics_server import JobMetrics, MetricsServer
 from .process_message import process_message
 from .reminder_manager import ReminderManager
+from .routing_table import ChannelHandler
 from .services import Service
 
 log = logging.getLogger(__name__)
@@ -31,6 +40,11 @@ class LedgerBot(TransactionsClient, ReactionRolesClient, ExtendedClient):
         self.scheduler = scheduler
         self.reminders = reminders
         self.session_factory = session_factory
+        self.member_sync_task: asyncio.Task[None] | None = None
+        self.job_metrics = JobMetrics(scheduler)
+        self.metrics_server = (
+            MetricsServer(self, config.metrics) if config.metrics.enabled else None
+        )
 
         # We need a guild object for various uses but can't get the full guild object until the bot is connected and on_ready is called, so use this as a tempory object.
         self.guild = discord.Object(id=self.config.guild)
@@ -38,6 +52,27 @@ class LedgerBot(TransactionsClient, ReactionRolesClient, ExtendedClient):
         log.info(f"Set guild: {self.config.guild}")
         log.info(f"Watching channels: {self.config.channels}")
 
+        scheduler.add_job(
+            func=perf_summary,
+            name="Query profile summary",
+            trigger="cron",
+            hour=config.perf_summary_time.hour,
+            minute=config.perf_summary_time.minute,
+            second=config.perf_summary_time.second,
+            coalesce=True,
+        )
+        scheduler.add_job(
+            func=refresh_rates,
+            name="Refresh exchange rates",
+            kwargs={"service": self.service},
+            trigger="cron",
+            hour=config.currency_rate_refresh_time.hour,
+            minute=config.currency_rate_refresh_time.minute,
+            second=config.currency_rate_refresh_time.second,
+            timezone="UTC",
+            coalesce=True,
+        )
+
         intents = discord.Intents(
             messages=True,
             guilds=True,
@@ -71,6 +106,14 @@ class LedgerBot(TransactionsClient, ReactionRolesClient, ExtendedClient):
         # Properly set the guild object
         self.guild = self.get_guild(self.config.guild)
 
+        # Index our status messages before handling any reactions
+        await self.service.bot_message.load_message_index()
+        await self.service.reaction_role.list_watched_message_ids()
+
+        if self.config.sync_members_on_ready and self.member_sync_task is None:
+            # on_ready fires again after a reconnect, but one sync is enough
+            self.member_sync_task = asyncio.create_task(self.sync_guild_members())
+
         log.info("Building slash commands")
         await self.tree.sync(guild=self.guild)
 
@@ -79,34 +122,126 @@ class LedgerBot(TransactionsClient, ReactionRolesClient, ExtendedClient):
         if not self.scheduler.running:
             log.warning("The scheduler is not running")
 
+        # Publish the stored rates, only waiting on the API if they're out of date
+        await self.service.currency.load_rates()
+        if self.service.currency.rates_stale:
+            await self.service.currency.refresh_rates()
+
         # Ensure we have a few expected currencies in the database
         await self.service.currency.get_or_add_currency("GBP")
         await self.service.currency.get_or_add_currency("USD")
         await self.service.currency.get_or_add_currency("EUR")
 
+    @profile_handler("task:sync_guild_members")
+    async def sync_guild_members(self) -> None:
+        """Add or update the records of everyone in the guild, ahead of their first interaction."""
+        if not isinstance(self.guild, discord.Guild):
+            log.warning("Can't sync members without the guild")
+            return
+
+        log.info(f"Syncing the {self.guild.member_count} members of {self.guild.name}")
+        try:
+            synced = await self.service.member.sync_members(
+                self.guild.members, chunk_size=self.config.member_sync_chunk_size
+            )
+        except (MemberStorageError, SQLAlchemyError):
+            log.exception("Syncing the guild's members failed")
+            return
+
+        log.info(f"Member sync complete, {synced} members added or updated")
+
+    async def setup_hook(self) -> None:
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
+
+    async def close(self) -> None:
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+        await self.service.currency.close()
+        await super().close()
+
     async def on_message(self, message: discord.Message) -> None:
-        # Process DMs
+        # Process DMs, one at a time for each member
         if is_dm(message):
-            await process_dm(self, message)
+            await self.events.submit(
+                "dm",
+                partial(process_dm, self, message),
+                key=("dm", message.author.id),
+            )
             return
 
         if isinstance(message.channel, (discord.DMChannel, discord.PartialMessageable)):
             log.info("Can't get channel name, skipping...")
             return
 
-        channel_name = message.channel.name
+        self.remember_message_location(message.id, message.channel.id)
 
-        if channel_name not in self.config.channels.include:
+        if not self.routes.allows(message.channel.id, ChannelHandler.TRANSACTIONS):
             return
-        else:
-            if channel_name in self.config.channels.exclude:
-                return
 
-        # Process messages
-        await process_message(self, message)
+        # Process messages, in order for each channel
+        await self.events.submit(
+            "message",
+            partial(profile_handler("message")(process_message), self, message),
+            key=("channel", message.channel.id),
+        )
+
+    def reaction_key(self, payload: discord.RawReactionActionEvent) -> Hashable:
+        """Get the ordering key for a reaction, so reactions on a transaction are processed in order."""
+        transaction_id = self.service.bot_message.get_indexed_transaction_id(
+            payload.message_id
+        )
+        if transaction_id is not None:
+            return ("transaction", transaction_id)
+        return ("message", payload.message_id)
+
+    def is_watched_role_message(self, message_id: int) -> bool:
+        """Whether a message could have reaction roles, without querying for them if possible."""
+        reaction_roles = self.service.reaction_role
+        return (
+            not reaction_roles.watched_message_ids_loaded
+            or message_id in reaction_roles.watched_message_ids
+        )
+
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        # Route events by channel id, rather than comparing channel names on every event.
+        # Rebuilt as soon as the guild's channels are known, ahead of on_ready.
+        if guild.id == self.config.guild:
+            self.routes.rebuild(guild.channels)
+
+    async def on_guild_channel_create(self, channel: GuildChannel) -> None:
+        if channel.guild.id == self.config.guild:
+            self.routes.update_channel(channel)
+
+    async def on_guild_channel_update(
+        self, before: GuildChannel, after: GuildChannel
+    ) -> None:
+        if after.guild.id == self.config.guild and before.name != after.name:
+            self.routes.update_channel(after)
+
+    async def on_guild_channel_delete(self, channel: GuildChannel) -> None:
+        self.routes.remove_channel(channel.id)
 
     async def on_raw_reaction_add(
         self, payload: discord.RawReactionActionEvent
+    ) -> None:
+        self.remember_message_location(payload.message_id, payload.channel_id)
+
+        # Reject reactions nothing handles before awaiting anything
+        if self.routes.reaction_handler(
+            payload.channel_id, payload.emoji.name
+        ) is None and not self.is_watched_role_message(payload.message_id):
+            return
+
+        await self.events.submit(
+            "reaction_add",
+            partial(self.process_raw_reaction_add, payload),
+            key=self.reaction_key(payload),
+        )
+
+    @profile_handler("reaction_add")
+    async def process_raw_reaction_add(
+        self, payload: discord.RawReactionActionEvent
     ) -> None:
         channel = await self.get_or_fetch_channel(payload.channel_id)
         reactor = payload.member
@@ -141,6 +276,22 @@ class LedgerBot(TransactionsClient, ReactionRolesClient, ExtendedClient):
 
     async def on_raw_reaction_remove(
         self, payload: discord.RawReactionActionEvent
+    ) -> None:
+        self.remember_message_location(payload.message_id, payload.channel_id)
+
+        # Only reaction roles handle removals
+        if not self.is_watched_role_message(payload.message_id):
+            return
+
+        await self.events.submit(
+            "reaction_remove",
+            partial(self.process_raw_reaction_remove, payload),
+            key=self.reaction_key(payload),
+        )
+
+    @profile_handler("reaction_remove")
+    async def process_raw_reaction_remove(
+        self, payload: discord.RawReactionActionEvent
     ) -> None:
         channel = await self.get_or_fetch_channel(payload.channel_id)
         reactor = payload.user_id
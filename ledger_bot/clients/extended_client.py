@@ -2,21 +2,37 @@
 
 import logging
 import os
+from collections import Counter
+from contextlib import AbstractAsyncContextManager
 from shutil import which
 from subprocess import CalledProcessError, check_output
 from typing import Any, Optional, Union
 
 import discord
+from cachetools import LRUCache
 from discord import app_commands
 from discord.abc import GuildChannel, PrivateChannel
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from ledger_bot.core import Config
+from ledger_bot.database import profiler
+from ledger_bot.event_queue import EventQueue
+from ledger_bot.outbound_scheduler import OutboundScheduler
+from ledger_bot.routing_table import RoutingTable
+from ledger_bot.services import Service, unit_of_work
 
 log = logging.getLogger(__name__)
 
 
+class ProfiledCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Runs in the task that invokes the command, so its queries are attributed to it
+        if interaction.command is not None:
+            profiler.start(f"slash:{interaction.command.qualified_name}")
+        return True
+
+
 class ExtendedClient(discord.Client):
     # In reality, this will only ever be a discord.Guild object once the bot is running
     # but we temporarily set it to discord.Object during setup.
@@ -26,9 +42,29 @@ class ExtendedClient(discord.Client):
 
     config: Config
 
+    service: Service
+
     def __init__(self, **kwargs: Any):
         super().__init__(**kwargs)
-        self.tree = app_commands.CommandTree(self)
+        self.tree = ProfiledCommandTree(self)
+        self.outbound = OutboundScheduler(self.config.outbound)
+        self.routes = RoutingTable(self.config.channels, get_channel=self.get_channel)
+        self.events = EventQueue(self.config.events)
+
+        # Where recently seen messages are, by message id, so they can be reacted to without searching every channel
+        self.message_locations: LRUCache[int, int] = LRUCache(
+            maxsize=self.config.message_location_cache_size
+        )
+        self.message_location_lookups: Counter[str] = Counter()  # Hits and misses
+
+    async def close(self) -> None:
+        await self.events.close()
+        await self.outbound.close()
+        await super().close()
+
+    def unit_of_work(self) -> AbstractAsyncContextManager[AsyncSession]:
+        """Get a session to share across a whole event, committed once when it's done."""
+        return unit_of_work(self.session_factory)
 
     async def get_or_fetch_channel(
         self, channel_id: int
@@ -38,6 +74,41 @@ class ExtendedClient(discord.Client):
         else:
             return await self.fetch_channel(channel_id)
 
+    def remember_message_location(self, message_id: int, channel_id: int) -> None:
+        """Record which channel a message is in."""
+        self.message_locations[message_id] = channel_id
+
+    async def locate_message(self, message_id: int) -> discord.TextChannel | None:
+        """Find the channel a message is in, without fetching the message.
+
+        Messages the bot has seen are found in `message_locations`, and its status messages
+        from their bot_message records.
+
+        Parameters
+        ----------
+        message_id : int
+            The id of the message
+
+        Returns
+        -------
+        discord.TextChannel | None
+            The channel, or None if the message's channel isn't known
+        """
+        channel_id = self.message_locations.get(message_id)
+        self.message_location_lookups["miss" if channel_id is None else "hit"] += 1
+
+        if channel_id is None:
+            bot_message = await self.service.bot_message.get_bot_message_by_message_id(
+                message_id
+            )
+            if bot_message is None:
+                return None
+            channel_id = bot_message.channel_id
+            self.remember_message_location(message_id, channel_id)
+
+        channel = await self.get_or_fetch_channel(channel_id)
+        return channel if isinstance(channel, discord.TextChannel) else None
+
     async def get_or_fetch_user(self, user_id: int) -> discord.User:
         if user := self.get_user(user_id):
             return user
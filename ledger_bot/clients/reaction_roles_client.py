@@ -8,6 +8,7 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from ledger_bot.core import Config
+from ledger_bot.database import profile_handler
 from ledger_bot.services import Service
 
 from .extended_client import ExtendedClient
@@ -41,6 +42,7 @@ class ReactionRolesClient(ExtendedClient):
         )
         super().__init__(**kwargs)
 
+    @profile_handler("job:refresh_reaction_roles")
     async def refresh_reaction_role_caches(self) -> None:
         log.info("Refreshing reaction-role watched messages")
         watched_message_ids = (
@@ -55,7 +57,7 @@ class ReactionRolesClient(ExtendedClient):
 
         watched_message_ids = (
             self.service.reaction_role.watched_message_ids
-            if len(self.service.reaction_role.watched_message_ids) > 0
+            if self.service.reaction_role.watched_message_ids_loaded
             else await self.service.reaction_role.list_watched_message_ids()
         )
 
@@ -130,7 +132,7 @@ class ReactionRolesClient(ExtendedClient):
     ) -> bool:
         watched_message_ids = (
             self.service.reaction_role.watched_message_ids
-            if len(self.service.reaction_role.watched_message_ids) > 0
+            if self.service.reaction_role.watched_message_ids_loaded
             else await self.service.reaction_role.list_watched_message_ids()
         )
 
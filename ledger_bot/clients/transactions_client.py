@@ -1,13 +1,20 @@
 """A mixin for dealing with transactions."""
 
+import asyncio
+import contextvars
 import logging
+from functools import partial
+from typing import Dict, Set
+from weakref import WeakValueDictionary
 
 import discord
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from ledger_bot.commands_scheduled import cleanup
 from ledger_bot.core import Config, register_help_reaction
+from ledger_bot.database import profile_handler
 from ledger_bot.errors import (
     TransactionApprovedError,
     TransactionCancelledError,
@@ -18,7 +25,9 @@ from ledger_bot.message_generators import (
     generate_transaction_status_message,
     send_message,
 )
+from ledger_bot.outbound_scheduler import Priority
 from ledger_bot.reminder_manager import ReminderManager
+from ledger_bot.routing_table import ChannelHandler
 from ledger_bot.services import Service
 from ledger_bot.utils import add_reaction, remove_reaction
 from ledger_bot.views import CreateReminderButton
@@ -44,6 +53,16 @@ class TransactionsClient(ExtendedClient):
         self.reminders = reminders
         self.session_factory = session_factory
 
+        # One lock per transaction, so changes to a transaction are made one at a time.
+        # A lock is dropped once nothing is holding or waiting on it.
+        self.transaction_locks: WeakValueDictionary[int, asyncio.Lock] = (
+            WeakValueDictionary()
+        )
+        # Status message renders waiting out `status_render_delay`, by transaction id
+        self.pending_renders: Dict[int, asyncio.Task] = {}
+        # Every render that hasn't finished, pending or not, so they can be stopped on close
+        self.status_renders: Set[asyncio.Task] = set()
+
         scheduler.add_job(
             func=cleanup,
             name="Cleanup",
@@ -62,161 +81,128 @@ class TransactionsClient(ExtendedClient):
             **kwargs,
         )
 
+        self.routes.register_reaction(
+            config.emojis.approval, self.process_reaction_approval
+        )
+        self.routes.register_reaction(config.emojis.paid, self.process_reaction_paid)
+        self.routes.register_reaction(
+            config.emojis.delivered, self.process_reaction_delivered
+        )
+        self.routes.register_reaction(
+            config.emojis.cancel, self.process_reaction_cancelled
+        )
+        self.routes.register_reaction(
+            config.emojis.reminder, self.process_reaction_reminder
+        )
+
     async def handle_transaction_reaction(
         self, payload: discord.RawReactionActionEvent
     ) -> bool:
-        channel = await self.get_or_fetch_channel(payload.channel_id)
-        reactor = payload.member
-
-        # Repeating checks to deal with mypy warnings
-        if reactor is None:
-            log.debug("Payload contained no reactor. Ignoring payload.")
+        # Check if valid reaction emoji, in a channel we process reactions in
+        process_reaction = self.routes.reaction_handler(
+            payload.channel_id, payload.emoji.name
+        )
+        if process_reaction is None:
             return False
 
-        reactor = await self.service.member.get_or_add_member(reactor)
+        # Check if valid message
+        # Once the index is loaded, reactions on messages that aren't ours are rejected without any SQL or REST calls
+        bot_message_service = self.service.bot_message
+        if (
+            bot_message_service.message_index_loaded
+            and bot_message_service.get_indexed_transaction_id(payload.message_id)
+            is None
+        ):
+            log.debug(
+                f"Ignoring {payload.emoji.name} on message {payload.message_id} - Not a transaction message"
+            )
+            return False
 
-        if not isinstance(channel, discord.TextChannel):
-            log.debug("Couldn't get channel information. Ignoring reaction.")
+        # Repeating checks to deal with mypy warnings
+        if payload.member is None:
+            log.debug("Payload contained no reactor. Ignoring payload.")
             return False
 
-        # Check if valid reaction emoji
-        if payload.emoji.name not in [
-            self.config.emojis.approval,
-            self.config.emojis.cancel,
-            self.config.emojis.paid,
-            self.config.emojis.delivered,
-            self.config.emojis.reminder,
-        ]:
+        channel = await self.get_reaction_channel(payload)
+        if channel is None:
             return False
 
-        # Check if in valid channel
-        if channel.name not in self.config.channels.include:
-            log.debug(
-                f"Ignoring {payload.emoji.name} from {reactor.username} on message {payload.message_id} in {channel.name} - Channel not included"
+        transaction_id = bot_message_service.get_indexed_transaction_id(
+            payload.message_id
+        )
+        if transaction_id is None:
+            bot_message = await bot_message_service.get_bot_message_by_message_id(
+                payload.message_id
             )
-            return False
-        else:
-            if channel.name in self.config.channels.exclude:
+            if bot_message is None:
                 log.debug(
-                    f"Ignoring {payload.emoji.name} from {reactor.username} on message {payload.message_id} in {channel.name} - Channel excluded"
+                    f"Ignoring {payload.emoji.name} on message {payload.message_id} - Not a transaction message"
                 )
                 return False
-
-        # Check if valid message
-        target_transaction = (
-            await self.service.transaction.get_transaction_by_bot_message_id(
-                bot_message_id=int(payload.message_id),
-                bot_message_service=self.service.bot_message,
+            transaction_id = bot_message.transaction_id
+
+        # Reactions on the same transaction are processed one at a time. The whole reaction
+        # runs in a single session, which is committed once the reaction is processed.
+        async with self.transaction_lock(
+            transaction_id
+        ), self.unit_of_work() as session:
+            reactor = await self.service.member.get_or_add_member(
+                payload.member, session=session
             )
-        )
-        if target_transaction is None:
-            log.debug(
-                f"Ignoring {payload.emoji.name} from {reactor.username} on message {payload.message_id} in {channel.name} - Invalid target message"
-            )
-            return False
 
-        # After this point all are checks are slow, so we add the reaction now.
-        # The valid message check above is also pretty slow, but we'd then add the reaction to every message that received a valid reaction
-        # So we add this after those checks
-        await add_reaction(
-            client=self,
-            message_id=payload.message_id,
-            reaction=self.config.emojis.thinking,
-            channel_obj=channel,
-        )
-
-        # Get buyer & seller Member
-        buyer = await self.service.member.get_member_from_record_id(
-            target_transaction.buyer_id
-        )
-        if buyer is None:
-            await remove_reaction(
-                client=self,
-                message_id=payload.message_id,
-                reaction=self.config.emojis.thinking,
-                channel_obj=channel,
+            target_transaction = (
+                await self.service.transaction.get_transaction_by_bot_message_id(
+                    bot_message_id=int(payload.message_id), session=session
+                )
             )
-            log.debug("No buyer found")
-            return False
+            if target_transaction is None:
+                log.debug(
+                    f"Ignoring {payload.emoji.name} from {reactor.username} on message {payload.message_id} in {channel.name} - Invalid target message"
+                )
+                # The record may have been removed alongside its transaction, so stop indexing it
+                bot_message_service.unindex_message(payload.message_id)
+                return False
 
-        seller = await self.service.member.get_member_from_record_id(
-            target_transaction.seller_id
-        )
-        if seller is None:
-            await remove_reaction(
+            # After this point all are checks are slow, so we add the reaction now.
+            # The valid message check above is also pretty slow, but we'd then add the reaction to every message that received a valid reaction
+            # So we add this after those checks
+            await add_reaction(
                 client=self,
                 message_id=payload.message_id,
                 reaction=self.config.emojis.thinking,
                 channel_obj=channel,
             )
-            log.debug("No seller found")
-            return False
 
-        # Check if buyer or seller
-        if reactor.id != buyer.id and reactor.id != seller.id:
-            log.debug(
-                f"Ignoring {payload.emoji.name} from {reactor.username} on message {payload.message_id} in {channel.name} - Reactor is neither buyer nor seller"
-            )
-            await remove_reaction(
-                client=self,
-                message_id=payload.message_id,
-                reaction=self.config.emojis.thinking,
-            )
-            return False
+            # The buyer & seller are loaded alongside the transaction
+            buyer = target_transaction.buyer
+            seller = target_transaction.seller
 
-        # Process reaction
-        log.info(
-            f"Processing {payload.emoji.name} from {reactor.username} on message {payload.message_id}"
-        )
-
-        if payload.emoji.name == self.config.emojis.approval:
-            await self.process_reaction_approval(
-                reactor=reactor,
-                payload=payload,
-                target_transaction=target_transaction,
-                buyer=buyer,
-                seller=seller,
-                channel=channel,
-            )
-
-        elif payload.emoji.name == self.config.emojis.paid:
-            await self.process_reaction_paid(
-                reactor=reactor,
-                payload=payload,
-                target_transaction=target_transaction,
-                buyer=buyer,
-                seller=seller,
-                channel=channel,
-            )
-
-        elif payload.emoji.name == self.config.emojis.delivered:
-            await self.process_reaction_delivered(
-                reactor=reactor,
-                payload=payload,
-                target_transaction=target_transaction,
-                buyer=buyer,
-                seller=seller,
-                channel=channel,
-            )
+            # Check if buyer or seller
+            if reactor.id != buyer.id and reactor.id != seller.id:
+                log.debug(
+                    f"Ignoring {payload.emoji.name} from {reactor.username} on message {payload.message_id} in {channel.name} - Reactor is neither buyer nor seller"
+                )
+                await remove_reaction(
+                    client=self,
+                    message_id=payload.message_id,
+                    reaction=self.config.emojis.thinking,
+                    channel_obj=channel,
+                )
+                return False
 
-        elif payload.emoji.name == self.config.emojis.cancel:
-            await self.process_reaction_cancelled(
-                reactor=reactor,
-                payload=payload,
-                target_transaction=target_transaction,
-                buyer=buyer,
-                seller=seller,
-                channel=channel,
+            # Process reaction
+            log.info(
+                f"Processing {payload.emoji.name} from {reactor.username} on message {payload.message_id}"
             )
 
-        elif payload.emoji.name == self.config.emojis.reminder:
-            await self.process_reaction_reminder(
+            await process_reaction(
                 reactor=reactor,
                 payload=payload,
                 target_transaction=target_transaction,
                 buyer=buyer,
                 seller=seller,
                 channel=channel,
+                session=session,
             )
 
         # Remove our thinking reaction
@@ -230,12 +216,126 @@ class TransactionsClient(ExtendedClient):
         log.info(f"Finished processing reaction {payload.emoji} from {reactor}")
         return True
 
+    def transaction_lock(self, transaction_id: int) -> asyncio.Lock:
+        """Get the lock that serialises changes to a transaction."""
+        lock = self.transaction_locks.get(transaction_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.transaction_locks[transaction_id] = lock
+        return lock
+
+    def schedule_status_render(
+        self, transaction_id: int, channel: discord.TextChannel
+    ) -> None:
+        """Post the transaction's status once `status_render_delay` has passed.
+
+        Reactions in the meantime share the pending render, so a burst of reactions on a
+        transaction is posted once, with its final state.
+        """
+        if transaction_id in self.pending_renders:
+            log.debug(f"Status render already pending for transaction {transaction_id}")
+            return
+
+        # In a context of its own, so the render is profiled separately from the reaction
+        render = asyncio.create_task(
+            self.render_status(transaction_id, channel), context=contextvars.Context()
+        )
+        render.add_done_callback(partial(self._status_render_done, transaction_id))
+        self.pending_renders[transaction_id] = render
+        self.status_renders.add(render)
+
+    def _status_render_done(self, transaction_id: int, render: asyncio.Task) -> None:
+        self.status_renders.discard(render)
+        # A render that was cancelled, or failed, before it started is still pending
+        if self.pending_renders.get(transaction_id) is render:
+            del self.pending_renders[transaction_id]
+
+        if not render.cancelled() and (error := render.exception()) is not None:
+            log.error(
+                f"Rendering the status of transaction {transaction_id} failed",
+                exc_info=error,
+            )
+
+    async def cancel_status_renders(self) -> None:
+        """Stop every status render, so none run against a closed client or database."""
+        renders = list(self.status_renders)
+        for render in renders:
+            render.cancel()
+        await asyncio.gather(*renders, return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.cancel_status_renders()
+        await super().close()
+
+    @profile_handler("task:render_status")
+    async def render_status(
+        self, transaction_id: int, channel: discord.TextChannel
+    ) -> None:
+        """Post a transaction's current status, replacing its latest status message."""
+        await asyncio.sleep(self.config.status_render_delay)
+
+        async with self.transaction_lock(transaction_id):
+            # Changes from here on weren't rendered, so they need a render of their own
+            self.pending_renders.pop(transaction_id, None)
+
+            try:
+                async with self.unit_of_work() as session:
+                    transaction = await self.service.transaction.get_transaction(
+                        transaction_id, session=session
+                    )
+                    if transaction is None:
+                        log.info(f"Transaction {transaction_id} no longer exists")
+                        return
+
+                    response_contents = await generate_transaction_status_message(
+                        transaction=transaction,
+                        client=self,
+                        config=self.config,
+                        is_update=True,
+                    )
+
+                    previous_message_id = max(
+                        (message.message_id for message in transaction.bot_messages),
+                        default=None,
+                    )
+                    await send_message(
+                        response_contents=response_contents,
+                        channel=channel,
+                        target_transaction=transaction,
+                        previous_message_id=previous_message_id,
+                        service=self.service,
+                        config=self.config,
+                        session=session,
+                        outbound=self.outbound,
+                    )
+            except (SQLAlchemyError, discord.HTTPException) as error:
+                log.error(
+                    f"An error occured rendering the status of transaction {transaction_id}: {error}"
+                )
+
+    async def get_reaction_channel(
+        self, payload: discord.RawReactionActionEvent
+    ) -> discord.TextChannel | None:
+        """Get the channel a reaction was made in, if it's one we process reactions in."""
+        if not self.routes.allows(payload.channel_id, ChannelHandler.TRANSACTIONS):
+            log.debug(
+                f"Ignoring {payload.emoji.name} on message {payload.message_id} in {payload.channel_id} - Channel not routed to transactions"
+            )
+            return None
+
+        channel = await self.get_or_fetch_channel(payload.channel_id)
+        if not isinstance(channel, discord.TextChannel):
+            log.debug("Couldn't get channel information. Ignoring reaction.")
+            return None
+
+        return channel
+
     @register_help_reaction(
         reaction_name="approval",
         description="Approve a transaction.",
     )
     async def process_reaction_approval(
-        self, payload, reactor, target_transaction, buyer, seller, channel
+        self, payload, reactor, target_transaction, buyer, seller, channel, session=None
     ):
         # Approval
         log.info(
@@ -244,7 +344,7 @@ class TransactionsClient(ExtendedClient):
 
         try:
             processed_transaction = await self.service.transaction.approve_transaction(
-                transaction=target_transaction, reactor=reactor
+                transaction=target_transaction, reactor=reactor, session=session
             )
         except (
             TransactionCancelledError,
@@ -259,21 +359,7 @@ class TransactionsClient(ExtendedClient):
             )
             return False
 
-        response_contents = await generate_transaction_status_message(
-            transaction=processed_transaction,
-            client=self,
-            config=self.config,
-            is_update=True,
-        )
-
-        await send_message(
-            response_contents=response_contents,
-            channel=channel,
-            target_transaction=processed_transaction,
-            previous_message_id=payload.message_id,
-            service=self.service,
-            config=self.config,
-        )
+        self.schedule_status_render(processed_transaction.id, channel)
 
         return True
 
@@ -282,7 +368,7 @@ class TransactionsClient(ExtendedClient):
         description="Mark a transaction as paid.",
     )
     async def process_reaction_paid(
-        self, payload, reactor, target_transaction, buyer, seller, channel
+        self, payload, reactor, target_transaction, buyer, seller, channel, session=None
     ):
         # Paid
         log.info(
@@ -292,7 +378,7 @@ class TransactionsClient(ExtendedClient):
         try:
             processed_transaction = (
                 await self.service.transaction.mark_transaction_paid(
-                    transaction=target_transaction, reactor=reactor
+                    transaction=target_transaction, reactor=reactor, session=session
                 )
             )
         except TransactionCancelledError:
@@ -304,21 +390,7 @@ class TransactionsClient(ExtendedClient):
             )
             return False
 
-        response_contents = await generate_transaction_status_message(
-            transaction=processed_transaction,
-            client=self,
-            config=self.config,
-            is_update=True,
-        )
-
-        await send_message(
-            response_contents=response_contents,
-            channel=channel,
-            target_transaction=processed_transaction,
-            previous_message_id=payload.message_id,
-            service=self.service,
-            config=self.config,
-        )
+        self.schedule_status_render(processed_transaction.id, channel)
 
         return True
 
@@ -327,7 +399,7 @@ class TransactionsClient(ExtendedClient):
         description="Mark a transaction as delivered.",
     )
     async def process_reaction_delivered(
-        self, payload, reactor, target_transaction, buyer, seller, channel
+        self, payload, reactor, target_transaction, buyer, seller, channel, session=None
     ):
         # Delivered
         log.info(
@@ -337,7 +409,7 @@ class TransactionsClient(ExtendedClient):
         try:
             processed_transaction = (
                 await self.service.transaction.mark_transaction_delivered(
-                    transaction=target_transaction, reactor=reactor
+                    transaction=target_transaction, reactor=reactor, session=session
                 )
             )
         except TransactionCancelledError:
@@ -349,28 +421,16 @@ class TransactionsClient(ExtendedClient):
             )
             return False
 
-        response_contents = await generate_transaction_status_message(
-            transaction=processed_transaction,
-            client=self,
-            config=self.config,
-            is_update=True,
-        )
+        self.schedule_status_render(processed_transaction.id, channel)
 
-        await send_message(
-            response_contents=response_contents,
-            channel=channel,
-            target_transaction=processed_transaction,
-            previous_message_id=payload.message_id,
-            service=self.service,
-            config=self.config,
-        )
+        return True
 
     @register_help_reaction(
         reaction_name="cancel",
         description="Mark a transaction as cancelled.",
     )
     async def process_reaction_cancelled(
-        self, payload, reactor, target_transaction, buyer, seller, channel
+        self, payload, reactor, target_transaction, buyer, seller, channel, session=None
     ):
         # Cancelled
         log.info(
@@ -379,7 +439,7 @@ class TransactionsClient(ExtendedClient):
 
         try:
             processed_transaction = await self.service.transaction.cancel_transaction(
-                transaction=target_transaction, reactor=reactor
+                transaction=target_transaction, reactor=reactor, session=session
             )
         except TransactionApprovedError:
             await remove_reaction(
@@ -390,21 +450,7 @@ class TransactionsClient(ExtendedClient):
             )
             return False
 
-        response_contents = await generate_transaction_status_message(
-            transaction=processed_transaction,
-            client=self,
-            config=self.config,
-            is_update=True,
-        )
-
-        await send_message(
-            response_contents=response_contents,
-            channel=channel,
-            target_transaction=processed_transaction,
-            previous_message_id=payload.message_id,
-            service=self.service,
-            config=self.config,
-        )
+        self.schedule_status_render(processed_transaction.id, channel)
 
         return True
 
@@ -413,7 +459,7 @@ class TransactionsClient(ExtendedClient):
         description="Set a reminder for a transaction.",
     )
     async def process_reaction_reminder(
-        self, payload, reactor, target_transaction, buyer, seller, channel
+        self, payload, reactor, target_transaction, buyer, seller, channel, session=None
     ):
         # Watch
         log.info(
@@ -436,15 +482,16 @@ class TransactionsClient(ExtendedClient):
         )
         seller_user = await self.get_or_fetch_user(seller.discord_id)
         buyer_user = await self.get_or_fetch_user(buyer.discord_id)
-        await reactor_user.send(
-            view=CreateReminderButton(
-                service=self.service,
-                transaction=target_transaction,
-                user=reactor_user,
-                buyer_user=buyer_user,
-                seller_user=seller_user,
-                reminders=self.reminders,
-            ),
+        view = CreateReminderButton(
+            service=self.service,
+            transaction=target_transaction,
+            user=reactor_user,
+            buyer_user=buyer_user,
+            seller_user=seller_user,
+            reminders=self.reminders,
+        )
+        await self.outbound.run(
+            ("dm", reactor_user.id), Priority.DM, lambda: reactor_user.send(view=view)
         )
 
         return True
@@ -550,6 +597,7 @@ class TransactionsClient(ExtendedClient):
             previous_message_id=None,
             service=self.service,
             config=self.config,
+            outbound=self.outbound,
         )
 
         return "Successfully refreshed message."
@@ -11,6 +11,8 @@ from apscheduler.job import Job
 
 from ledger_bot.commands_scheduled import cleanup, shutdown
 from ledger_bot.core import register_help_command
+from ledger_bot.database import profiler
+from ledger_bot.message_generators.split_message import split_message
 from ledger_bot.utils import add_reaction
 
 if TYPE_CHECKING:
@@ -122,9 +124,40 @@ async def _process_shutdown_authcode(
         return response
 
 
+async def _process_perf(
+    client: "LedgerBot", request: str, dm_channel: discord.DMChannel
+) -> None:
+    """Send the query profile, outbound request and event metrics, or reset the profile.
+
+    Parameters
+    ----------
+    client : LedgerBot
+        The bot, for its outbound scheduler and event queue
+    request : str
+        The dev request, either `perf` or `perf reset`
+    dm_channel : discord.DMChannel
+        The DM channel of the user who triggered the command
+    """
+    if request == "perf reset":
+        log.info("Resetting query profile")
+        profiler.reset()
+        await dm_channel.send("Query profile has been reset.")
+        return
+
+    intro = f"Query profile since <t:{profiler.since.timestamp():.0f}:f>:"
+    lines = [f"- {line}" for line in profiler.summary()] or ["No statements recorded."]
+    lines += ["", "Outbound requests:"]
+    lines += [f"- {line}" for line in client.outbound.summary()]
+    lines += ["", "Gateway events:"]
+    lines += [f"- {line}" for line in client.events.summary()]
+
+    for content in split_message([intro, *lines]):
+        await dm_channel.send(content)
+
+
 @register_help_command(
     command="dev add_reaction",
-    args=["message_id", "reaction"],
+    args=["message_id", "reaction", "optional: channel_id"],
     description="Applies the specified reaction to the given message.",
     requires_dev=True,
     scope="dm",
@@ -167,13 +200,26 @@ async def _process_shutdown_authcode(
     requires_dev=True,
     scope="dm",
 )
+@register_help_command(
+    command="dev perf",
+    args=["optional: reset"],
+    description="Shows the SQL statements issued by each handler, or resets the counts.",
+    requires_dev=True,
+    scope="dm",
+)
+@register_help_command(
+    command="dev rebuild_stats",
+    description="Rebuilds the stats rollups from the transaction history, and reports any that were wrong.",
+    requires_dev=True,
+    scope="dm",
+)
 @register_help_command(
     command="dev welcome_back",
     description="Posts a message saying ledger_bot is running again.",
     requires_dev=True,
     scope="dm",
 )
-async def command_dev(
+async def command_dev(  # noqa: C901
     client: "LedgerBot", message: discord.Message, dm_channel: discord.DMChannel
 ) -> None:
     """DM command - dev."""
@@ -183,10 +229,20 @@ async def command_dev(
     log.info(f"Processing dev mode request ({request}) from {message.author.name}")
 
     if request.startswith("add_reaction"):
-        message_id = int(request.split(" ")[1])
-        reaction = request.split(" ")[2]
+        parts = request.split(" ")
+        message_id = int(parts[1])
+        reaction = parts[2]
 
-        await add_reaction(client, message_id, reaction)
+        # Without a channel, the message has to be one the bot knows the location of
+        channel = (
+            await client.get_or_fetch_channel(int(parts[3])) if len(parts) > 3 else None
+        )
+        if channel is not None and not isinstance(channel, discord.TextChannel):
+            await dm_channel.send(f"{parts[3]} isn't a text channel.")
+            return
+
+        if not await add_reaction(client, message_id, reaction, channel_obj=channel):
+            await dm_channel.send(f"Couldn't add {reaction} to message {message_id}.")
 
     elif request.startswith("get_jobs"):
         jobs: List[Job] = client.scheduler.get_jobs()
@@ -218,6 +274,22 @@ async def command_dev(
         )
         await dm_channel.send(response)
 
+    elif request.startswith("perf"):
+        await _process_perf(client=client, request=request, dm_channel=dm_channel)
+
+    elif request.startswith("rebuild_stats"):
+        await dm_channel.send("Rebuilding stats")
+        mismatches = await client.service.stats.rebuild_stats()
+
+        if mismatches:
+            lines = [f"Rebuilt stats. {len(mismatches)} rollups were wrong:"]
+            lines += [f"- {mismatch}" for mismatch in mismatches]
+        else:
+            lines = ["Rebuilt stats. All rollups matched."]
+
+        for content in split_message(lines):
+            await dm_channel.send(content)
+
     if request.startswith("shutdown"):
         log.info("Received shutdown command")
         parts = request.split(" ", 1)  # Split at most once
@@ -8,6 +8,8 @@ import discord
 from ledger_bot.core import register_help_command
 from ledger_bot.errors import AirTableError
 from ledger_bot.message_generators import generate_list_message
+from ledger_bot.services.transaction_service import LIST_FILTERS
+from ledger_bot.views import TransactionListView
 
 if TYPE_CHECKING:
     from ledger_bot.LedgerBot import LedgerBot
@@ -16,7 +18,10 @@ log = logging.getLogger(__name__)
 
 
 @register_help_command(
-    command="list", description="Returns a list of your transactions.", scope="dm"
+    command="list",
+    args=[f"optional: {', '.join(LIST_FILTERS)} or export, default: all"],
+    description="Returns a list of your transactions, a page at a time. `export` sends them all at once.",
+    scope="dm",
 )
 async def command_list(
     client: "LedgerBot", message: discord.Message, dm_channel: discord.DMChannel
@@ -24,40 +29,37 @@ async def command_list(
     """DM command - list."""
     log.info(f"Getting transactions for user {message.author.name}")
 
+    list_filter = message.content.lower().removeprefix("!list").strip() or "all"
+    if list_filter != "export" and list_filter not in LIST_FILTERS:
+        await dm_channel.send(
+            f"I don't know how to list `{list_filter}`. Try one of: {', '.join(LIST_FILTERS)} or export."
+        )
+        return
+
     try:
         async with client.session_factory() as session:
             member = await client.service.member.get_or_add_member(
                 message.author, session=session
             )
 
-            await session.refresh(
-                member, attribute_names=["buying_transactions", "selling_transactions"]
+        if list_filter == "export":
+            transactions = (
+                await client.service.transaction.list_member_transaction_rows(member)
             )
-
-            buy_transactions = member.buying_transactions
-            sell_transactions = member.selling_transactions
-
-            transactions = buy_transactions + sell_transactions
-
-            # Load bot_messages for each transaction
-            for tx in transactions:
-                await session.refresh(
-                    tx, attribute_names=["seller", "buyer", "bot_messages"]
-                )
+        else:
+            view = TransactionListView(
+                client=client, requestor=member, list_filter=list_filter
+            )
+            content = await view.load()
 
     except AirTableError as error:
         log.error(f"There was an error processing the AirTable request: {error}")
         await dm_channel.send("An unexpected error occured.")
         return
 
-    if transactions is None:
-        await dm_channel.send("You don't have any transactions.")
-    else:
-        response = await generate_list_message(
-            transactions=transactions,
-            user_id=message.author.id,
-            service=client.service,
-        )
-
-        for transmit_message in response:
+    if list_filter == "export":
+        for transmit_message in await generate_list_message(transactions=transactions):
             await dm_channel.send(transmit_message)
+        return
+
+    await dm_channel.send(content, view=view)
@@ -5,6 +5,8 @@ from typing import TYPE_CHECKING
 
 from discord import Message
 
+from ledger_bot.database import profiler
+
 from .command_dev import command_dev
 from .command_help import command_help
 from .command_list import command_list
@@ -18,6 +20,8 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+DM_COMMANDS = ("!version", "!list", "!dev", "!help", "!reminder", "!stats")
+
 
 async def process_dm(client: "LedgerBot", message: Message) -> None:
     """
@@ -43,6 +47,10 @@ async def process_dm(client: "LedgerBot", message: Message) -> None:
     # We don't care about capitalisation, so set everything to lower
     message_content = message.content.lower().strip()
 
+    # Attribute the command's queries to it, without trusting arbitrary input as a handler name
+    command = message_content.split(" ", 1)[0]
+    profiler.start(f"dm:{command}" if command in DM_COMMANDS else "dm:unknown")
+
     # Get the DM channel so we can later respond to the message
     dm_channel = await get_dm_channel(message.author)
 
@@ -51,7 +59,7 @@ async def process_dm(client: "LedgerBot", message: Message) -> None:
         await command_version(client=client, message=message, dm_channel=dm_channel)
         return
 
-    elif message_content == "!list":
+    elif message_content == "!list" or message_content.startswith("!list "):
         log.info("Recognised command: !list")
         await command_list(client=client, message=message, dm_channel=dm_channel)
 
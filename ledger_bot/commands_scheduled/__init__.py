@@ -5,6 +5,8 @@ The schedule itself is set in LedgerBot.py:LedgerBot
 """
 
 from .cleanup import cleanup
+from .perf_summary import perf_summary
+from .refresh_rates import refresh_rates
 from .shutdown import shutdown
 
-__all__ = ["cleanup", "shutdown"]
+__all__ = ["cleanup", "perf_summary", "refresh_rates", "shutdown"]
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 
 import discord
 
+from ledger_bot.database import profile_handler
 from ledger_bot.errors import AirTableError
 from ledger_bot.services import Service
 
@@ -15,6 +16,7 @@ if TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
+@profile_handler("job:cleanup")
 async def cleanup(client: "LedgerBot", service: Service) -> None:
     """
     Removes messages, message records, and (optionally) transaction records.
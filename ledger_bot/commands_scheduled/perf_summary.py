@@ -0,0 +1,20 @@
+"""perf_summary.py."""
+
+import logging
+
+from ledger_bot.database import profiler
+
+log = logging.getLogger(__name__)
+
+
+async def perf_summary() -> None:
+    """Logs the SQL statements issued by each handler since the stats were last reset."""
+    lines = profiler.summary()
+
+    if not lines:
+        log.info("Query profile: no statements recorded")
+        return
+
+    log.info(f"Query profile since {profiler.since:%Y-%m-%d %H:%M} UTC:")
+    for line in lines:
+        log.info(f"  {line}")
@@ -0,0 +1,22 @@
+"""refresh_rates.py."""
+
+import logging
+
+from ledger_bot.database import profile_handler
+from ledger_bot.services import Service
+
+log = logging.getLogger(__name__)
+
+
+@profile_handler("job:refresh_rates")
+async def refresh_rates(service: Service) -> None:
+    """
+    Fetches the latest exchange rates and publishes a new rate table.
+
+    Parameters
+    ----------
+    service : Service
+        The service
+    """
+    log.info("Running rate refresh")
+    await service.currency.refresh_rates()
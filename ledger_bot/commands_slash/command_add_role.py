@@ -17,7 +17,7 @@ log = logging.getLogger(__name__)
 
 @register_help_command(
     command="add_role",
-    args=["role", "emoji", "message_id"],
+    args=["role", "emoji", "message_id", "optional: channel, default: this channel"],
     description="Add a new role reaction. Emoji is the reaction users will user to add the role, message_id is the id of the message they will react against.",
     requires_admin=True,
 )
@@ -27,6 +27,7 @@ async def command_add_role(
     role: discord.Role,
     emoji: str,
     message_id: int,
+    channel: discord.TextChannel | None = None,
 ) -> None:
     """Add a role to the reactions database."""
     log.debug(
@@ -85,10 +86,13 @@ async def command_add_role(
     stored_record = await client.service.reaction_role.save_reaction_role(reaction_role)
 
     # Add reaction to target message
+    if channel is None and isinstance(interaction.channel, discord.TextChannel):
+        channel = interaction.channel
     await add_reaction(
         client=client,
         message_id=stored_record.message_id,
         reaction=stored_record.reaction_name,
+        channel_obj=channel,
     )
 
     log.info("Clearing caches")
@@ -7,6 +7,7 @@ import discord
 
 from ledger_bot.core import register_help_command
 from ledger_bot.LedgerBot import LedgerBot
+from ledger_bot.routing_table import ChannelHandler, channel_key
 
 log = logging.getLogger(__name__)
 
@@ -17,23 +18,11 @@ async def command_hello(
     interaction: discord.Interaction[Any],
 ) -> None:
     """Says hello."""
-    if isinstance(interaction.channel, discord.channel.TextChannel):
-        channel_name = interaction.channel.name
-    else:
-        channel_name = "DM"
-
-    if channel_name not in client.config.channels.include:
-        log.info(
-            f"Ignoring slash command from {interaction.user.name} in {channel_name}  - Channel not in include list"
-        )
-        await interaction.response.send_message(
-            content=f"{client.config.name} is not available in this channel.",
-            ephemeral=True,
-        )
-        return
-    elif channel_name in client.config.channels.exclude:
+    if not client.routes.allows(
+        channel_key(interaction.channel), ChannelHandler.TRANSACTIONS
+    ):
         log.info(
-            f"Ignoring slash command from {interaction.user.name} in {channel_name}  - Channel in exclude list"
+            f"Ignoring slash command from {interaction.user.name} in {interaction.channel}  - Channel not routed to transactions"
         )
         await interaction.response.send_message(
             content=f"{client.config.name} is not available in this channel.",
@@ -7,6 +7,7 @@ import discord
 
 from ledger_bot.core import register_help_command
 from ledger_bot.message_generators import generate_help_message
+from ledger_bot.routing_table import ChannelHandler, channel_key
 
 if TYPE_CHECKING:
     from ledger_bot.LedgerBot import LedgerBot
@@ -20,14 +21,9 @@ async def command_help(
     interaction: discord.Interaction[Any],
 ) -> None:
     """Return a help message."""
-    if isinstance(interaction.channel, discord.channel.TextChannel):
-        channel_name = interaction.channel.name
-    else:
-        channel_name = "DM"
-
-    if channel_name in client.config.channels.exclude:
+    if not client.routes.allows(channel_key(interaction.channel), ChannelHandler.HELP):
         log.info(
-            f"Ignoring slash command from {interaction.user.name} in {channel_name}  - Channel in exclude list"
+            f"Ignoring slash command from {interaction.user.name} in {interaction.channel}  - Channel not routed to help"
         )
         await interaction.response.send_message(
             content=f"{client.config.name} is not available in this channel.",
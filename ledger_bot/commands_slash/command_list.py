@@ -7,7 +7,7 @@ import discord
 
 from ledger_bot.core import register_help_command
 from ledger_bot.errors import AirTableError
-from ledger_bot.message_generators import generate_list_message
+from ledger_bot.views import TransactionListView
 
 if TYPE_CHECKING:
     from ledger_bot.LedgerBot import LedgerBot
@@ -17,7 +17,7 @@ log = logging.getLogger(__name__)
 
 @register_help_command(
     command="list",
-    description="Returns a list of your transactions",
+    description="Returns a list of your transactions, a page at a time",
 )
 async def command_list(
     client: "LedgerBot",
@@ -28,8 +28,7 @@ async def command_list(
         f"Getting transactions for user {interaction.user.name} ({interaction.user.id})"
     )
 
-    # Discord Interactions need to be responded to in <3s or they time out.
-    # Depending on the number of transactions a user has, we could take longer, so defer the interaction.
+    # Discord Interactions need to be responded to in <3s or they time out, so defer the interaction.
     await interaction.response.defer(ephemeral=True)
 
     try:
@@ -38,36 +37,12 @@ async def command_list(
                 interaction.user, session=session
             )
 
-            await session.refresh(
-                member, attribute_names=["buying_transactions", "selling_transactions"]
-            )
-
-            buy_transactions = member.buying_transactions
-            sell_transactions = member.selling_transactions
-
-            transactions = buy_transactions + sell_transactions
-
-            # Load bot_messages for each transaction
-            for tx in transactions:
-                await session.refresh(
-                    tx, attribute_names=["seller", "buyer", "bot_messages"]
-                )
+        view = TransactionListView(client=client, requestor=member)
+        content = await view.load()
 
     except AirTableError as error:
         log.error(f"There was an error processing the AirTable request: {error}")
-        await interaction.response.send_message(
-            "An unexpected error occured.", ephemeral=True
-        )
+        await interaction.followup.send("An unexpected error occured.", ephemeral=True)
         return
 
-    if transactions is None:
-        await interaction.response.send_message("You don't have any transactions.")
-    else:
-        response = await generate_list_message(
-            transactions=transactions,
-            user_id=member.discord_id,
-            service=client.service,
-        )
-
-        for transmit_message in response:
-            await interaction.followup.send(transmit_message, ephemeral=True)
+    await interaction.followup.send(content, view=view, ephemeral=True)
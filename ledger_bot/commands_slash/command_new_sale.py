@@ -11,6 +11,7 @@ from ledger_bot.errors import AirTableError
 from ledger_bot.LedgerBot import LedgerBot
 from ledger_bot.message_generators import generate_transaction_status_message
 from ledger_bot.models import Transaction
+from ledger_bot.routing_table import ChannelHandler, channel_key
 
 log = logging.getLogger(__name__)
 
@@ -29,23 +30,11 @@ async def command_new_sale(
     currency_code: str = "GBP",
 ) -> None:
     """Add transaction to Airtable."""
-    if isinstance(interaction.channel, discord.channel.TextChannel):
-        channel_name = interaction.channel.name
-    else:
-        channel_name = "DM"
-
-    if channel_name not in client.config.channels.include:
-        log.info(
-            f"Ignoring slash command from {interaction.user.name} in {channel_name}  - Channel not in include list"
-        )
-        await interaction.response.send_message(
-            content=f"{client.config.name} is not available in this channel.",
-            ephemeral=True,
-        )
-        return
-    elif channel_name in client.config.channels.exclude:
+    if not client.routes.allows(
+        channel_key(interaction.channel), ChannelHandler.TRANSACTIONS
+    ):
         log.info(
-            f"Ignoring slash command from {interaction.user.name} in {channel_name}  - Channel in exclude list"
+            f"Ignoring slash command from {interaction.user.name} in {interaction.channel}  - Channel not routed to transactions"
         )
         await interaction.response.send_message(
             content=f"{client.config.name} is not available in this channel.",
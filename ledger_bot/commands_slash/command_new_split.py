@@ -13,6 +13,7 @@ from ledger_bot.message_generators import (
     send_message,
 )
 from ledger_bot.models import Transaction
+from ledger_bot.routing_table import ChannelHandler, channel_key
 
 log = logging.getLogger(__name__)
 
@@ -42,23 +43,11 @@ async def command_new_split(
     """Add transaction to Airtable."""
     log.debug(f"Processing command {interaction.command}")
 
-    if isinstance(interaction.channel, discord.channel.TextChannel):
-        channel_name = interaction.channel.name
-    else:
-        channel_name = "DM"
-
-    if channel_name not in client.config.channels.include:
-        log.info(
-            f"Ignoring slash command from {interaction.user.name} in {channel_name}  - Channel not in include list"
-        )
-        await interaction.response.send_message(
-            content=f"{client.config.name} is not available in this channel.",
-            ephemeral=True,
-        )
-        return
-    elif channel_name in client.config.channels.exclude:
+    if not client.routes.allows(
+        channel_key(interaction.channel), ChannelHandler.TRANSACTIONS
+    ):
         log.info(
-            f"Ignoring slash command from {interaction.user.name} in {channel_name}  - Channel in exclude list"
+            f"Ignoring slash command from {interaction.user.name} in {interaction.channel}  - Channel not routed to transactions"
         )
         await interaction.response.send_message(
             content=f"{client.config.name} is not available in this channel.",
@@ -164,6 +153,7 @@ async def command_new_split(
             previous_message_id=None,
             service=client.service,
             config=client.config,
+            outbound=client.outbound,
         )
 
         count += 1
@@ -1,7 +1,7 @@
 """Register our slash commands with Discord."""
 
 import logging
-from typing import Any
+from typing import Any, Optional
 
 import discord
 from discord import app_commands
@@ -200,12 +200,14 @@ def setup_slash(  # noqa C901
         role="The role to add to the database",
         emoji="The emoji for the reaction",
         message_id="The message to monitor for reactions.",
+        channel="The channel the message is in, if it isn't this one.",
     )
     async def add_role(
         interaction: discord.Interaction[Any],
         role: discord.Role,
         emoji: str,
         message_id: str,
+        channel: Optional[discord.TextChannel] = None,
     ) -> None:
         """Add a role to the reactions database."""
         log.info(f"Recognised command: /add_role from {interaction.user.name}")
@@ -215,6 +217,7 @@ def setup_slash(  # noqa C901
             role=role,
             emoji=emoji,
             message_id=int(message_id),
+            channel=channel,
         )
 
     @add_role.error
@@ -54,6 +54,75 @@ class JobSchedule:
     second: str | int = 0
 
 
+@dataclass
+class DatabaseConfig:
+    # Applied as PRAGMAs to every new SQLite connection
+    journal_mode: str = "wal"
+    synchronous: str = "normal"
+    busy_timeout: int = 5000  # milliseconds
+    cache_size: int = -16000  # negative values are KiB, so 16MB per connection
+    mmap_size: int = 134217728  # bytes
+    temp_store: str = "memory"
+
+    # Connection pool
+    pool_size: int = 5
+    max_overflow: int = 5
+    pool_timeout: int = 30  # seconds
+
+
+@dataclass
+class MemberCacheConfig:
+    maxsize: int = 512
+    ttl: int = 600  # seconds
+
+
+@dataclass
+class ExchangeRateConfig:
+    base_url: str = "https://v6.exchangerate-api.com/v6"
+    connect_timeout: float = 2.0  # seconds
+    timeout: float = 5.0  # seconds, for each attempt as a whole
+    max_connections: int = 4
+
+    # Retries back off exponentially from retry_backoff, up to retry_backoff_max
+    retries: int = 2
+    retry_backoff: float = 0.5  # seconds
+    retry_backoff_max: float = 4.0  # seconds
+
+    # After this many failed requests in a row, stop calling the API for circuit_reset_after
+    circuit_failure_threshold: int = 3
+    circuit_reset_after: float = 300.0  # seconds
+
+
+@dataclass
+class OutboundConfig:
+    # Requests a second and burst size allowed on each route, e.g. each channel's messages
+    message_rate: float = 1.0
+    message_burst: int = 5
+    reaction_rate: float = 4.0
+    reaction_burst: int = 1
+    dm_rate: float = 1.0
+    dm_burst: int = 5
+
+    # Cosmetic requests are dropped once this many requests are waiting on their route
+    max_route_backlog: int = 5
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = False
+    host: str = "0.0.0.0"  # nosec B104
+    port: int = 80  # docker-compose.yml publishes this as 8080
+
+
+@dataclass
+class EventQueueConfig:
+    workers: int = 4  # Events processed at once
+    max_queued: int = 500  # Events waiting to be processed
+
+    # What to do with an event when the queue is full, either "wait" for space or "drop" it
+    overflow: str = "wait"
+
+
 @dataclass
 class Config:
     bot_id: str = "Bot"
@@ -61,12 +130,23 @@ class Config:
     guild: int = 0
     watching_status: str = "for empty glasses"
     delete_previous_bot_messages: bool = True
+    edit_status_messages: bool = (
+        False  # Edit a transaction's status message in place, rather than reposting it
+    )
+    status_render_delay: float = (
+        1.5  # Seconds to wait for more reactions before posting a transaction's status
+    )
     cleanup_delay_hours: int = (
         24  # How many hours must have passed between a transaction being completed and it being cleaned
     )
     cleanup_removes_transaction_records: bool = False
     admin_role: int = 1184878800408948847
     database_path: Path = Path("data/ledger_bot.sql")
+    database: DatabaseConfig = field(default_factory=DatabaseConfig)
+    member_cache: MemberCacheConfig = field(default_factory=MemberCacheConfig)
+    sync_members_on_ready: bool = False
+    member_sync_chunk_size: int = 500
+    list_page_size: int = 8  # Transactions on each page of /list
     shutdown_post_channel: int | None = None
     shutdown_delay: int = (
         5  # Time in minutes to wait after receiving a shutdown command
@@ -93,8 +173,19 @@ class Config:
     reaction_role_refresh_time: JobSchedule = field(
         default_factory=lambda: JobSchedule(hour="*", minute="*/30", second=0)
     )
+    perf_summary_time: JobSchedule = field(
+        default_factory=lambda: JobSchedule(hour="*", minute=0, second=0)
+    )
     base_currency: str = "GBP"
+    exchange_rates: ExchangeRateConfig = field(default_factory=ExchangeRateConfig)
+    outbound: OutboundConfig = field(default_factory=OutboundConfig)
+    events: EventQueueConfig = field(default_factory=EventQueueConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    message_location_cache_size: int = 10000  # Messages whose channel is remembered
     currency_rate_update_delta: timedelta = timedelta(days=1)
+    currency_rate_refresh_time: JobSchedule = field(
+        default_factory=lambda: JobSchedule(hour=0, minute=5, second=0)
+    )
     id_offset: int = 0
 
     @classmethod
@@ -1,25 +1,266 @@
 """Setup Database."""
 
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Tuple
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
 
 from .core import Config
+from .core.config import DatabaseConfig
 
 log = logging.getLogger(__name__)
 
+JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SYNCHRONOUS_MODES = ("off", "normal", "full", "extra")
+TEMP_STORES = ("default", "file", "memory")
+
+# Statements issued outside of any profiled handler, e.g. during startup
+UNTRACKED_HANDLER = "untracked"
+
+
+@dataclass(slots=True)
+class HandlerStats:
+    """The statements issued by a single handler, summed across its invocations."""
+
+    invocations: int = 0
+    statements: int = 0
+    rows: int = 0
+    sql_time: float = 0.0
+    wall_time: float = 0.0
+    max_statements: int = 0
+
+    @property
+    def statements_per_invocation(self) -> float:
+        return self.statements / self.invocations if self.invocations else 0.0
+
+
+@dataclass(slots=True)
+class _Invocation:
+    handler: str
+    started: float
+    statements: int = 0
+
+
+class QueryProfiler:
+    """Attributes every SQL statement to the Discord handler that issued it.
+
+    Handlers are tracked per asyncio task with a ContextVar, so concurrent events
+    are counted separately. Statement counts, rows returned (or affected) and
+    SQL time are collected from engine events.
+
+    `stats` are since the last reset, `totals` since the bot started. Only the
+    totals are exported as metrics, as a counter must never go down.
+    """
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, HandlerStats] = {}
+        self.totals: Dict[str, HandlerStats] = {}
+        self.since = datetime.now(timezone.utc)
+        self._current: ContextVar[_Invocation | None] = ContextVar(
+            "profiled_handler", default=None
+        )
+
+    def attach(self, engine: Engine) -> None:
+        """Listen for the statements executed by an engine."""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def start(self, handler: str) -> None:
+        """Attribute statements to `handler` until the current task finishes.
+
+        For handlers whose end we can't wrap, such as app commands which are
+        invoked by discord.py after `CommandTree.interaction_check`.
+        """
+        task = asyncio.current_task()
+        if task is None or self._current.get() is not None:
+            return
+
+        invocation = _Invocation(handler=handler, started=time.perf_counter())
+        self._current.set(invocation)
+        task.add_done_callback(lambda _: self._finish(invocation))
+
+    @asynccontextmanager
+    async def profile(self, handler: str) -> AsyncIterator[None]:
+        """Attribute statements to `handler` for the duration of the block.
+
+        Can also be used as a decorator. If a handler is already being profiled,
+        statements stay attributed to it.
+        """
+        if self._current.get() is not None:
+            yield
+            return
+
+        invocation = _Invocation(handler=handler, started=time.perf_counter())
+        token = self._current.set(invocation)
+        try:
+            yield
+        finally:
+            self._current.reset(token)
+            self._finish(invocation)
+
+    def reset(self) -> None:
+        """Clear all collected stats, except the totals."""
+        self.stats = {}
+        self.since = datetime.now(timezone.utc)
+
+    def summary(self, limit: int = 15) -> List[str]:
+        """Get a line per handler, busiest first."""
+        handlers = sorted(
+            self.stats.items(), key=lambda item: item[1].statements, reverse=True
+        )
+
+        lines = []
+        for handler, stats in handlers[:limit]:
+            calls = stats.invocations or 1
+            lines.append(
+                f"{handler}: {stats.invocations} calls, "
+                f"{stats.statements} queries ({stats.statements_per_invocation:.1f}/call, max {stats.max_statements}), "
+                f"{stats.rows} rows, "
+                f"sql {stats.sql_time * 1000 / calls:.1f}ms/call, "
+                f"wall {stats.wall_time * 1000 / calls:.1f}ms/call"
+            )
+        return lines
+
+    def _handler_stats(self, handler: str) -> Tuple[HandlerStats, HandlerStats]:
+        """Get the handler's stats since the last reset, and its totals."""
+        if handler not in self.stats:
+            self.stats[handler] = HandlerStats()
+        if handler not in self.totals:
+            self.totals[handler] = HandlerStats()
+        return self.stats[handler], self.totals[handler]
+
+    def _finish(self, invocation: _Invocation) -> None:
+        wall_time = time.perf_counter() - invocation.started
+        for stats in self._handler_stats(invocation.handler):
+            stats.invocations += 1
+            stats.wall_time += wall_time
+            stats.max_statements = max(stats.max_statements, invocation.statements)
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+        # The async drivers buffer a SELECT's rows on the cursor before this event fires
+        rows = 0
+        if cursor.description is not None:
+            rows = len(getattr(cursor, "_rows", ()))
+        elif cursor.rowcount > 0:
+            rows = cursor.rowcount
+
+        invocation = self._current.get()
+        for stats in self._handler_stats(
+            invocation.handler if invocation else UNTRACKED_HANDLER
+        ):
+            stats.statements += 1
+            stats.sql_time += elapsed
+            stats.rows += rows
+
+        if invocation is not None:
+            invocation.statements += 1
+
+
+profiler = QueryProfiler()
+
+
+class LedgerSession(Session):
+    """The sync session behind the bot's `AsyncSession`s.
+
+    ORM session events are listened for on this class, so they only apply to the bot's sessions.
+    """
+
+
+def profile_handler(handler: str):
+    """Attribute the statements of a block or coroutine function to `handler`."""
+    return profiler.profile(handler)
+
+
+def build_pragmas(db_config: DatabaseConfig) -> List[str]:
+    """Build the PRAGMA statements for the configured connection profile.
+
+    Parameters
+    ----------
+    db_config : DatabaseConfig
+        The database config
+
+    Returns
+    -------
+    List[str]
+        The statements to run on each new connection
+
+    Raises
+    ------
+    ValueError
+        One of the configured modes isn't supported by SQLite
+    """
+    modes = {
+        "journal_mode": (db_config.journal_mode.lower(), JOURNAL_MODES),
+        "synchronous": (db_config.synchronous.lower(), SYNCHRONOUS_MODES),
+        "temp_store": (db_config.temp_store.lower(), TEMP_STORES),
+    }
+    for name, (value, allowed) in modes.items():
+        if value not in allowed:
+            raise ValueError(f"Unknown {name}: {value}")
+
+    return [
+        f"PRAGMA journal_mode={modes['journal_mode'][0]}",
+        f"PRAGMA synchronous={modes['synchronous'][0]}",
+        f"PRAGMA busy_timeout={int(db_config.busy_timeout)}",
+        f"PRAGMA cache_size={int(db_config.cache_size)}",
+        f"PRAGMA mmap_size={int(db_config.mmap_size)}",
+        f"PRAGMA temp_store={modes['temp_store'][0]}",
+    ]
+
+
+def apply_pragmas(engine: Engine, db_config: DatabaseConfig) -> None:
+    """Run the configured PRAGMAs on every connection the engine opens."""
+    pragmas = build_pragmas(db_config)
+
+    def on_connect(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    event.listen(engine, "connect", on_connect)
+
 
 def setup_database(config: Config):
     """Setup the database session factory."""
     db_path = f"sqlite+aiosqlite:///{config.database_path}"
+    db_config = config.database
 
     log.info(f"Setting up database: {db_path}")
-    engine = create_async_engine(db_path, connect_args={"check_same_thread": False})
+    log.info(f"Using connection profile: {db_config}")
+    engine = create_async_engine(
+        db_path,
+        connect_args={"check_same_thread": False},
+        pool_size=db_config.pool_size,
+        max_overflow=db_config.max_overflow,
+        pool_timeout=db_config.pool_timeout,
+    )
+    apply_pragmas(engine.sync_engine, db_config)
+    profiler.attach(engine.sync_engine)
 
     # Session factory
     session_factory = async_sessionmaker(
         engine,
         class_=AsyncSession,
+        sync_session_class=LedgerSession,
         autocommit=False,
         autoflush=False,
         expire_on_commit=False,
@@ -1,6 +1,12 @@
 """Additional exceptions."""
 
 from .airtable_error import AirTableError
+from .exchange_rate_errors import (
+    ExchangeRateError,
+    ExchangeRateRequestError,
+    ExchangeRateResponseError,
+    ExchangeRateUnavailableError,
+)
 from .service_errors import (
     BotMessageInvalidTransactionError,
     BotMessageServiceError,
@@ -46,4 +52,8 @@ __all__ = [
     "CurrencyAlreadyExistsError",
     "CurrencyCreationError",
     "CurrencyQueryError",
+    "ExchangeRateError",
+    "ExchangeRateRequestError",
+    "ExchangeRateResponseError",
+    "ExchangeRateUnavailableError",
 ]
@@ -0,0 +1,37 @@
+"""Errors relating to fetching exchange rates."""
+
+
+class ExchangeRateError(Exception):
+    """Base class for all exchange rate errors."""
+
+    pass
+
+
+class ExchangeRateRequestError(ExchangeRateError):
+    """The exchange rate API couldn't be reached, or didn't respond in time."""
+
+    pass
+
+
+class ExchangeRateResponseError(ExchangeRateError):
+    """The exchange rate API rejected the request."""
+
+    def __init__(self, error_type: str, *args: object):
+        self.error_type = error_type
+        super().__init__(error_type, *args)
+
+    def __str__(self) -> str:
+        return f"The exchange rate API returned an error: {self.error_type}"
+
+
+class ExchangeRateUnavailableError(ExchangeRateError):
+    """The circuit breaker is open, so the exchange rate API isn't being called."""
+
+    def __init__(self, retry_after: float, *args: object):
+        self.retry_after = retry_after
+        super().__init__(retry_after, *args)
+
+    def __str__(self) -> str:
+        return (
+            f"The exchange rate API is unavailable, retrying in {self.retry_after:.0f}s"
+        )
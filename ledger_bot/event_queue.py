@@ -0,0 +1,178 @@
+"""Processes gateway events on a bounded pool of workers."""
+
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Set
+
+from .core.config import EventQueueConfig
+from .outbound_scheduler import WaitStats
+
+log = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = {"wait", "drop"}
+
+
+@dataclass(slots=True)
+class _Event:
+    name: str
+    process: Callable[[], Awaitable[Any]]
+    key: Hashable | None
+    queued_at: float
+
+
+class EventQueue:
+    """Queues events for a fixed number of workers to process.
+
+    Events with the same ordering key are processed one at a time, in the order they were
+    queued; an event is held back while an earlier one with its key is being processed.
+    Once `max_queued` events are waiting, new events either wait for space or are dropped,
+    depending on the overflow policy.
+    """
+
+    def __init__(
+        self, config: EventQueueConfig, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if config.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {config.overflow}")
+
+        self.config = config
+        self._clock = clock
+        self._ready: asyncio.Queue[_Event] = asyncio.Queue()
+        self._held: Dict[Hashable, Deque[_Event]] = {}
+        self._active_keys: Set[Hashable] = set()
+        self._queued = 0
+        self._space = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+
+        # Metrics, keyed by event name
+        self.processed: Counter[str] = Counter()
+        self.dropped: Counter[str] = Counter()
+        self.failed: Counter[str] = Counter()
+        self.wait_times: Dict[str, WaitStats] = defaultdict(WaitStats)
+
+    def queue_depth(self) -> int:
+        """The number of events waiting to be processed."""
+        return self._queued
+
+    def summary(self) -> List[str]:
+        """Get a line per event name, with its wait times, then the queue depth."""
+        lines = []
+        for name in sorted({*self.wait_times, *self.dropped}):
+            waits = self.wait_times[name]
+            average = waits.total / waits.count if waits.count else 0.0
+            lines.append(
+                f"{name}: {self.processed[name]} processed, {self.failed[name]} failed, "
+                f"{self.dropped[name]} dropped, "
+                f"wait {average * 1000:.1f}ms avg, {waits.max * 1000:.1f}ms max"
+            )
+        lines.append(f"{self._queued} queued, {len(self._workers)} workers")
+        return lines
+
+    async def submit(
+        self,
+        name: str,
+        process: Callable[[], Awaitable[Any]],
+        key: Hashable | None = None,
+    ) -> bool:
+        """Queue an event to be processed.
+
+        Parameters
+        ----------
+        name : str
+            What kind of event it is, for the metrics, e.g. "reaction_add"
+        process : Callable[[], Awaitable[Any]]
+            Processes the event
+        key : Hashable | None, optional
+            Events with the same key are processed one at a time, in order, by default None
+
+        Returns
+        -------
+        bool
+            Whether the event was queued, rather than dropped because the queue is full
+        """
+        # Every submitter checks for space and takes it under the condition's lock, so a
+        # burst of submitters can't get past the check together, or ahead of those waiting
+        async with self._space:
+            if not self._has_space():
+                if self.config.overflow == "drop":
+                    log.warning(
+                        f"Dropping {name} event, {self._queued} events are queued"
+                    )
+                    self.dropped[name] += 1
+                    return False
+
+                await self._space.wait_for(self._has_space)
+
+            self._queued += 1
+
+        event = _Event(name=name, process=process, key=key, queued_at=self._clock())
+
+        if key is not None and key in self._active_keys:
+            self._held.setdefault(key, deque()).append(event)
+        else:
+            if key is not None:
+                self._active_keys.add(key)
+            self._ready.put_nowait(event)
+
+        self._start_workers()
+        return True
+
+    def _has_space(self) -> bool:
+        return self._queued < self.config.max_queued
+
+    def _start_workers(self) -> None:
+        # Started lazily, as the workers have to be created inside the running event loop
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self.config.workers)
+            ]
+
+    async def _work(self) -> None:
+        while True:
+            event = await self._ready.get()
+
+            self._queued -= 1
+            async with self._space:
+                self._space.notify()
+            self.wait_times[event.name].record(self._clock() - event.queued_at)
+
+            # Run as a task, so one failing event doesn't stop the worker
+            task: asyncio.Future[Any] = asyncio.ensure_future(event.process())
+            try:
+                await asyncio.wait([task])
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+
+            if task.cancelled():
+                self.failed[event.name] += 1
+            elif (error := task.exception()) is not None:
+                self.failed[event.name] += 1
+                log.error(f"Processing {event.name} event failed", exc_info=error)
+            else:
+                self.processed[event.name] += 1
+
+            self._release(event.key)
+
+    def _release(self, key: Hashable | None) -> None:
+        """Pass a key on to its next held event, if there is one."""
+        if key is None:
+            return
+
+        held = self._held.get(key)
+        if held:
+            self._ready.put_nowait(held.popleft())
+            if not held:
+                del self._held[key]
+        else:
+            self._active_keys.discard(key)
+
+    async def close(self) -> None:
+        """Stop the workers, dropping anything still queued."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
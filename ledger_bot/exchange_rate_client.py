@@ -0,0 +1,209 @@
+"""An async client for the https://exchangerate-api.com API."""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Callable, Dict
+
+import aiohttp
+
+from .core.config import ExchangeRateConfig
+from .errors import (
+    ExchangeRateRequestError,
+    ExchangeRateResponseError,
+    ExchangeRateUnavailableError,
+)
+
+log = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops calling a failing service for a while, then lets a single trial call through.
+
+    The circuit opens after `failure_threshold` failures in a row. Once `reset_after` seconds
+    have passed it is half-open: the next call is tried, closing the circuit if it succeeds
+    and opening it again if it fails.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_after: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._clock = clock
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at < self.reset_after:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> None:
+        """Check a call can be made.
+
+        Raises
+        ------
+        ExchangeRateUnavailableError
+            The circuit is open, or another call is already trying it
+        """
+        if self.opened_at is None:
+            return
+
+        retry_after = self.opened_at + self.reset_after - self._clock()
+        if retry_after > 0 or self._trial_running:
+            raise ExchangeRateUnavailableError(retry_after=max(retry_after, 0))
+
+        log.info("Circuit half-open, trying a call")
+        self._trial_running = True
+
+    def finish_call(self) -> None:
+        """Let another call try the circuit, however the last one ended.
+
+        A trial that's cancelled, or fails with an unexpected error, is neither a success
+        nor a failure, so it leaves the circuit half-open.
+        """
+        self._trial_running = False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            log.info("Circuit closed")
+
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+        if self._trial_running or self.failures >= self.failure_threshold:
+            log.warning(
+                f"Circuit opened after {self.failures} failures, retrying in {self.reset_after}s"
+            )
+            self.opened_at = self._clock()
+
+        self._trial_running = False
+
+
+class ExchangeRateClient:
+    """Fetches exchange rates without blocking the event loop.
+
+    Requests share a pooled `aiohttp.ClientSession`. Each attempt is time limited, failed
+    attempts are retried with exponential backoff, and a circuit breaker stops calls to the
+    API while it keeps failing.
+    """
+
+    def __init__(self, config: ExchangeRateConfig, api_key: str) -> None:
+        self.config = config
+        self.api_key = api_key
+        self.circuit = CircuitBreaker(
+            failure_threshold=config.circuit_failure_threshold,
+            reset_after=config.circuit_reset_after,
+        )
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily, as a session has to be created inside the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config.max_connections),
+                timeout=aiohttp.ClientTimeout(
+                    total=self.config.timeout, connect=self.config.connect_timeout
+                ),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def get_rates(self, base: str) -> Dict[str, float]:
+        """Get the conversion rates from one currency to every supported currency.
+
+        Parameters
+        ----------
+        base : str
+            The code of the currency to convert from
+
+        Returns
+        -------
+        Dict[str, float]
+            The value of one unit of `base` in each currency, keyed by currency code
+
+        Raises
+        ------
+        ExchangeRateUnavailableError
+            The circuit breaker is open
+        ExchangeRateRequestError
+            Every attempt to reach the API failed
+        ExchangeRateResponseError
+            The API responded with an error, e.g. for an unknown currency
+        """
+        payload = await self._get(f"latest/{base}")
+        return {code: float(rate) for code, rate in payload["conversion_rates"].items()}
+
+    async def _get(self, path: str) -> Dict[str, Any]:
+        """Get a successful response, going through the circuit breaker."""
+        self.circuit.before_call()
+
+        try:
+            payload = await self._get_with_retries(path)
+        except ExchangeRateRequestError:
+            self.circuit.record_failure()
+            raise
+        finally:
+            self.circuit.finish_call()
+
+        # The API answered, so it's up even if it didn't like the request
+        self.circuit.record_success()
+
+        if payload.get("result") != "success":
+            raise ExchangeRateResponseError(payload.get("error-type", "unknown"))
+
+        return payload
+
+    async def _get_with_retries(self, path: str) -> Dict[str, Any]:
+        session = self._get_session()
+        url = f"{self.config.base_url}/{self.api_key}/{path}"
+        error = ExchangeRateRequestError(f"No attempts made to get {path}")
+
+        for attempt in range(self.config.retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt))
+
+            try:
+                async with session.get(url) as response:
+                    if response.status >= 500 or response.status == 429:
+                        log.warning(
+                            f"Attempt {attempt + 1} to get {path} failed: HTTP {response.status}"
+                        )
+                        error = ExchangeRateRequestError(
+                            f"Getting {path} failed: HTTP {response.status}"
+                        )
+                        continue
+
+                    payload: Dict[str, Any] = await response.json(content_type=None)
+                    return payload
+
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                log.warning(f"Attempt {attempt + 1} to get {path} failed: {e!r}")
+                error = ExchangeRateRequestError(f"Getting {path} failed: {e!r}")
+
+        raise error
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(
+            self.config.retry_backoff * 2 ** (attempt - 1),
+            self.config.retry_backoff_max,
+        )
+        # Jittered, so retries from concurrent requests don't all land together
+        return random.uniform(delay / 2, delay)  # nosec B311
@@ -2,6 +2,7 @@
 
 from .generate_help_message import generate_help_message
 from .generate_list_message import generate_list_message
+from .generate_list_page_message import generate_list_page_message
 from .generate_reminder_status_message import generate_reminder_status_message
 from .generate_stats_message import generate_stats_message
 from .generate_transaction_status_message import generate_transaction_status_message
@@ -10,6 +11,7 @@ from .send_message import send_message
 __all__ = [
     "generate_help_message",
     "generate_list_message",
+    "generate_list_page_message",
     "generate_reminder_status_message",
     "generate_stats_message",
     "generate_transaction_status_message",
@@ -0,0 +1,62 @@
+"""Generates a message showing one page of a user's transactions."""
+
+import logging
+
+from ledger_bot.models import TransactionListPage
+
+log = logging.getLogger(__name__)
+
+# Long wine names are shortened, so a full page stays within a single message
+MAX_WINE_LENGTH = 50
+
+FILTER_TITLES = {
+    "all": "All transactions",
+    "open": "Open transactions",
+    "purchases": "Purchases",
+    "sales": "Sales",
+    "completed": "Completed transactions",
+    "cancelled": "Cancelled transactions",
+}
+
+
+def generate_list_page_message(
+    page: TransactionListPage, list_filter: str, page_number: int
+) -> str:
+    """
+    Generates formatted text for one page of a user's transaction list.
+
+    Parameters
+    ----------
+    page : TransactionListPage
+        The page, as returned by `TransactionService.get_member_transaction_page`
+    list_filter : str
+        The filter the page was listed with
+    page_number : int
+        The page's position in the list, starting from 1
+
+    Returns
+    -------
+    str
+        The text to be sent to the user
+    """
+    log.debug(f"Formatting page {page_number} of {list_filter} transactions")
+    title = FILTER_TITLES[list_filter]
+
+    if not page.rows:
+        noun = "transactions" if list_filter == "all" else title.lower()
+        return f"**{title}**\nYou don't have any {noun}."
+
+    lines = [f"**{title}** - page {page_number}"]
+    for row in page.rows:
+        wine = row.wine
+        if len(wine) > MAX_WINE_LENGTH:
+            wine = wine[: MAX_WINE_LENGTH - 1] + "…"
+
+        direction = "from" if row.role == "buying" else "to"
+        status = row.status.replace("_", " ").capitalize()
+        link = f" - {row.message_link}" if row.message_link else ""
+        lines.append(
+            f'- "{wine}" {direction} <@{row.other_party_discord_id}> for {row.symbol}{row.price:.2f} ({status}){link}'
+        )
+
+    return "\n".join(lines)
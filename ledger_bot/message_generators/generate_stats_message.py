@@ -1,8 +1,9 @@
 """Generates a message telling a user their stats."""
 
 import logging
+from typing import Optional
 
-from ledger_bot.models import Stats
+from ledger_bot.models import Member, Stats
 
 log = logging.getLogger(__name__)
 
@@ -17,6 +18,11 @@ def _pluralise_word(qty: int, word: str) -> str:
     return f"{word}s" if qty != 1 else word
 
 
+def _mention(member: Optional[Member]) -> str:
+    """Returns a mention of the member, if we still have their record."""
+    return f"<@{member.discord_id}>" if member is not None else "an unknown member"
+
+
 def generate_stats_message(stats: Stats) -> str:
     """Generate the message to send one someone uses the stats command."""
     if stats.server is None:
@@ -115,11 +121,11 @@ def generate_stats_message(stats: Stats) -> str:
 
     if stats.purchase:
         output += f"Your average purchase price is £{stats.purchase.avg_price:.2f}, and you've spent a total of £{stats.purchase.total_price:.2f}.\n"
-        output += f"Your most expensive purchase is *{stats.purchase.most_expensive_name}* which you bought from <@{stats.purchase.most_expensive_member.discord_id}> for £{stats.purchase.most_expensive_price:.2f}.\n"
+        output += f"Your most expensive purchase is *{stats.purchase.most_expensive_name}* which you bought from {_mention(stats.purchase.most_expensive_member)} for £{stats.purchase.most_expensive_price:.2f}.\n"
 
     if stats.sale:
         output += f"Your average sale price is £{stats.sale.avg_price:.2f}, and you've made a total of £{stats.sale.total_price:.2f}.\n"
-        output += f"Your most expensive sale is *{stats.sale.most_expensive_name}* which you sold to <@{stats.sale.most_expensive_member.discord_id}> for £{stats.sale.most_expensive_price:.2f}.\n"
+        output += f"Your most expensive sale is *{stats.sale.most_expensive_name}* which you sold to {_mention(stats.sale.most_expensive_member)} for £{stats.sale.most_expensive_price:.2f}.\n"
 
     if stats.server:
         log.debug(f"Percentage: {stats.user_percentage}")
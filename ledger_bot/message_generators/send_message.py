@@ -1,12 +1,15 @@
-"""Helper function to send a message, removing all previous messages."""
+"""Helper function to send a message, removing or editing the previous message."""
 
 import logging
+from typing import Any, Awaitable, Callable
 
 import discord
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ledger_bot.core import Config
 from ledger_bot.errors import AirTableError
 from ledger_bot.models import Transaction
+from ledger_bot.outbound_scheduler import OutboundScheduler, Priority
 from ledger_bot.services import Service
 
 log = logging.getLogger(__name__)
@@ -19,44 +22,117 @@ async def send_message(
     previous_message_id: int | None,
     service: Service,
     config: Config,
+    session: AsyncSession | None = None,
+    outbound: OutboundScheduler | None = None,
 ) -> None:
-    """Helper to send messages after updating transactions."""
+    """Helper to send messages after updating transactions.
+
+    Given an `outbound` scheduler, the Discord calls are queued as status updates on the
+    channel's messages route, ahead of DMs and cosmetic reactions.
+
+    With `edit_status_messages`, the previous message is edited in place, which is a single
+    REST call and leaves its bot_message record as it is. The message is only reposted if
+    the previous one is missing.
+
+    The bot_message records are only written once the Discord calls are finished, so a
+    unit of work passed as `session` doesn't hold the database's write lock across them.
+    """
+    previous_message_deleted = False
+    if config.edit_status_messages and previous_message_id is not None:
+        log.info(f"Editing message {previous_message_id}")
+        try:
+            await _request(
+                outbound,
+                channel,
+                lambda: channel.get_partial_message(previous_message_id).edit(
+                    content=response_contents
+                ),
+            )
+            return
+        except discord.NotFound as error:
+            log.warning(f"The message has been deleted, reposting it: {error}")
+            previous_message_deleted = True
+        except discord.Forbidden as error:
+            log.error(f"You don't have permission to edit that message: {error}")
+            return
+        except discord.HTTPException as error:
+            log.error(f"An error occured editing the message: {error}")
+            return
+
     log.info("Attempting to send message")
+    sent_message = None
     try:
-        sent_message = await channel.send(response_contents)
-        await service.bot_message.save_bot_message(
-            message=sent_message, transaction=target_transaction
+        sent_message = await _request(
+            outbound, channel, lambda: channel.send(response_contents)
         )
-
     except discord.Forbidden as error:
         log.error(f"You don't have permission to send to that channel: {error}")
     except discord.HTTPException as error:
         log.error(f"An error occured sending the message: {error}")
-    except AirTableError as error:
-        log.error(f"An error occured storing the content in AirTable: {error}")
 
-    if config.delete_previous_bot_messages and previous_message_id is not None:
+    if (
+        config.delete_previous_bot_messages
+        and previous_message_id is not None
+        and not previous_message_deleted
+    ):
         log.info("delete_previous_bot_messages is true")
-        log.info(f"Removing bot_message {previous_message_id}")
-        old_message = await channel.fetch_message(previous_message_id)
+        previous_message_deleted = await _request(
+            outbound, channel, lambda: _delete_message(channel, previous_message_id)
+        )
 
+    if sent_message is not None:
         try:
-            await old_message.delete()
-            previous_bot_message_record = (
-                await service.bot_message.get_bot_message_by_message_id(
-                    previous_message_id
-                )
+            await service.bot_message.save_bot_message(
+                message=sent_message, transaction=target_transaction, session=session
             )
-
-            if previous_bot_message_record is not None:
-                await service.bot_message.delete_bot_message(
-                    previous_bot_message_record
-                )
-        except discord.Forbidden as error:
-            log.error(f"You don't have permission to send to that channel: {error}")
-        except discord.NotFound as error:
-            log.error(f"The message has already been deleted: {error}")
-        except discord.HTTPException as error:
-            log.error(f"An error occured deleting the message: {error}")
         except AirTableError as error:
-            log.error(f"An error occured deleting the record in AirTable: {error}")
+            log.error(f"An error occured storing the content in AirTable: {error}")
+
+    if previous_message_deleted and previous_message_id is not None:
+        await _delete_bot_message_record(service, previous_message_id, session)
+
+
+async def _request(
+    outbound: OutboundScheduler | None,
+    channel,
+    send: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Make a request to the channel, through the outbound scheduler if there is one."""
+    if outbound is None:
+        return await send()
+    return await outbound.run(("messages", channel.id), Priority.STATUS, send)
+
+
+async def _delete_bot_message_record(
+    service: Service, message_id: int, session: AsyncSession | None
+) -> None:
+    """Delete the bot_message record of a message that's no longer in Discord."""
+    try:
+        bot_message_record = await service.bot_message.get_bot_message_by_message_id(
+            message_id, session=session
+        )
+
+        if bot_message_record is not None:
+            await service.bot_message.delete_bot_message(
+                bot_message_record, session=session
+            )
+    except AirTableError as error:
+        log.error(f"An error occured deleting the record in AirTable: {error}")
+
+
+async def _delete_message(channel, message_id: int) -> bool:
+    """Delete a previous bot message from Discord, returning whether it was deleted."""
+    log.info(f"Removing bot_message {message_id}")
+
+    # Deleted through a partial message, so it's a single REST call, without a fetch first
+    try:
+        await channel.get_partial_message(message_id).delete()
+        return True
+    except discord.Forbidden as error:
+        log.error(f"You don't have permission to send to that channel: {error}")
+    except discord.NotFound as error:
+        log.error(f"The message has already been deleted: {error}")
+    except discord.HTTPException as error:
+        log.error(f"An error occured deleting the message: {error}")
+
+    return False
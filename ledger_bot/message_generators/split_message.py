@@ -2,26 +2,88 @@
 
 import logging
 import re
-from typing import List
+from typing import Iterable, Iterator, List
 
 log = logging.getLogger(__name__)
 
+# Discord can't accept messages more than 2000 characters, this leaves some room to spare
+MAX_CHUNK_LENGTH = 1995
 
-def _split_text_on_newline(text: str, chunk_length: int) -> List[str]:
-    chunks = []
-    current_chunk = ""
+# Headings are either `**Text**` (a section) or `Text:` (a sub-section within it)
+HEADING_PATTERNS = (
+    re.compile(r"\*\*[A-Za-z ]+\*\*"),
+    re.compile(r"[A-Za-z ]+:"),
+)
 
-    for line in text.splitlines(True):
-        if len(current_chunk) + len(line) <= chunk_length:
-            current_chunk += line
-        else:
-            chunks.append(current_chunk)
-            current_chunk = line
 
-    if current_chunk:
-        chunks.append(current_chunk)
+def _heading_level(line: str) -> int:
+    """The depth of the heading on `line`, or 0 if it isn't a heading."""
+    for level, pattern in enumerate(HEADING_PATTERNS, start=1):
+        if pattern.fullmatch(line):
+            return level
+    return 0
 
-    return chunks
+
+def chunk_lines(
+    lines: Iterable[str], chunk_length: int = MAX_CHUNK_LENGTH
+) -> Iterator[str]:
+    """
+    Joins lines into chunks no longer than `chunk_length`, yielding each as it fills.
+
+    Lines are buffered in a list and joined once per chunk, so the work is linear in the
+    length of the content. When a section carries on into a new chunk, the new chunk starts
+    by repeating the headings the section is under.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the message, without line breaks
+    chunk_length : int, optional
+        The most characters in a chunk, by default MAX_CHUNK_LENGTH
+
+    Yields
+    ------
+    str
+        The messages to send
+    """
+    headings: List[str] = []
+    buffer: List[str] = []
+    length = -1  # The length of the buffer joined with line breaks
+
+    for line in lines:
+        level = _heading_level(line)
+        if level:
+            del headings[level - 1 :]
+
+        if buffer and length + 1 + len(line) > chunk_length:
+            yield "\n".join(buffer)
+
+            # Carry on under the current headings, unless there's no room for them
+            buffer = list(headings)
+            length = sum(len(heading) + 1 for heading in buffer) - 1
+            if length + 1 + len(line) > chunk_length:
+                buffer, length = [], -1
+
+        if level:
+            headings.append(line)
+
+        if not buffer and not line.strip():
+            # Don't start a chunk with blank lines
+            continue
+
+        # A single line too long for a message is split wherever it has to be
+        while len(line) > chunk_length:
+            if buffer:
+                yield "\n".join(buffer)
+                buffer, length = [], -1
+            yield line[:chunk_length]
+            line = line[chunk_length:]
+
+        buffer.append(line)
+        length += 1 + len(line)
+
+    if buffer:
+        yield "\n".join(buffer)
 
 
 def split_message(content: List) -> List[str]:
@@ -33,66 +95,12 @@ def split_message(content: List) -> List[str]:
     Parameters
     ----------
     content : List
-        A list containing the content to be sent. Initial split will be based on list items.
+        A list containing the content to be sent, joined with line breaks.
 
     Returns
     -------
     List[str]
         A list of messages to send
     """
-    total_length = (
-        sum(len(s) + 1 for s in content) - 1
-    )  # We add a line break between each section hence the +1 / -1
-    log.debug(f"Total length: {total_length}")
-
-    if total_length > 1995:
-        log.info(f"Splitting large message ({total_length} characters)")
-
-        output = []
-
-        for section in content:
-            if len(section) < 1995:
-                if len(section) != 0:
-                    output.append(section)
-            else:
-                # Further split section
-
-                # Remove first line
-                parts = section.split("\n", 1)
-                if len(parts) == 2:
-                    section_title = parts[0]
-                    section_content = parts[1]
-                else:
-                    section_title = parts[0]
-                    section_content = ""
-
-                log.debug(f"section_title:\n{section_title}")
-                log.debug(f"section_content:\n{section_content}")
-
-                # Split on section titles, where titles are either:
-                # `Text:``
-                # `**Text**`
-                sub_sections = re.split(
-                    r"(?<![^\n])\n(?=[A-Za-z ]+:|\*\*[A-Za-z ]+\*\*)", section_content
-                )
-
-                for i, sub_section in enumerate(sub_sections):
-
-                    log.debug(f"i: {i}")
-                    log.debug(f"new line count: {sub_section.count("\n")}")
-
-                    log.debug(f"{i}:\n{sub_section}")
-                    if i == 0:
-                        sub_section = section_title + "\n" + sub_section
-
-                    if len(sub_section) < 1995:
-                        output.append(sub_section)
-                    else:
-                        # Further split section
-                        split_sub_section = _split_text_on_newline(sub_section, 1995)
-                        output = output + split_sub_section
-
-    else:
-        output = ["\n".join(content)]
-
-    return output
+    lines = (line for section in content for line in section.split("\n"))
+    return list(chunk_lines(lines))
@@ -0,0 +1,315 @@
+"""Serves the bot's metrics over HTTP, in the Prometheus text format."""
+
+import logging
+import math
+import time
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Mapping, Tuple
+
+from aiohttp import web
+from apscheduler import events
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from .core.config import MetricsConfig
+from .database import profiler
+from .outbound_scheduler import WaitStats
+
+if TYPE_CHECKING:
+    from .LedgerBot import LedgerBot
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# A metric sample's labels and value
+Sample = Tuple[Mapping[str, str], float]
+
+
+class JobMetrics:
+    """Records how long the scheduler's jobs take, and how often they fail or misfire.
+
+    Jobs are labelled by name, without anything after a colon, so every "Reminder: <id>"
+    job is counted together.
+    """
+
+    def __init__(
+        self, scheduler: AsyncIOScheduler, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.scheduler = scheduler
+        self._clock = clock
+        self._started: Dict[Tuple[str, object], Tuple[str, float]] = {}
+
+        self.runs: Counter[Tuple[str, str]] = Counter()  # By job and outcome
+        self.misfires: Counter[str] = Counter()
+        self.durations: Dict[str, WaitStats] = defaultdict(WaitStats)
+
+        scheduler.add_listener(self.handle_submitted, events.EVENT_JOB_SUBMITTED)
+        scheduler.add_listener(
+            self.handle_finished, events.EVENT_JOB_EXECUTED | events.EVENT_JOB_ERROR
+        )
+        scheduler.add_listener(
+            self.handle_missed, events.EVENT_JOB_MISSED | events.EVENT_JOB_MAX_INSTANCES
+        )
+
+    def job_name(self, job_id: str) -> str:
+        job = self.scheduler.get_job(job_id)
+        return job.name.split(":")[0] if job is not None else job_id
+
+    def handle_submitted(self, event: events.JobSubmissionEvent) -> None:
+        name = self.job_name(event.job_id)
+        for run_time in event.scheduled_run_times:
+            self._started[(event.job_id, run_time)] = (name, self._clock())
+
+    def handle_finished(self, event: events.JobExecutionEvent) -> None:
+        started = self._started.pop((event.job_id, event.scheduled_run_time), None)
+        if started is None:
+            return
+
+        name, started_at = started
+        self.durations[name].record(self._clock() - started_at)
+        self.runs[(name, "error" if event.exception else "success")] += 1
+
+    def handle_missed(self, event: events.JobEvent) -> None:
+        self.misfires[self.job_name(event.job_id)] += 1
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class MetricsWriter:
+    """Builds a page of metrics in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+
+    def metric(
+        self, name: str, kind: str, description: str, samples: Iterable[Sample]
+    ) -> None:
+        """Add a counter or gauge, with a sample for each set of labels."""
+        self.lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+        self.lines += [
+            f"{name}{_format_labels(labels)} {_format_value(value)}"
+            for labels, value in samples
+        ]
+
+    def summary(
+        self,
+        name: str,
+        description: str,
+        label: str,
+        stats: Mapping[str, WaitStats],
+    ) -> None:
+        """Add the count, sum and max of some durations, labelled by `label`."""
+        self.lines += [f"# HELP {name} {description}", f"# TYPE {name} summary"]
+        for value, waits in stats.items():
+            labels = _format_labels({label: value})
+            self.lines.append(f"{name}_sum{labels} {_format_value(waits.total)}")
+            self.lines.append(f"{name}_count{labels} {waits.count}")
+        self.metric(
+            f"{name}_max",
+            "gauge",
+            f"The longest of {name}",
+            (({label: value}, waits.max) for value, waits in stats.items()),
+        )
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _write_handlers(writer: MetricsWriter) -> None:
+    # The profiler's totals, as its stats go back to zero when !dev perf resets them
+    for name, stat, description in [
+        ("handler_invocations_total", "invocations", "Calls"),
+        ("handler_seconds_total", "wall_time", "Time spent handling events"),
+        ("handler_sql_seconds_total", "sql_time", "Time spent running SQL"),
+        ("db_statements_total", "statements", "SQL statements issued"),
+        ("db_rows_total", "rows", "Rows returned or affected by SQL statements"),
+    ]:
+        writer.metric(
+            f"ledger_bot_{name}",
+            "counter",
+            f"{description}, by handler",
+            (
+                ({"handler": handler}, getattr(stats, stat))
+                for handler, stats in profiler.totals.items()
+            ),
+        )
+
+
+def _write_events(writer: MetricsWriter, client: "LedgerBot") -> None:
+    queue = client.events
+    outcomes = {
+        "processed": queue.processed,
+        "failed": queue.failed,
+        "dropped": queue.dropped,
+    }
+    writer.metric(
+        "ledger_bot_events_total",
+        "counter",
+        "Gateway events, by outcome",
+        (
+            ({"event": event, "outcome": outcome}, count)
+            for outcome, counts in outcomes.items()
+            for event, count in counts.items()
+        ),
+    )
+    writer.summary(
+        "ledger_bot_event_queue_wait_seconds",
+        "Time gateway events waited to be processed",
+        "event",
+        queue.wait_times,
+    )
+    writer.metric(
+        "ledger_bot_event_queue_depth",
+        "gauge",
+        "Gateway events waiting to be processed",
+        [({}, queue.queue_depth())],
+    )
+
+
+def _write_outbound(writer: MetricsWriter, client: "LedgerBot") -> None:
+    outbound = client.outbound
+    outcomes = {
+        "sent": outbound.sent,
+        "merged": outbound.merged,
+        "dropped": outbound.dropped,
+    }
+    writer.metric(
+        "ledger_bot_outbound_requests_total",
+        "counter",
+        "Requests to Discord's REST API, by outcome",
+        (
+            ({"priority": priority, "outcome": outcome}, count)
+            for outcome, counts in outcomes.items()
+            for priority, count in counts.items()
+        ),
+    )
+    writer.summary(
+        "ledger_bot_outbound_wait_seconds",
+        "Time requests to Discord waited for their rate limits",
+        "priority",
+        outbound.wait_times,
+    )
+    writer.metric(
+        "ledger_bot_outbound_queue_depth",
+        "gauge",
+        "Requests to Discord waiting to be sent",
+        (({"priority": p}, depth) for p, depth in outbound.queue_depth().items()),
+    )
+
+
+def _write_jobs(writer: MetricsWriter, jobs: JobMetrics) -> None:
+    writer.metric(
+        "ledger_bot_job_runs_total",
+        "counter",
+        "Scheduled job runs, by outcome",
+        (
+            ({"job": job, "outcome": outcome}, count)
+            for (job, outcome), count in jobs.runs.items()
+        ),
+    )
+    writer.summary(
+        "ledger_bot_job_duration_seconds",
+        "Time scheduled jobs took to run",
+        "job",
+        jobs.durations,
+    )
+    writer.metric(
+        "ledger_bot_job_misfires_total",
+        "counter",
+        "Scheduled job runs that were missed or skipped",
+        (({"job": job}, count) for job, count in jobs.misfires.items()),
+    )
+
+
+def _write_caches(writer: MetricsWriter, client: "LedgerBot") -> None:
+    member_cache = client.service.member.cache
+    lookups = {
+        "member": (member_cache.hits, member_cache.misses),
+        "message_location": (
+            client.message_location_lookups["hit"],
+            client.message_location_lookups["miss"],
+        ),
+    }
+    writer.metric(
+        "ledger_bot_cache_hits_total",
+        "counter",
+        "Cache lookups that found an entry",
+        (({"cache": cache}, hits) for cache, (hits, _) in lookups.items()),
+    )
+    writer.metric(
+        "ledger_bot_cache_misses_total",
+        "counter",
+        "Cache lookups that didn't find an entry",
+        (({"cache": cache}, misses) for cache, (_, misses) in lookups.items()),
+    )
+    writer.metric(
+        "ledger_bot_cache_hit_ratio",
+        "gauge",
+        "The share of cache lookups that found an entry",
+        (
+            ({"cache": cache}, hits / (hits + misses) if hits + misses else 0.0)
+            for cache, (hits, misses) in lookups.items()
+        ),
+    )
+
+
+def render_metrics(client: "LedgerBot") -> str:
+    """Get the bot's metrics, in the Prometheus text format."""
+    writer = MetricsWriter()
+    writer.metric(
+        "ledger_bot_gateway_latency_seconds",
+        "gauge",
+        "The latency between a gateway heartbeat and its acknowledgement",
+        [({}, client.latency)],
+    )
+    _write_handlers(writer)
+    _write_events(writer, client)
+    _write_outbound(writer, client)
+    _write_jobs(writer, client.job_metrics)
+    _write_caches(writer, client)
+    return writer.render()
+
+
+class MetricsServer:
+    """Serves `render_metrics` at /metrics, from inside the bot's event loop."""
+
+    def __init__(self, client: "LedgerBot", config: MetricsConfig) -> None:
+        self.client = client
+        self.config = config
+        self._runner: web.AppRunner | None = None
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=render_metrics(self.client).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.config.host, self.config.port).start()
+        log.info(f"Serving metrics on {self.config.host}:{self.config.port}")
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -3,20 +3,27 @@
 from . import (
     bot_message,
     currency,
+    currency_rate,
     event,
     event_member,
     event_wine,
     member,
     member_transaction_summary,
+    rate_table,
     reaction_role,
     reminder,
     stats,
+    stats_rollup,
     transaction,
+    transaction_list_page,
+    transaction_list_row,
 )
 
 Member = member.Member
 
 Transaction = transaction.Transaction
+TransactionListRow = transaction_list_row.TransactionListRow
+TransactionListPage = transaction_list_page.TransactionListPage
 BotMessage = bot_message.BotMessage
 Reminder = reminder.Reminder
 ReminderStatus = reminder.ReminderStatus
@@ -31,6 +38,11 @@ Stats = stats.Stats
 ServerStats = stats.ServerStats
 TransactionStats = stats.TransactionStats
 
+MemberStatsRollup = stats_rollup.MemberStatsRollup
+ServerStatsRollup = stats_rollup.ServerStatsRollup
+
 MemberTransactionSummary = member_transaction_summary.MemberTransactionSummary
 
 Currency = currency.Currency
+CurrencyRate = currency_rate.CurrencyRate
+RateTable = rate_table.RateTable
@@ -25,7 +25,7 @@ class BotMessage(Base):
     channel_id: Mapped[int] = mapped_column(Integer, nullable=False)
     guild_id: Mapped[int] = mapped_column(Integer, nullable=False)
     transaction_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("transactions.id"), nullable=False
+        Integer, ForeignKey("transactions.id"), nullable=False, index=True
     )
     creation_date: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now(timezone.utc)
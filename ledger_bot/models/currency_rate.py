@@ -0,0 +1,32 @@
+"""The data model for a record in the `currency_rates` table."""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+log = logging.getLogger(__name__)
+
+
+class CurrencyRate(Base):
+    """A rate fetched for a currency, kept as a history of the rates used."""
+
+    __tablename__ = "currency_rates"
+    __table_args__ = (
+        Index(
+            "ix_currency_rates_currency_code_recorded_at",
+            "currency_code",
+            "recorded_at",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(  # noqa: A003
+        Integer, primary_key=True, autoincrement=True
+    )
+    currency_code: Mapped[str] = mapped_column(String, ForeignKey("currencies.code"))
+    base_currency: Mapped[str] = mapped_column(String)
+    rate: Mapped[float] = mapped_column(Float)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,28 @@
+"""The Rate Table."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class RateTable:
+    """A read-only snapshot of the exchange rates from the base currency.
+
+    A refresh publishes a new table rather than changing this one, so readers can hold on
+    to a table without seeing it change under them.
+    """
+
+    base: str
+    rates: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
+    last_updated: Optional[datetime] = None
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "rates", MappingProxyType(dict(self.rates)))
+
+    def get(self, currency_code: str) -> Optional[float]:
+        """Get the rate for a currency, if it's known."""
+        if currency_code == self.base:
+            return 1.0
+        return self.rates.get(currency_code)
@@ -35,12 +35,14 @@ class Reminder(Base):
         Integer, ForeignKey("members.id"), nullable=False
     )
     transaction_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("transactions.id"), nullable=False
+        Integer, ForeignKey("transactions.id"), nullable=False, index=True
     )
     category: Mapped[Optional[ReminderStatus]] = mapped_column(
         Enum(ReminderStatus), nullable=True
     )
-    reminder_date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    reminder_date: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )
     creation_date: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now(timezone.utc)
     )
@@ -1,6 +1,7 @@
 """The stats object."""
 
 from dataclasses import dataclass
+from typing import Optional
 
 from .member import Member
 
@@ -19,7 +20,7 @@ class TransactionStats:
     total_count: int
 
     most_expensive_name: str
-    most_expensive_member: Member
+    most_expensive_member: Optional[Member]  # None if their record is missing
     most_expensive_price: float
 
 
@@ -0,0 +1,54 @@
+"""The data models for the `member_stats` and `server_stats` rollup tables.
+
+Both are kept up to date as transactions are flushed, see `ledger_bot.storage.stats_storage`.
+"""
+
+import logging
+from typing import Optional
+
+from sqlalchemy import Float, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+log = logging.getLogger(__name__)
+
+
+class MemberStatsRollup(Base):
+    """The totals for a member's transactions in one role, `buyer` or `seller`."""
+
+    __tablename__ = "member_stats"
+    __table_args__ = (Index("ix_member_stats_role_total_count", "role", "total_count"),)
+
+    member_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("members.id"), primary_key=True
+    )
+    role: Mapped[str] = mapped_column(String, primary_key=True)
+
+    unapproved: Mapped[int] = mapped_column(Integer, default=0)
+    approved: Mapped[int] = mapped_column(Integer, default=0)
+    paid: Mapped[int] = mapped_column(Integer, default=0)
+    delivered: Mapped[int] = mapped_column(Integer, default=0)
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+    cancelled: Mapped[int] = mapped_column(Integer, default=0)
+    total_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_price: Mapped[float] = mapped_column(Float, default=0)
+
+    # The member's first transaction in the role, to break ties between the top members
+    first_transaction_id: Mapped[Optional[int]] = mapped_column(Integer)
+    most_expensive_transaction_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("transactions.id", ondelete="SET NULL")
+    )
+
+
+class ServerStatsRollup(Base):
+    """The totals for every transaction in the server, in a single row."""
+
+    __tablename__ = "server_stats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # noqa: A003
+    total_count: Mapped[int] = mapped_column(Integer, default=0)
+    total_value: Mapped[float] = mapped_column(Float, default=0)
+    most_expensive_transaction_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("transactions.id", ondelete="SET NULL")
+    )
@@ -9,16 +9,26 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
+    and_,
+    case,
+    event,
+    func,
+    or_,
+    select,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, Mapper, mapped_column, relationship
+from sqlalchemy.sql import ColumnElement
 
 from .base import Base
+from .currency import Currency
 
 if TYPE_CHECKING:
     from .bot_message import BotMessage
-    from .currency import Currency
     from .member import Member
     from .reminder import Reminder
 
@@ -27,12 +37,19 @@ log = logging.getLogger(__name__)
 
 class Transaction(Base):
     __tablename__ = "transactions"
-    __table_args__ = (CheckConstraint("price >= 0", name="price_not_negative"),)
+    __table_args__ = (
+        CheckConstraint("price >= 0", name="price_not_negative"),
+        Index("ix_transactions_buyer_id_creation_date", "buyer_id", "creation_date"),
+        Index("ix_transactions_seller_id_creation_date", "seller_id", "creation_date"),
+        Index("ix_transactions_price", "price"),
+    )
 
     id: Mapped[int] = mapped_column(  # noqa: A003
         Integer, primary_key=True, autoincrement=True
     )
-    display_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    display_id: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True, index=True
+    )
     wine: Mapped[str] = mapped_column(String, nullable=False)
     price: Mapped[float] = mapped_column(Float, nullable=False)
     seller_id: Mapped[int] = mapped_column(
@@ -58,6 +75,8 @@ class Transaction(Base):
     currency_code: Mapped[str] = mapped_column(
         String, ForeignKey("currencies.code"), default="GBP"
     )
+    # The currency's rate when the transaction was created, so converted prices never change
+    exchange_rate: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     # Relationships
     seller: Mapped["Member"] = relationship(
@@ -82,16 +101,66 @@ class Transaction(Base):
         "Currency", foreign_keys=[currency_code], lazy="joined"
     )
 
-    @property
+    @hybrid_property
     def gbp_price(self) -> float:
-        """Return the price converted into GBP."""
-        if self.currency_code == "GBP":
-            price = self.price
+        """Return the price converted into GBP, at the rate when the transaction was created.
+
+        In a query this is a SQL expression, so converted prices can be summed, averaged and
+        ordered by in the database.
+        """
+        if self.currency_code == "GBP" or not self.exchange_rate:
+            return self.price
+
+        return self.price * self.exchange_rate
+
+    @gbp_price.inplace.expression
+    @classmethod
+    def _gbp_price_expression(cls) -> ColumnElement[float]:
+        return case(
+            (cls.currency_code == "GBP", cls.price),
+            # A missing or zero rate leaves the price unconverted, as above
+            else_=cls.price * func.coalesce(func.nullif(cls.exchange_rate, 0), 1),
+        )
+
+    @classmethod
+    def open_filter(cls) -> ColumnElement[bool]:
+        """Filter for transactions that are still waiting on the buyer or seller.
+
+        The comparisons are literals, so SQLite can match queries using this filter
+        to the partial `ix_transactions_open` index.
+        """
+        return and_(
+            cls.cancelled.is_(False),
+            or_(
+                cls.sale_approved.is_(False),
+                cls.buyer_paid.is_(False),
+                cls.seller_paid.is_(False),
+                cls.buyer_delivered.is_(False),
+                cls.seller_delivered.is_(False),
+            ),
+        )
 
-        else:
-            if self.currency.rate:
-                price = self.price * self.currency.rate
-            else:
-                price = self.price
 
-        return price
+Index(
+    "ix_transactions_open",
+    Transaction.creation_date,
+    sqlite_where=Transaction.open_filter(),
+)
+
+
+@event.listens_for(Transaction, "before_insert", propagate=True)
+def snapshot_exchange_rate(
+    mapper: Mapper, connection: Connection, transaction: Transaction
+) -> None:
+    """Snapshot the currency's current rate, for transactions created without one.
+
+    As a mapper event, this covers every way a transaction is created, including the
+    migration scripts. If the currency has no rate yet, the snapshot is left empty, and
+    filled in by the next rate refresh, see `CurrencyStorage.update_rates`.
+    """
+    if transaction.exchange_rate is not None or transaction.currency_code == "GBP":
+        return
+
+    transaction.exchange_rate = connection.scalar(
+        select(Currency.rate).where(Currency.code == transaction.currency_code)
+    )
@@ -0,0 +1,30 @@
+"""The Transaction List Page."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from .transaction_list_row import TransactionListRow
+
+
+@dataclass(frozen=True, slots=True)
+class TransactionListPage:
+    """One page of a member's transaction list, with where the neighbouring pages start."""
+
+    rows: Tuple[TransactionListRow, ...]
+    has_previous: bool = False
+    has_next: bool = False
+
+    @property
+    def first_key(self) -> Optional[Tuple[datetime, int]]:
+        """The `(creation_date, id)` of the first row, to fetch the previous page before."""
+        if not self.rows:
+            return None
+        return (self.rows[0].creation_date, self.rows[0].id)
+
+    @property
+    def last_key(self) -> Optional[Tuple[datetime, int]]:
+        """The `(creation_date, id)` of the last row, to fetch the next page after."""
+        if not self.rows:
+            return None
+        return (self.rows[-1].creation_date, self.rows[-1].id)
@@ -0,0 +1,54 @@
+"""The Transaction List Row."""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class TransactionListRow:
+    """The columns needed to list a transaction, from one member's point of view."""
+
+    id: int  # noqa: A003
+    creation_date: datetime
+    role: str  # "buying" or "selling"
+    wine: str
+    price: float
+    symbol: str
+    other_party_discord_id: int
+
+    sale_approved: bool
+    buyer_paid: bool
+    seller_paid: bool
+    buyer_delivered: bool
+    seller_delivered: bool
+    cancelled: bool
+
+    # The latest status message, if there is one
+    guild_id: Optional[int] = None
+    channel_id: Optional[int] = None
+    message_id: Optional[int] = None
+
+    @property
+    def status(self) -> str:
+        """The section of the list the transaction belongs in."""
+        is_paid = self.buyer_paid and self.seller_paid
+        is_delivered = self.buyer_delivered and self.seller_delivered
+
+        if self.cancelled:
+            return "cancelled"
+        if not self.sale_approved:
+            return "awaiting_approval"
+        if is_paid and is_delivered:
+            return "completed"
+        if is_paid:
+            return "awaiting_delivery"
+        if is_delivered:
+            return "awaiting_payment"
+        return "awaiting_payment_and_delivery"
+
+    @property
+    def message_link(self) -> Optional[str]:
+        if self.message_id is None:
+            return None
+        return f"https://discord.com/channels/{self.guild_id}/{self.channel_id}/{self.message_id}"
@@ -0,0 +1,286 @@
+"""Schedules the bot's outbound Discord requests by priority, within per-route rate limits."""
+
+import asyncio
+import itertools
+import logging
+import time
+from bisect import insort
+from collections import Counter
+from contextlib import suppress
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+from .core.config import OutboundConfig
+
+log = logging.getLogger(__name__)
+
+# A route is the kind of request and the id of what it's sent to, e.g. ("messages", channel_id)
+Route = Tuple[str, int]
+
+
+class Priority(IntEnum):
+    """The priority classes for outbound requests, most important first."""
+
+    STATUS = 0  # Transaction status messages
+    DM = 1  # Direct messages, e.g. reminders
+    COSMETIC = 2  # Reactions that only show what the bot is doing, e.g. ⏳
+
+
+class TokenBucket:
+    """Allows `rate` requests a second on average, in bursts of up to `capacity`."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def try_take(self) -> bool:
+        """Take a token, if one is available."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+@dataclass(slots=True)
+class WaitStats:
+    """How long requests waited in the queue before being sent."""
+
+    count: int = 0
+    total: float = 0.0  # seconds
+    max: float = 0.0  # noqa: A003  # seconds
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+
+
+@dataclass(order=True, slots=True)
+class _Request:
+    priority: int
+    sequence: int
+    route: Route = field(compare=False)
+    send: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    merge_key: Hashable | None = field(compare=False)
+    queued_at: float = field(compare=False)
+
+
+class OutboundScheduler:
+    """Sends outbound requests in priority order, within a token bucket for each route.
+
+    Requests are queued, and a dispatcher sends the most important request whose route has
+    a token available. Cosmetic requests are dropped when their route already has
+    `max_route_backlog` requests waiting, and a queued request with the same `merge_key`
+    as a new one is replaced by it.
+    """
+
+    def __init__(
+        self, config: OutboundConfig, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.config = config
+        self._clock = clock
+        self._queue: List[_Request] = []
+        self._buckets: Dict[Route, TokenBucket] = {}
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+        self._in_flight: Set[asyncio.Future[Any]] = set()
+
+        # Metrics, keyed by priority name
+        self.sent: Counter[str] = Counter()
+        self.dropped: Counter[str] = Counter()
+        self.merged: Counter[str] = Counter()
+        self.wait_times: Dict[str, WaitStats] = {
+            priority.name.lower(): WaitStats() for priority in Priority
+        }
+
+    def queue_depth(self) -> Dict[str, int]:
+        """The number of requests waiting to be sent, by priority."""
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for request in self._queue:
+            depth[Priority(request.priority).name.lower()] += 1
+        return depth
+
+    def summary(self) -> List[str]:
+        """Get a line per priority class, with its queue depth and wait times."""
+        depth = self.queue_depth()
+        lines = []
+        for name, waits in self.wait_times.items():
+            average = waits.total / waits.count if waits.count else 0.0
+            lines.append(
+                f"{name}: {depth[name]} queued, {self.sent[name]} sent, "
+                f"{self.merged[name]} merged, {self.dropped[name]} dropped, "
+                f"wait {average * 1000:.1f}ms avg, {waits.max * 1000:.1f}ms max"
+            )
+        return lines
+
+    def _bucket(self, route: Route) -> TokenBucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            rate, capacity = {
+                "messages": (self.config.message_rate, self.config.message_burst),
+                "reactions": (self.config.reaction_rate, self.config.reaction_burst),
+                "dm": (self.config.dm_rate, self.config.dm_burst),
+            }[route[0]]
+            bucket = self._buckets[route] = TokenBucket(rate, capacity, self._clock)
+        return bucket
+
+    async def run(
+        self,
+        route: Route,
+        priority: Priority,
+        send: Callable[[], Awaitable[Any]],
+        merge_key: Hashable | None = None,
+    ) -> Any:
+        """Queue a request and wait for it to be sent.
+
+        Parameters
+        ----------
+        route : Route
+            The kind of request and the id of what it's sent to, e.g. ("messages", channel_id)
+        priority : Priority
+            The request's priority class
+        send : Callable[[], Awaitable[Any]]
+            Makes the request
+        merge_key : Hashable | None, optional
+            Requests on the same route with the same key replace each other while they're
+            queued, by default None
+
+        Returns
+        -------
+        Any
+            The result of `send`, or None if the request was dropped or replaced
+        """
+        name = priority.name.lower()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        if merge_key is not None:
+            for queued in self._queue:
+                if queued.route == route and queued.merge_key == merge_key:
+                    log.debug(f"Replacing queued {name} request {merge_key} on {route}")
+                    queued.send = send
+                    if not queued.future.done():
+                        queued.future.set_result(None)
+                    queued.future = future
+                    self.merged[name] += 1
+                    return await future
+
+        if priority == Priority.COSMETIC:
+            backlog = sum(1 for queued in self._queue if queued.route == route)
+            if backlog >= self.config.max_route_backlog:
+                log.debug(f"Dropping {name} request on saturated route {route}")
+                self.dropped[name] += 1
+                return None
+
+        insort(
+            self._queue,
+            _Request(
+                priority=priority,
+                sequence=next(self._sequence),
+                route=route,
+                send=send,
+                future=future,
+                merge_key=merge_key,
+                queued_at=self._clock(),
+            ),
+        )
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+
+        return await future
+
+    def _send_ready(self) -> float | None:
+        """Send every queued request whose route has a token, returning the time until the next one does."""
+        next_token = None
+        blocked: Set[Route] = set()
+
+        for request in list(self._queue):
+            if request.future.done():
+                # Whoever queued it has stopped waiting
+                self._queue.remove(request)
+                continue
+
+            if request.route in blocked:
+                continue
+
+            bucket = self._bucket(request.route)
+            if not bucket.try_take():
+                # Keep the route's requests in priority order, by holding back the rest of them too
+                blocked.add(request.route)
+                wait = bucket.time_until_token()
+                next_token = wait if next_token is None else min(next_token, wait)
+                continue
+
+            self._queue.remove(request)
+            self._send(request)
+
+        return next_token
+
+    def _send(self, request: _Request) -> None:
+        name = Priority(request.priority).name.lower()
+        self.wait_times[name].record(self._clock() - request.queued_at)
+        self.sent[name] += 1
+
+        task: asyncio.Future[Any] = asyncio.ensure_future(request.send())
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+        task.add_done_callback(lambda task: self._resolve(request, task))
+
+    @staticmethod
+    def _resolve(request: _Request, task: asyncio.Future[Any]) -> None:
+        """Hand the outcome of a request to whoever queued it."""
+        if request.future.done():
+            return
+        if task.cancelled():
+            request.future.cancel()
+        elif (error := task.exception()) is not None:
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(task.result())
+
+    async def _dispatch(self) -> None:
+        while self._queue:
+            self._wakeup.clear()
+            delay = self._send_ready()
+            if not self._queue:
+                break
+
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+
+    async def close(self) -> None:
+        """Stop sending, cancelling anything still queued."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+
+        for request in self._queue:
+            request.future.cancel()
+        self._queue.clear()
+
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
@@ -1,17 +1,18 @@
 """Classing for managing Reminders."""
 
 import logging
-from datetime import datetime
-from typing import TYPE_CHECKING, List
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 
 import arrow
 import discord
-from apscheduler import events
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from .core import Config
+from .database import profile_handler
 from .message_generators import generate_reminder_status_message
 from .models import Reminder, Transaction
+from .outbound_scheduler import Priority
 from .services import Service
 
 if TYPE_CHECKING:
@@ -32,7 +33,6 @@ class ReminderManager:
         self.config = config
         self.scheduler = scheduler
         self.service = service
-        self.missed_job_ids: List[str] = []
         self.get_channel_func = None
 
         initial_refresh_time = arrow.utcnow().shift(minutes=1).datetime
@@ -47,22 +47,17 @@ class ReminderManager:
             next_run_time=initial_refresh_time,
         )
 
-        scheduler.add_listener(self.handle_scheduler_event, events.EVENT_JOB_MISSED)
-
     def set_client(self, client: "LedgerBot") -> None:
         self.client = client
 
-    def handle_scheduler_event(self, event: events.JobEvent) -> None:
-        """Handle events from scheduler."""
-        job = self.scheduler.get_job(event.job_id)
-        if job is not None and job.name.startswith("Reminder:"):
-            log.debug(f"Adding job {event.job_id} to missed_job_ids")
-            self.missed_job_ids.append(event.job_id)
-
+    @profile_handler("job:refresh_reminders")
     async def refresh_reminders(self) -> None:
-        """Creates jobs for all stored reminders."""
-        # Get all reminders as a list
-        reminders = await self.service.reminder.list_all_reminders()
+        """Creates jobs for all upcoming reminders."""
+        # Jobs scheduled in the past are missed rather than run, so there's no need to load old reminders.
+        # reminder_date is stored without its timezone, so allow a day either side of UTC.
+        reminders = await self.service.reminder.list_upcoming_reminders(
+            after=datetime.now(timezone.utc) - timedelta(days=1)
+        )
 
         for reminder in reminders:
             log.debug(f"reminder: {reminder}")
@@ -85,6 +80,7 @@ class ReminderManager:
 
         log.debug(f"Refreshed {len(reminders)} reminders")
 
+    @profile_handler("job:send_reminder")
     async def send_reminder(
         self, reminder_id: str, member_id: str, transaction_id: str, status: str
     ) -> None:
@@ -182,7 +178,13 @@ class ReminderManager:
 
             link = f"\n\n https://discord.com/channels/{latest_message.guild_id}/{latest_message.channel_id}/{latest_message.message_id}"
 
-        await user.send(f"This is your scheduled reminder.\n{status_message}{link}")
+        await self.client.outbound.run(
+            ("dm", user.id),
+            Priority.DM,
+            lambda: user.send(
+                f"This is your scheduled reminder.\n{status_message}{link}"
+            ),
+        )
 
     async def create_reminder(
         self,
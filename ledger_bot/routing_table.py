@@ -0,0 +1,124 @@
+"""Decides which handlers a gateway event could reach, without awaiting anything."""
+
+import logging
+from enum import IntFlag, auto
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, Optional
+
+import discord
+
+from .core.config import ChannelsConfig
+
+log = logging.getLogger(__name__)
+
+# Handles a transaction reaction, e.g. `TransactionsClient.process_reaction_approval`
+ReactionHandler = Callable[..., Awaitable[Any]]
+
+# Where DMs, and channels that aren't text channels, are routed. They're matched against
+# the channel lists by the name "DM".
+DM_CHANNEL = 0
+
+
+class ChannelHandler(IntFlag):
+    """The handlers a channel's events can be routed to."""
+
+    NONE = 0
+    # Sale messages, transaction reactions and the ledger commands
+    TRANSACTIONS = auto()
+    HELP = auto()  # /help
+
+
+class RoutingTable:
+    """Routes channel ids to the handlers allowed in them, and emoji to reaction handlers.
+
+    Channels are matched against `ChannelsConfig` by name once, when the table is built,
+    so events can be routed by channel id. The table is rebuilt from the guild's channels
+    when the guild becomes available, and a channel's entry is updated when it's created,
+    renamed or deleted.
+
+    A channel that isn't in the table yet, e.g. for an event that arrives before the table
+    is built, is looked up with `get_channel` and matched by name.
+    """
+
+    def __init__(
+        self,
+        config: ChannelsConfig,
+        get_channel: Callable[[int], Any] | None = None,
+    ) -> None:
+        self.include: FrozenSet[str] = frozenset(config.include)
+        self.exclude: FrozenSet[str] = frozenset(config.exclude)
+        self.channels: Dict[int, ChannelHandler] = {DM_CHANNEL: self.handlers_for("DM")}
+        self.emoji_handlers: Dict[str, ReactionHandler] = {}
+        self._get_channel = get_channel
+
+    def handlers_for(self, channel_name: str) -> ChannelHandler:
+        """Get the handlers allowed in a channel with the given name."""
+        if channel_name in self.exclude:
+            return ChannelHandler.NONE
+        if channel_name in self.include:
+            return ChannelHandler.TRANSACTIONS | ChannelHandler.HELP
+        return ChannelHandler.HELP
+
+    def rebuild(self, channels: Iterable[discord.abc.GuildChannel]) -> None:
+        """Replace the channel routes with those for `channels`."""
+        routes = {DM_CHANNEL: self.channels[DM_CHANNEL]}
+        for channel in channels:
+            if isinstance(channel, discord.TextChannel):
+                routes[channel.id] = self.handlers_for(channel.name)
+
+        self.channels = routes
+        transaction_channels = [
+            channel_id
+            for channel_id, handlers in routes.items()
+            if ChannelHandler.TRANSACTIONS in handlers
+        ]
+        log.info(f"Routing transactions in channels {transaction_channels}")
+
+    def update_channel(self, channel: discord.abc.GuildChannel) -> None:
+        """Add or update the routes for a created or renamed channel."""
+        if isinstance(channel, discord.TextChannel):
+            self.channels[channel.id] = self.handlers_for(channel.name)
+            log.debug(f"Routing {channel.name} to {self.channels[channel.id]!r}")
+
+    def remove_channel(self, channel_id: int) -> None:
+        """Remove the routes for a deleted channel."""
+        self.channels.pop(channel_id, None)
+
+    def register_reaction(self, emoji: str, handler: ReactionHandler) -> None:
+        """Route reactions with `emoji` in transaction channels to `handler`."""
+        self.emoji_handlers[emoji] = handler
+
+    def allows(self, channel_id: int, handler: ChannelHandler) -> bool:
+        """Whether events in a channel can be routed to `handler`.
+
+        Channels that aren't text channels aren't routed anywhere, so route them with
+        `channel_key`.
+        """
+        handlers = self.channels.get(channel_id)
+        if handlers is None:
+            handlers = self._route_unknown(channel_id)
+        return handler in handlers
+
+    def _route_unknown(self, channel_id: int) -> ChannelHandler:
+        """Route a channel that isn't in the table by name, if it's a known text channel."""
+        channel = self._get_channel(channel_id) if self._get_channel else None
+        if not isinstance(channel, discord.TextChannel):
+            log.debug(f"Dropping an event in unrouted channel {channel_id}")
+            return ChannelHandler.NONE
+
+        self.update_channel(channel)
+        return self.channels[channel_id]
+
+    def reaction_handler(
+        self, channel_id: int, emoji: Optional[str]
+    ) -> Optional[ReactionHandler]:
+        """Get the handler for a transaction reaction, if the emoji and channel have one."""
+        if emoji is None or not self.allows(channel_id, ChannelHandler.TRANSACTIONS):
+            return None
+        return self.emoji_handlers.get(emoji)
+
+
+def channel_key(channel: Any) -> int:
+    """Get the id to route a channel's events by."""
+    if isinstance(channel, discord.TextChannel):
+        return channel.id
+    return DM_CHANNEL
@@ -38,6 +38,7 @@ from .storage import (
     MemberStorage,
     ReactionRoleStorage,
     ReminderStorage,
+    StatsStorage,
     Storage,
     TransactionStorage,
 )
@@ -75,6 +76,7 @@ def start_bot() -> None:
         reminder=ReminderStorage(),
         reaction_role=ReactionRoleStorage(),
         currency=CurrencyStorage(),
+        stats=StatsStorage(),
     )
 
     # Create services
@@ -95,9 +97,7 @@ def start_bot() -> None:
         reaction_role=ReactionRoleService(
             storage.reaction_role, config, session_factory=db_session_factory
         ),
-        stats=StatsService(
-            storage.transaction, config, session_factory=db_session_factory
-        ),
+        stats=StatsService(storage.stats, config, session_factory=db_session_factory),
         currency=CurrencyService(
             storage.currency, config, session_factory=db_session_factory
         ),
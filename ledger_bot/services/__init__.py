@@ -3,10 +3,12 @@
 from . import (
     bot_message_service,
     currency_service,
+    member_cache,
     member_service,
     reaction_role_service,
     reminder_service,
     service,
+    service_helpers,
     stats_service,
     transaction_service,
 )
@@ -14,9 +16,12 @@ from . import (
 Service = service.Service
 
 MemberService = member_service.MemberService
+MemberCache = member_cache.MemberCache
 TransactionService = transaction_service.TransactionService
 BotMessageService = bot_message_service.BotMessageService
 ReminderService = reminder_service.ReminderService
 ReactionRoleService = reaction_role_service.ReactionRoleService
 StatsService = stats_service.StatsService
 CurrencyService = currency_service.CurrencyService
+
+unit_of_work = service_helpers.unit_of_work
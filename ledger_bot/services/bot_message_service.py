@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime, timezone
-from typing import List
+from typing import Dict, List
 
 from discord import Message
 from discord.interactions import InteractionMessage
@@ -28,6 +28,11 @@ class BotMessageService(ServiceHelpers):
         self.bot_message_storage = bot_message_storage
         self.config = config
 
+        # An in-memory index of discord message_id -> transaction_id, so reactions on
+        # unrelated messages can be rejected without touching the database.
+        self.message_index: Dict[int, int] = {}
+        self.message_index_loaded = False
+
         super().__init__(session_factory)
 
     async def get_bot_message(
@@ -103,7 +108,14 @@ class BotMessageService(ServiceHelpers):
             bot_message = await self.bot_message_storage.add_bot_message(
                 bot_message=bot_message, session=session
             )
-            await session.commit()
+            await self._commit(session)
+
+            self._after_commit(
+                session,
+                lambda: self.index_message(
+                    bot_message.message_id, bot_message.transaction_id
+                ),
+            )
             return bot_message
 
     async def get_bot_message_by_message_id(
@@ -148,7 +160,11 @@ class BotMessageService(ServiceHelpers):
             await self.bot_message_storage.delete_bot_message(
                 bot_message, session=session
             )
-            await session.commit()
+            await self._commit(session)
+
+            self._after_commit(
+                session, lambda: self.unindex_message(bot_message.message_id)
+            )
 
     async def get_bot_messages_by_transaction_id(
         self, transaction_id: int, session: AsyncSession | None = None
@@ -162,3 +178,58 @@ class BotMessageService(ServiceHelpers):
                 session=session,
             )
             return messages
+
+    async def load_message_index(self, session: AsyncSession | None = None) -> None:
+        """Load the message_id -> transaction_id index from the database.
+
+        Parameters
+        ----------
+        session : AsyncSession | None, optional
+            An optional session, by default None
+        """
+        async with self._get_session(session) as session:
+            self.message_index = (
+                await self.bot_message_storage.list_message_transaction_ids(
+                    session=session
+                )
+            )
+            self.message_index_loaded = True
+
+        log.info(f"Indexed {len(self.message_index)} bot messages")
+
+    def get_indexed_transaction_id(self, message_id: int) -> int | None:
+        """Get the transaction id for a message from the in-memory index.
+
+        Parameters
+        ----------
+        message_id : int
+            The discord message_id
+
+        Returns
+        -------
+        int | None
+            The transaction id, or None if the message isn't a bot message
+        """
+        return self.message_index.get(message_id)
+
+    def index_message(self, message_id: int, transaction_id: int) -> None:
+        """Add a message to the in-memory index.
+
+        Parameters
+        ----------
+        message_id : int
+            The discord message_id
+        transaction_id : int
+            The id of the transaction the message is for
+        """
+        self.message_index[message_id] = transaction_id
+
+    def unindex_message(self, message_id: int) -> None:
+        """Remove a message from the in-memory index.
+
+        Parameters
+        ----------
+        message_id : int
+            The discord message_id
+        """
+        self.message_index.pop(message_id, None)
@@ -4,12 +4,13 @@ import logging
 from datetime import datetime, timezone
 from typing import List
 
-import requests
 from currency_symbols import CurrencySymbols  # type: ignore
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from ledger_bot.core import Config
-from ledger_bot.models import Currency
+from ledger_bot.errors import ExchangeRateError
+from ledger_bot.exchange_rate_client import ExchangeRateClient
+from ledger_bot.models import Currency, RateTable
 from ledger_bot.storage import CurrencyStorage
 
 from .service_helpers import ServiceHelpers
@@ -23,9 +24,16 @@ class CurrencyService(ServiceHelpers):
         currency_storage: CurrencyStorage,
         config: Config,
         session_factory: async_sessionmaker[AsyncSession],
+        exchange_rate_client: ExchangeRateClient | None = None,
     ):
         self.currency_storage = currency_storage
         self.config = config
+        self.exchange_rates = exchange_rate_client or ExchangeRateClient(
+            config.exchange_rates, config.authentication.exchangerate_api
+        )
+
+        # Replaced as a whole on each refresh, so it's safe to read without waiting
+        self.rates = RateTable(base=config.base_currency)
 
         super().__init__(session_factory)
 
@@ -36,6 +44,8 @@ class CurrencyService(ServiceHelpers):
     ) -> Currency:
         """Fetches an existing currency or adds a new record for it.
 
+        Rates come from the published rate table, so this never waits on the exchange rate API.
+
         Parameters
         ----------
         currency_code: Currency | str
@@ -59,87 +69,122 @@ class CurrencyService(ServiceHelpers):
                 )
                 return
 
-            currencies = await self.currency_storage.list_currencies(
-                Currency.code == currency_code, session=session
+            currency_object = Currency(
+                code=currency_code,
+                symbol=CurrencySymbols.get_symbol(currency_code),
+                rate=self.rates.get(currency_code),
+                last_updated=self.rates.last_updated or datetime.now(timezone.utc),
+                bot_id=self.config.bot_id,
             )
 
-            if currencies:
-                currency_record = currencies[0]
-                log.debug(
-                    f"Found currency record {currency_record.code}. Last updated: {currency_record.last_updated}"
-                )
-            else:
-                currency_object = Currency(
-                    code=currency_code,
-                    symbol=CurrencySymbols.get_symbol(currency_code),
-                    last_updated=datetime.now(timezone.utc),
-                    bot_id=self.config.bot_id,
-                )
-
-                currency_record = await self.currency_storage.add_currency(
-                    currency=currency_object, session=session
-                )
-                await session.commit()
-
-            last_updated = currency_record.last_updated
-            if last_updated.tzinfo is None:
-                # Treat stored timestamps as UTC
-                last_updated = last_updated.replace(tzinfo=timezone.utc)
-
-            renewal_cutoff = (
-                datetime.now(timezone.utc) - self.config.currency_rate_update_delta
+            # A single statement, whether the currency is new or not. It's safe if another
+            # handler adds the same currency concurrently, and a missing rate is filled in
+            # from the last refresh, rather than waiting on the API
+            currency_record = await self.currency_storage.upsert_currency(
+                currency=currency_object, session=session
             )
-
-            if last_updated < renewal_cutoff or currency_record.rate is None:
-                currency_record = await self.update_rate(currency=currency_record)
+            await self._commit(session)
 
             return currency_record
 
-    async def update_rate(
-        self, currency: Currency, session: AsyncSession | None = None
-    ) -> Currency:
-        """Updates the rate for a currency.
+    @property
+    def rates_stale(self) -> bool:
+        """Whether the rate table is older than `currency_rate_update_delta`."""
+        if self.rates.last_updated is None:
+            return True
 
-        Uses data from https://exchangerate-api.com
+        last_updated = self.rates.last_updated
+        if last_updated.tzinfo is None:
+            # Treat stored timestamps as UTC
+            last_updated = last_updated.replace(tzinfo=timezone.utc)
+
+        return (
+            last_updated
+            < datetime.now(timezone.utc) - self.config.currency_rate_update_delta
+        )
+
+    async def load_rates(self, session: AsyncSession | None = None) -> RateTable:
+        """Publish a rate table from the rates stored in the database.
 
         Parameters
         ----------
-        currency: Currency
-            The Currency object to be updated
         session : AsyncSession | None, optional
             An optional session, by default None
 
         Returns
         -------
-        Currency
-            The currency object including the updated rate
+        RateTable
+            The published rate table
         """
         async with self._get_session(session) as session:
-            log.info(
-                f"Updating the rate for {currency.code}. Last updated {currency.last_updated}"
-            )
+            currencies = await self.list_all_currencies(session=session)
+
+        rates = {
+            currency.code: currency.rate
+            for currency in currencies
+            if currency.rate is not None
+        }
+        self.rates = RateTable(
+            base=self.config.base_currency,
+            rates=rates,
+            # The table is only as fresh as its stalest rate
+            last_updated=min(
+                (
+                    currency.last_updated
+                    for currency in currencies
+                    if currency.code in rates
+                ),
+                default=None,
+            ),
+        )
+        log.info(f"Loaded {len(self.rates.rates)} rates from the database")
+        return self.rates
+
+    async def refresh_rates(self, session: AsyncSession | None = None) -> RateTable:
+        """Fetch every rate for the base currency in one request and store them.
+
+        Every known currency is updated in a single transaction. Once it's committed, a new
+        rate table is published. If the rates can't be fetched, the current table is kept.
 
-            url = f"https://v6.exchangerate-api.com/v6/{self.config.authentication.exchangerate_api}/pair/{self.config.base_currency}/{currency.code}"
-            response = requests.get(url, timeout=5)
-            payload: dict = response.json()
+        Uses data from https://exchangerate-api.com
 
-            if payload["result"] != "success":
-                log.error(
-                    f"https://exchangerate-api.com returned an error: {payload["result"]}, {payload["error-type"]}"
-                )
-                return currency
+        Parameters
+        ----------
+        session : AsyncSession | None, optional
+            An optional session, by default None
 
-            currency.rate = float(payload["conversion_rate"])
-            currency.last_updated = datetime.now(timezone.utc)
+        Returns
+        -------
+        RateTable
+            The rate table, new or current
+        """
+        log.info(f"Refreshing the rates for {self.config.base_currency}")
+        try:
+            rates = await self.exchange_rates.get_rates(self.config.base_currency)
+        except ExchangeRateError as error:
+            log.error(f"Couldn't refresh the rates: {error}")
+            return self.rates
+
+        last_updated = datetime.now(timezone.utc)
+        rate_table = RateTable(
+            base=self.config.base_currency, rates=rates, last_updated=last_updated
+        )
 
-            currency = await self.currency_storage.update_currency(
-                currency,
+        async with self._get_session(session) as session:
+            updated = await self.currency_storage.update_rates(
+                rate_table.rates,
+                self.config.base_currency,
+                last_updated,
                 session=session,
-                fields=["rate", "last_updated"],
             )
+            await self._commit(session)
+            self._after_commit(session, lambda: self._publish_rates(rate_table))
+
+        log.info(f"Refreshed the rates for {', '.join(updated) or 'no currencies'}")
+        return rate_table
 
-            log.info(f"Successfully updated rate {currency.code}@{currency.rate}")
-            return currency
+    def _publish_rates(self, rate_table: RateTable) -> None:
+        self.rates = rate_table
 
     async def list_all_currencies(
         self, session: AsyncSession | None = None
@@ -167,3 +212,7 @@ class CurrencyService(ServiceHelpers):
             log.info(f"Found {len(currency_list)} currencies")
 
             return currency_list
+
+    async def close(self) -> None:
+        """Close the exchange rate client's connections."""
+        await self.exchange_rates.close()
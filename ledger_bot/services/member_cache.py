@@ -0,0 +1,96 @@
+"""A cache of member records, keyed by their discord id."""
+
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from ledger_bot.core.config import MemberCacheConfig
+from ledger_bot.models import Member
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class MemberSnapshot:
+    """The column values of a member record, independent of any session."""
+
+    values: Mapping[str, Any]
+
+    @classmethod
+    def of(cls, member: Member) -> "MemberSnapshot":
+        return cls(
+            MappingProxyType(
+                {
+                    attribute.key: getattr(member, attribute.key)
+                    for attribute in inspect(Member).column_attrs
+                }
+            )
+        )
+
+    def to_member(self) -> Member:
+        """Build a detached Member from the snapshot, ready to be merged into a session."""
+        member = Member(**self.values)
+        make_transient_to_detached(member)
+        return member
+
+
+class MemberCache:
+    """A size and age limited cache of member snapshots, keyed by discord id.
+
+    Snapshots are never handed out directly, each lookup builds a new Member from one. So
+    changes to a returned member can't leak into the cache, and it's never tied to a session
+    that has since closed.
+
+    Every invalidation bumps the cache's generation. A lookup takes the generation before
+    it reads the database, and passes it to `put`, which ignores it if there has been an
+    invalidation since. So a read that started before an update was committed can't put
+    the old values back once the update has invalidated them.
+    """
+
+    def __init__(self, config: MemberCacheConfig) -> None:
+        self._cache: TTLCache[int, MemberSnapshot] = TTLCache(
+            maxsize=config.maxsize, ttl=config.ttl
+        )
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, discord_id: int) -> Optional[Member]:
+        snapshot = self._cache.get(discord_id)
+
+        if snapshot is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return snapshot.to_member()
+
+    def put(self, member: Member, generation: int) -> None:
+        """Cache a member read from the database when the cache was at `generation`."""
+        if generation != self.generation:
+            log.debug(f"Not caching member {member.discord_id}, it may be out of date")
+            return
+
+        self._cache[member.discord_id] = MemberSnapshot.of(member)
+
+    def invalidate(self, discord_id: int) -> None:
+        log.debug(f"Invalidating cached member {discord_id}")
+        self.generation += 1
+        self._cache.pop(discord_id, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._cache.clear()
@@ -1,10 +1,8 @@
 """A service to provide interfacing for MemberStorage."""
 
 import logging
-from typing import List
+from typing import Iterable, List
 
-from asyncache import cached
-from cachetools import LRUCache
 from discord import Member as DiscordMember
 from discord import User as DiscordUser
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
@@ -14,6 +12,7 @@ from ledger_bot.models import Member, MemberTransactionSummary
 from ledger_bot.storage import MemberStorage
 from ledger_bot.utils import is_valid_timezone, resolve_timezone
 
+from .member_cache import MemberCache
 from .service_helpers import ServiceHelpers
 
 log = logging.getLogger(__name__)
@@ -28,6 +27,7 @@ class MemberService(ServiceHelpers):
     ):
         self.member_storage = member_storage
         self.config = config
+        self.cache = MemberCache(config.member_cache)
 
         super().__init__(session_factory)
 
@@ -54,7 +54,6 @@ class MemberService(ServiceHelpers):
             )
             return member
 
-    @cached(LRUCache(maxsize=64))
     async def get_or_add_member(
         self,
         discord_member: DiscordMember | DiscordUser,
@@ -62,6 +61,10 @@ class MemberService(ServiceHelpers):
     ) -> Member:
         """Fetches an existing member or adds a new record for them.
 
+        Members are cached by discord id. A cached member is returned without any queries,
+        merged into the session if one is given. Otherwise the member is upserted, which
+        also brings an existing record's username up to date.
+
         Parameters
         ----------
         discord_member : DiscordMember
@@ -74,33 +77,98 @@ class MemberService(ServiceHelpers):
         Member
             The record from the database for this member
         """
+        generation = self.cache.generation
+        cached_member = self.cache.get(discord_member.id)
+        if cached_member is not None:
+            if session is None:
+                return cached_member
+            # load=False attaches the cached state to the session without a SELECT
+            return await session.merge(cached_member, load=False)
+
         async with self._get_session(session) as session:
-            members = await self.member_storage.list_members(
-                Member.discord_id == discord_member.id, session=session
+            member_object = Member(
+                username=discord_member.name,
+                discord_id=discord_member.id,
+                nickname=(
+                    discord_member.nick
+                    if type(discord_member) is DiscordMember
+                    else None
+                ),
+                bot_id=self.config.bot_id,
+            )
+
+            # A single statement, whether the member is new or not, and safe if another
+            # handler adds the same member concurrently
+            member_record = await self.member_storage.upsert_member(
+                member=member_object, session=session
+            )
+            await self._commit(session)
+
+            # Not before the commit, or a rolled back member could be cached
+            self._after_commit(
+                session, lambda: self.cache.put(member_record, generation)
             )
-            if members:
-                member_record = members[0]
-                log.debug(
-                    f"Found member record {member_record.id} {member_record.username} {member_record.discord_id}"
-                )
-            else:
-                member_object = Member(
-                    username=discord_member.name,
-                    discord_id=discord_member.id,
-                    nickname=(
-                        discord_member.nick
-                        if type(discord_member) is DiscordMember
-                        else None
-                    ),
-                    bot_id=self.config.bot_id,
-                )
-
-                member_record = await self.member_storage.add_member(
-                    member=member_object, session=session
-                )
-                await session.commit()
             return member_record
 
+    async def sync_members(
+        self,
+        discord_members: Iterable[DiscordMember],
+        chunk_size: int,
+        session: AsyncSession | None = None,
+    ) -> int:
+        """Add or update the records of many members at once.
+
+        Only members that are new, or whose username or nickname has changed, are written.
+        They're written in chunks, all in a single transaction.
+
+        Parameters
+        ----------
+        discord_members : Iterable[DiscordMember]
+            The discord members, e.g. everyone in the guild
+        chunk_size : int
+            How many members to write in each statement
+        session : AsyncSession | None, optional
+            An optional session, by default None
+
+        Returns
+        -------
+        int
+            How many members were added or updated
+        """
+        async with self._get_session(session) as session:
+            known = await self.member_storage.get_member_names(session=session)
+            changed = [
+                {
+                    "username": discord_member.name,
+                    "discord_id": discord_member.id,
+                    "nickname": discord_member.nick,
+                    "bot_id": self.config.bot_id,
+                }
+                for discord_member in discord_members
+                if known.get(discord_member.id)
+                != (discord_member.name, discord_member.nick)
+            ]
+            log.info(f"Syncing {len(changed)} new or renamed members")
+
+            for start in range(0, len(changed), chunk_size):
+                chunk = changed[start : start + chunk_size]
+                await self.member_storage.upsert_members(chunk, session=session)
+                log.info(f"Synced {start + len(chunk)}/{len(changed)} members")
+
+            await self._commit(session)
+
+            renamed = [
+                row["discord_id"] for row in changed if row["discord_id"] in known
+            ]
+
+            def invalidate_renamed() -> None:
+                for discord_id in renamed:
+                    self.cache.invalidate(discord_id)
+
+            self._after_commit(session, invalidate_renamed)
+
+            return len(changed)
+
     async def list_all_members(
         self, session: AsyncSession | None = None
     ) -> List[Member]:
@@ -159,7 +227,8 @@ class MemberService(ServiceHelpers):
                 member, fields=["dietary_requirements"], session=session
             )
 
-            await session.commit()
+            await self._commit(session)
+            self._invalidate_after_commit(session, member.discord_id)
 
             log.info(
                 f"Updated dietary_requirements for member {member.id} ({member.username}) to '{requirement}'"
@@ -211,7 +280,8 @@ class MemberService(ServiceHelpers):
                 member, fields=["timezone"], session=session
             )
 
-            await session.commit()
+            await self._commit(session)
+            self._invalidate_after_commit(session, member.discord_id)
 
             log.info(
                 f"Updated timezone for member {member.id} ({member.username}) to '{timezone}'"
@@ -253,7 +323,14 @@ class MemberService(ServiceHelpers):
                 member, fields=fields, session=session
             )
 
-            await session.commit()
+            await self._commit(session)
+            self._invalidate_after_commit(session, member.discord_id)
 
             log.info(f"Updated member {member.id} ({member.username})")
             return updated_member
+
+    def _invalidate_after_commit(self, session: AsyncSession, discord_id: int) -> None:
+        # Not before the commit, or a lookup could re-cache the old values in between. A
+        # lookup that read them before the commit can't put them back after it, as
+        # invalidating bumps the cache's generation
+        self._after_commit(session, lambda: self.cache.invalidate(discord_id))
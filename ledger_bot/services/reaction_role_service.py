@@ -29,6 +29,7 @@ class ReactionRoleService(ServiceHelpers):
     ):
         self.reaction_role_storage = reaction_role_storage
         self.watched_message_ids: set[int] = set()
+        self.watched_message_ids_loaded = False
         self.config = config
 
         super().__init__(session_factory)
@@ -174,13 +175,13 @@ class ReactionRoleService(ServiceHelpers):
                 reaction_role = await self.reaction_role_storage.update_reaction_role(
                     reaction_role=reaction_role, fields=fields, session=session
                 )
-                await session.commit()
+                await self._commit(session)
             else:
                 log.info("ReactionRole doesn't exist. Adding...")
                 reaction_role = await self.reaction_role_storage.add_reaction_role(
                     reaction_role=reaction_role, session=session
                 )
-                await session.commit()
+                await self._commit(session)
 
             log.info(f"ReactionRole saved with id {reaction_role.id}")
             return reaction_role
@@ -200,7 +201,7 @@ class ReactionRoleService(ServiceHelpers):
             await self.reaction_role_storage.delete_reaction_role(
                 reaction_role, session=session
             )
-            await session.commit()
+            await self._commit(session)
 
     async def list_watched_message_ids(
         self, session: AsyncSession | None = None
@@ -224,4 +225,5 @@ class ReactionRoleService(ServiceHelpers):
             )
 
             self.watched_message_ids = set(watched_message_ids)
+            self.watched_message_ids_loaded = True
             return watched_message_ids
@@ -1,6 +1,7 @@
 """A service to provide interfacing for ReminderStorage."""
 
 import logging
+from datetime import datetime
 from typing import List
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
@@ -92,13 +93,13 @@ class ReminderService(ServiceHelpers):
                 reminder = await self.reminder_storagee.update_reminder(
                     reminder=reminder, fields=fields, session=session
                 )
-                await session.commit()
+                await self._commit(session)
             else:
                 log.info("Reminder doesn't exist. Adding...")
                 reminder = await self.reminder_storagee.add_reminder(
                     reminder=reminder, session=session
                 )
-                await session.commit()
+                await self._commit(session)
 
             log.info(f"Reminder saved with id {reminder.id}")
             return reminder
@@ -130,6 +131,33 @@ class ReminderService(ServiceHelpers):
 
         return reminder_list
 
+    async def list_upcoming_reminders(
+        self, after: datetime, session: AsyncSession | None = None
+    ) -> List[Reminder]:
+        """Get a list of the reminders due after a given time.
+
+        Parameters
+        ----------
+        after : datetime
+            The earliest reminder_date to include
+        session : AsyncSession | None, optional
+            An optional session, by default None
+
+        Returns
+        -------
+        List[Reminder]
+            The matching reminders, empty if none exist
+        """
+        log.info(f"Listing reminders due after {after}")
+        async with self._get_session(session) as session:
+            reminder_list = await self.reminder_storagee.list_reminders(
+                Reminder.reminder_date >= after, session=session
+            )
+
+        log.info(f"Found {len(reminder_list or [])} reminders")
+
+        return reminder_list or []
+
     async def delete_reminder(
         self, reminder: Reminder, session: AsyncSession | None = None
     ) -> None:
@@ -145,4 +173,4 @@ class ReminderService(ServiceHelpers):
         log.info(f"Deleting reminder {reminder.id}")
         async with self._get_session(session) as session:
             await self.reminder_storagee.delete_reminder(reminder, session=session)
-            await session.commit()
+            await self._commit(session)
@@ -1,10 +1,46 @@
 """Various helpers for our service classes."""
 
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import AsyncIterator, Callable, List
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+# The key in `AsyncSession.info` marking a session as a unit of work.
+# Its value is the list of callbacks to run once the unit of work has committed.
+UNIT_OF_WORK = "unit_of_work"
+
+
+@asynccontextmanager
+async def unit_of_work(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    """Run a block of work in a single session, committed once when the block exits.
+
+    Services given this session flush their changes rather than committing them, and defer
+    any in-memory bookkeeping until the commit succeeds. If the block raises, the session is
+    rolled back and the deferred bookkeeping is discarded.
+
+    Parameters
+    ----------
+    session_factory : async_sessionmaker[AsyncSession]
+        The factory to create the session from
+
+    Yields
+    ------
+    AsyncSession
+        The session shared by the unit of work
+    """
+    async with session_factory() as session:
+        after_commit: List[Callable[[], None]] = []
+        session.info[UNIT_OF_WORK] = after_commit
+
+        # If the block raises, closing the session rolls back anything it flushed
+        yield session
+        await session.commit()
+
+        for callback in after_commit:
+            callback()
+
 
 class ServiceHelpers:
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
@@ -19,3 +55,26 @@ class ServiceHelpers:
         else:
             async with self._session_factory() as s:
                 yield s
+
+    @staticmethod
+    def _in_unit_of_work(session: AsyncSession) -> bool:
+        return UNIT_OF_WORK in session.info
+
+    async def _commit(self, session: AsyncSession) -> None:
+        """Commit the session, or only flush it if it belongs to a unit of work."""
+        if self._in_unit_of_work(session):
+            await session.flush()
+        else:
+            await session.commit()
+
+    def _after_commit(
+        self, session: AsyncSession, callback: Callable[[], None]
+    ) -> None:
+        """Run the callback once the session's changes are committed.
+
+        Outside of a unit of work the caller has already committed, so it runs immediately.
+        """
+        if self._in_unit_of_work(session):
+            session.info[UNIT_OF_WORK].append(callback)
+        else:
+            callback()
@@ -2,11 +2,12 @@
 
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import and_
+from sqlalchemy import and_, true
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.sql import ColumnElement
 
 from ledger_bot.core import Config
 from ledger_bot.errors import (
@@ -16,14 +17,29 @@ from ledger_bot.errors import (
     TransactionInvalidMemberError,
     TransactionServiceError,
 )
-from ledger_bot.models import Member, Transaction
+from ledger_bot.models import (
+    Member,
+    Transaction,
+    TransactionListPage,
+    TransactionListRow,
+)
 from ledger_bot.storage import TransactionStorage
+from ledger_bot.storage.transaction_storage import status_conditions
 
-from .bot_message_service import BotMessageService
 from .service_helpers import ServiceHelpers
 
 log = logging.getLogger(__name__)
 
+# The filters for a member's transaction list, each built from the member's id
+LIST_FILTERS: Dict[str, Callable[[int], ColumnElement[bool]]] = {
+    "all": lambda member_id: true(),
+    "open": lambda member_id: Transaction.open_filter(),
+    "purchases": lambda member_id: Transaction.buyer_id == member_id,
+    "sales": lambda member_id: Transaction.seller_id == member_id,
+    "completed": lambda member_id: status_conditions(Transaction)["completed"],
+    "cancelled": lambda member_id: status_conditions(Transaction)["cancelled"],
+}
+
 
 class TransactionService(ServiceHelpers):
     def __init__(
@@ -151,6 +167,17 @@ class TransactionService(ServiceHelpers):
         transaction.bot_id = self.config.bot_id
 
         async with self._get_session(session) as session:
+            if (
+                transaction.id
+                and self._in_unit_of_work(session)
+                and transaction in session
+            ):
+                # The unit of work already tracks the changes, and flushes them when it commits
+                log.info(
+                    f"Transaction {transaction.id} is part of a unit of work. Deferring save..."
+                )
+                return transaction
+
             if transaction.id:
                 log.info(f"Transaction already has id {transaction.id}. Updating...")
 
@@ -176,8 +203,7 @@ class TransactionService(ServiceHelpers):
                 )
                 log.debug(f"Set display_id to {transaction.display_id}")
 
-            await session.commit()
-            await session.refresh(transaction)
+            await self._commit(session)
             log.info(f"Transaction saved with id {transaction.id}")
             return transaction
 
@@ -210,6 +236,90 @@ class TransactionService(ServiceHelpers):
 
             return transaction_list
 
+    async def list_member_transaction_rows(
+        self, member: Member, session: AsyncSession | None = None
+    ) -> List[TransactionListRow]:
+        """List a member's purchases and sales, without loading any ORM objects.
+
+        Parameters
+        ----------
+        member : Member
+            The member
+        session : AsyncSession | None, optional
+            An optional session, by default None
+
+        Returns
+        -------
+        List[TransactionListRow]
+            The member's transactions, oldest first
+        """
+        log.info(f"Listing transactions for member {member.id}")
+        async with self._get_session(session) as session:
+            return await self.transaction_storage.list_member_transaction_rows(
+                member.id, session=session
+            )
+
+    async def get_member_transaction_page(
+        self,
+        member: Member,
+        list_filter: str = "all",
+        after: Optional[Tuple[datetime, int]] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        page_size: Optional[int] = None,
+        session: AsyncSession | None = None,
+    ) -> TransactionListPage:
+        """Get one page of a member's transactions.
+
+        Pages are fetched with a keyset on `(creation_date, id)` rather than an offset, so
+        every page costs the same.
+
+        Parameters
+        ----------
+        member : Member
+            The member
+        list_filter : str, optional
+            The key in `LIST_FILTERS` of the transactions to list, by default "all"
+        after : Optional[Tuple[datetime, int]], optional
+            The `last_key` of the current page, to get the next page, by default None
+        before : Optional[Tuple[datetime, int]], optional
+            The `first_key` of the current page, to get the previous page, by default None
+        page_size : Optional[int], optional
+            The number of transactions on a page, by default `config.list_page_size`
+        session : AsyncSession | None, optional
+            An optional session, by default None
+
+        Returns
+        -------
+        TransactionListPage
+            The page, oldest transaction first
+        """
+        page_size = page_size or self.config.list_page_size
+        log.info(
+            f"Getting {list_filter} transactions for member {member.id}, after {after}, before {before}"
+        )
+
+        async with self._get_session(session) as session:
+            # One extra row shows whether there's another page beyond this one
+            rows = await self.transaction_storage.list_member_transaction_rows(
+                member.id,
+                LIST_FILTERS[list_filter](member.id),
+                after=after,
+                before=before,
+                limit=page_size + 1,
+                session=session,
+            )
+
+        more = len(rows) > page_size
+        if before is not None:
+            return TransactionListPage(
+                rows=tuple(rows[-page_size:]), has_previous=more, has_next=True
+            )
+        return TransactionListPage(
+            rows=tuple(rows[:page_size]),
+            has_previous=after is not None,
+            has_next=more,
+        )
+
     async def delete_transaction(
         self, transaction: Transaction, session: AsyncSession | None = None
     ) -> None:
@@ -228,6 +338,27 @@ class TransactionService(ServiceHelpers):
                 transaction, session=session
             )
 
+    async def _get_tracked_transaction(
+        self, transaction: Transaction, session: AsyncSession
+    ) -> Transaction:
+        """Get the session's copy of the transaction, only querying if it isn't already loaded."""
+        if transaction in session:
+            return transaction
+
+        if transaction.id is None:
+            log.exception("Transaction has no id. Ignoring")
+            raise TransactionServiceError
+
+        refreshed_transaction = await self.get_transaction(
+            transaction.id, session=session
+        )
+
+        if refreshed_transaction is None:
+            log.exception("Refreshed transaction returned None")
+            raise TransactionServiceError
+
+        return refreshed_transaction
+
     async def approve_transaction(
         self,
         transaction: Transaction,
@@ -258,19 +389,7 @@ class TransactionService(ServiceHelpers):
             The specified buyer doesn't match the transaction buyer
         """
         async with self._get_session(session) as session:
-            if transaction.id is None:
-                log.exception("Transaction has no id. Ignoring")
-                raise TransactionServiceError
-
-            refreshed_transaction = await self.get_transaction(
-                transaction.id, session=session
-            )
-
-            if refreshed_transaction is None:
-                log.exception("Refreshed transaction returned None")
-                raise TransactionServiceError
-
-            transaction = refreshed_transaction
+            transaction = await self._get_tracked_transaction(transaction, session)
 
             log.info(f"Approving transaction {transaction.id}")
 
@@ -280,8 +399,6 @@ class TransactionService(ServiceHelpers):
                 )
                 raise TransactionCancelledError(transaction=transaction)
 
-            await session.refresh(transaction, attribute_names=["buyer", "seller"])
-
             if reactor.id != transaction.buyer_id:
                 log.info(
                     f"Ignoring approval from {reactor.username} on {transaction.id} - Reactor is not the buyer."
@@ -295,13 +412,10 @@ class TransactionService(ServiceHelpers):
             fields = ["sale_approved", "approved_date"]
             log.debug(f"transaction: {transaction}")
 
-            saved_transaction = await self.save_transaction(
+            return await self.save_transaction(
                 transaction=transaction, fields=fields, session=session
             )
 
-            await session.refresh(transaction, attribute_names=["buyer", "seller"])
-            return saved_transaction
-
     async def cancel_transaction(
         self,
         transaction: Transaction,
@@ -334,15 +448,7 @@ class TransactionService(ServiceHelpers):
         async with self._get_session(session) as session:
             log.info(f"Cancelling transaction {transaction.id}")
 
-            refreshed_transaction = await self.get_transaction(
-                transaction.id, session=session
-            )
-
-            if refreshed_transaction is None:
-                log.exception("Refreshed transaction returned None")
-                raise TransactionServiceError
-
-            transaction = refreshed_transaction
+            transaction = await self._get_tracked_transaction(transaction, session)
 
             if transaction.sale_approved:
                 log.info(
@@ -365,13 +471,10 @@ class TransactionService(ServiceHelpers):
             fields = ["cancelled", "cancelled_date"]
             log.debug(f"transaction: {transaction}")
 
-            transaction = await self.save_transaction(
+            return await self.save_transaction(
                 transaction=transaction, fields=fields, session=session
             )
 
-            await session.refresh(transaction, attribute_names=["buyer", "seller"])
-            return transaction
-
     async def mark_transaction_delivered(
         self,
         transaction: Transaction,
@@ -406,15 +509,7 @@ class TransactionService(ServiceHelpers):
                 f"Marking transaction {transaction.id} as delivered by {reactor.id}"
             )
 
-            refreshed_transaction = await self.get_transaction(
-                transaction.id, session=session
-            )
-
-            if refreshed_transaction is None:
-                log.exception("Refreshed transaction returned None")
-                raise TransactionServiceError
-
-            transaction = refreshed_transaction
+            transaction = await self._get_tracked_transaction(transaction, session)
 
             if transaction.cancelled:
                 log.info(f"Transaction {transaction.id} alrady cancelled")
@@ -457,13 +552,10 @@ class TransactionService(ServiceHelpers):
 
             log.debug(f"Transaction: {transaction}")
 
-            transaction = await self.save_transaction(
+            return await self.save_transaction(
                 transaction=transaction, fields=fields, session=session
             )
 
-            await session.refresh(transaction, attribute_names=["buyer", "seller"])
-            return transaction
-
     async def mark_transaction_paid(
         self,
         transaction: Transaction,
@@ -496,15 +588,7 @@ class TransactionService(ServiceHelpers):
         async with self._get_session(session) as session:
             log.info(f"Marking transaction {transaction.id} as paid by {reactor.id}")
 
-            refreshed_transaction = await self.get_transaction(
-                transaction.id, session=session
-            )
-
-            if refreshed_transaction is None:
-                log.exception("Refreshed transaction returned None")
-                raise TransactionServiceError
-
-            transaction = refreshed_transaction
+            transaction = await self._get_tracked_transaction(transaction, session)
 
             if transaction.cancelled:
                 log.info(f"Transaction {transaction.id} alrady cancelled")
@@ -551,28 +635,24 @@ class TransactionService(ServiceHelpers):
 
             log.debug(f"Transaction: {transaction}")
 
-            transaction = await self.save_transaction(
+            return await self.save_transaction(
                 transaction=transaction, fields=fields, session=session
             )
 
-            await session.refresh(transaction, attribute_names=["buyer", "seller"])
-            return transaction
-
     async def get_transaction_by_bot_message_id(
         self,
         bot_message_id: int,
-        bot_message_service: BotMessageService,
         session: AsyncSession | None = None,
     ) -> Transaction | None:
         """
         Find the Transaction associated with a given BotMessage ID.
 
+        The buyer, seller and bot_messages are loaded alongside the transaction.
+
         Parameters
         ----------
         bot_message_id : int
             The discord message_id of the bot message
-        bot_message_service: BotMessageService
-            An instance of the BotMessageService to do the lookup
         session : AsyncSession | None, optional
             An optional session, by default None
 
@@ -581,17 +661,15 @@ class TransactionService(ServiceHelpers):
         Optional[Transaction]
             The associated transaction, or None if not found
         """
-        # Get the BotMessage
         async with self._get_session(session) as session:
-            bot_message = await bot_message_service.get_bot_message_by_message_id(
-                bot_message_id, session=session
-            )
-            if not bot_message:
-                return None
-
-            # Get the Transaction linked to this BotMessage
-            transaction = await self.get_transaction(
-                bot_message.transaction_id, session=session
+            transaction = await self.transaction_storage.get_transaction_by_message_id(
+                message_id=bot_message_id,
+                session=session,
+                options=[
+                    joinedload(Transaction.buyer),
+                    joinedload(Transaction.seller),
+                    selectinload(Transaction.bot_messages),
+                ],
             )
             return transaction
 
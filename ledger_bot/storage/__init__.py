@@ -6,6 +6,7 @@ from . import (
     member_storage,
     reaction_role_storage,
     reminder_storage,
+    stats_storage,
     storage,
     transaction_storage,
 )
@@ -17,3 +18,4 @@ ReminderStorage = reminder_storage.ReminderStorage
 TransactionStorage = transaction_storage.TransactionStorage
 ReactionRoleStorage = reaction_role_storage.ReactionRoleStorage
 CurrencyStorage = currency_storage.CurrencyStorage
+StatsStorage = stats_storage.StatsStorage
@@ -6,6 +6,7 @@ from . import (
     member_storage_abc,
     reaction_role_storage_abc,
     reminder_storage_abc,
+    stats_storage_abc,
     transaction_storage_abc,
 )
 
@@ -15,3 +16,4 @@ ReminderStorageABC = reminder_storage_abc.ReminderStorageABC
 TransactionStorageABC = transaction_storage_abc.TransactionStorageABC
 ReactionRoleStorageABC = reaction_role_storage_abc.ReactionRoleStorageABC
 CurrencyStorageABC = currency_storage_abc.CurrencyStorageABC
+StatsStorageABC = stats_storage_abc.StatsStorageABC
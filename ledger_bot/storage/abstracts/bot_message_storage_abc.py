@@ -1,7 +1,7 @@
 """The abstraction interface for bot_message_storage."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import ColumnElement
@@ -84,3 +84,21 @@ class BotMessageStorageABC(ABC):
             The session to be used
         """
         ...
+
+    @abstractmethod
+    async def list_message_transaction_ids(
+        self, session: AsyncSession
+    ) -> Dict[int, int]:
+        """List the transaction id for every stored bot_message.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Dict[int, int]
+            A mapping of discord message_id to transaction_id
+        """
+        ...
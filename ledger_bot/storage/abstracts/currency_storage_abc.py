@@ -1,7 +1,8 @@
 """The abstraction interface for currencies."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Mapping, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import ColumnElement
@@ -48,6 +49,30 @@ class CurrencyStorageABC(ABC):
         """
         ...
 
+    @abstractmethod
+    async def upsert_currency(
+        self, currency: Currency, session: AsyncSession
+    ) -> Currency:
+        """Add a currency to the database, or fill in the rate of an existing one.
+
+        A single `INSERT ... ON CONFLICT DO UPDATE ... RETURNING`, so concurrent calls for
+        the same currency are safe, and the record is returned without another query. An
+        existing record only takes the new rate, and its last_updated, if it has no rate.
+
+        Parameters
+        ----------
+        currency : Currency
+            The currency object to add to the database.
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Currency
+            The new or existing currency object from the database.
+        """
+        ...
+
     @abstractmethod
     async def list_currencies(
         self, *filters: ColumnElement[bool], session: AsyncSession
@@ -105,3 +130,35 @@ class CurrencyStorageABC(ABC):
             The updated currency object.
         """
         ...
+
+    @abstractmethod
+    async def update_rates(
+        self,
+        rates: Mapping[str, float],
+        base_currency: str,
+        last_updated: datetime,
+        session: AsyncSession,
+    ) -> List[str]:
+        """Update the rates of every known currency in `rates`, recording them in `currency_rates`.
+
+        Currencies that aren't in the database are ignored. Transactions in an updated
+        currency that have no exchange rate snapshot, because it had no rate when they were
+        created, take the new rate as their snapshot.
+
+        Parameters
+        ----------
+        rates : Mapping[str, float]
+            The new rates, keyed by currency code
+        base_currency : str
+            The currency the rates convert from
+        last_updated : datetime
+            When the rates were fetched
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        List[str]
+            The codes of the currencies that were updated.
+        """
+        ...
@@ -1,7 +1,7 @@
 """The abstraction interface for member_storage."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import ColumnElement
@@ -48,6 +48,63 @@ class MemberStorageABC(ABC):
         """
         ...
 
+    @abstractmethod
+    async def upsert_member(self, member: Member, session: AsyncSession) -> Member:
+        """Add a member to the database, or update the username of an existing one.
+
+        A single `INSERT ... ON CONFLICT DO UPDATE ... RETURNING`, so concurrent calls for
+        the same member are safe, and the record is returned without another query. Only
+        the username of an existing record is updated.
+
+        Parameters
+        ----------
+        member : Member
+            The member object to add to the database.
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Member
+            The new or existing member object from the database.
+        """
+        ...
+
+    @abstractmethod
+    async def upsert_members(
+        self, members: Sequence[Mapping[str, Any]], session: AsyncSession
+    ) -> None:
+        """Add or update many members at once, matching existing members by discord id.
+
+        Existing members only have their `username` and `nickname` updated.
+
+        Parameters
+        ----------
+        members : Sequence[Mapping[str, Any]]
+            The column values of each member
+        session : AsyncSession
+            The session to be used
+        """
+        ...
+
+    @abstractmethod
+    async def get_member_names(
+        self, session: AsyncSession
+    ) -> Dict[int, Tuple[str, Optional[str]]]:
+        """Get the username and nickname of every member.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Dict[int, Tuple[str, Optional[str]]]
+            Each member's username and nickname, keyed by discord id.
+        """
+        ...
+
     @abstractmethod
     async def list_members(
         self, *filters: ColumnElement[bool], session: AsyncSession
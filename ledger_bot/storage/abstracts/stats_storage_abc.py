@@ -0,0 +1,63 @@
+"""The abstraction interface for stats_storage."""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ledger_bot.models import ServerStats, TransactionStats
+
+
+class StatsStorageABC(ABC):
+    @abstractmethod
+    async def get_member_stats(
+        self, member_id: int, session: AsyncSession
+    ) -> Dict[str, TransactionStats]:
+        """Get the stats for a member's transactions from the rollups.
+
+        Parameters
+        ----------
+        member_id : int
+            The id of the member
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Dict[str, TransactionStats]
+            The stats keyed by the member's role, `buyer` or `seller`. Roles the member
+            has no transactions as are missing.
+        """
+        ...
+
+    @abstractmethod
+    async def get_server_stats(self, session: AsyncSession) -> Optional[ServerStats]:
+        """Get the stats across every transaction in the server from the rollups.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Optional[ServerStats]
+            The server stats, if there are any transactions.
+        """
+        ...
+
+    @abstractmethod
+    async def rebuild_stats(self, session: AsyncSession) -> List[str]:
+        """Rebuild the rollups from the transaction history.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        List[str]
+            A description of each rollup row that didn't match its rebuilt value.
+        """
+        ...
@@ -1,12 +1,18 @@
 """The abstraction interface for transaction_storage."""
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import ColumnElement
 
-from ledger_bot.models import Transaction
+from ledger_bot.models import (
+    ServerStats,
+    Transaction,
+    TransactionListRow,
+    TransactionStats,
+)
 
 
 class TransactionStorageABC(ABC):
@@ -30,6 +36,26 @@ class TransactionStorageABC(ABC):
         """
         ...
 
+    @abstractmethod
+    async def get_transaction_by_message_id(
+        self, message_id: int, session: AsyncSession
+    ) -> Optional[Transaction]:
+        """Get the transaction that a bot message was posted for.
+
+        Parameters
+        ----------
+        message_id : int
+            The discord message_id of the bot message
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Optional[Transaction]
+            The transaction object, if found.
+        """
+        ...
+
     @abstractmethod
     async def add_transaction(
         self, transaction: Transaction, session: AsyncSession
@@ -109,3 +135,77 @@ class TransactionStorageABC(ABC):
             The updated transaction object.
         """
         ...
+
+    @abstractmethod
+    async def list_member_transaction_rows(
+        self,
+        member_id: int,
+        *filters: ColumnElement[bool],
+        after: Optional[Tuple[datetime, int]] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
+        session: AsyncSession,
+    ) -> List[TransactionListRow]:
+        """List a member's transactions as lightweight rows, in a single query.
+
+        Rows are paged with a keyset on `(creation_date, id)`, so a page costs the same
+        however far into the member's history it is.
+
+        Parameters
+        ----------
+        member_id : int
+            The id of the member
+        *filters : ColumnElement[bool]
+            Optional conditions the transactions must match
+        after : Optional[Tuple[datetime, int]], optional
+            Only list transactions after this `(creation_date, id)`, by default None
+        before : Optional[Tuple[datetime, int]], optional
+            Only list transactions before this `(creation_date, id)`, by default None
+        limit : Optional[int], optional
+            The most rows to return, by default None. With `before`, the rows nearest to it are returned.
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        List[TransactionListRow]
+            The member's purchases and sales, oldest first.
+        """
+        ...
+
+    @abstractmethod
+    async def get_member_stats(
+        self, member_id: int, session: AsyncSession
+    ) -> Dict[str, TransactionStats]:
+        """Get the stats for a member's transactions, in a single query.
+
+        Parameters
+        ----------
+        member_id : int
+            The id of the member
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Dict[str, TransactionStats]
+            The stats keyed by the member's role, `buyer` or `seller`. Roles the member
+            has no transactions as are missing.
+        """
+        ...
+
+    @abstractmethod
+    async def get_server_stats(self, session: AsyncSession) -> Optional[ServerStats]:
+        """Get the stats across every transaction in the server.
+
+        Parameters
+        ----------
+        session : AsyncSession
+            The session to be used
+
+        Returns
+        -------
+        Optional[ServerStats]
+            The server stats, if there are any transactions.
+        """
+        ...
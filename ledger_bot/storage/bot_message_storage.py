@@ -1,7 +1,7 @@
 """SQLite implementation of BotMessageStorageABC."""
 
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -54,3 +54,12 @@ class BotMessageStorage(BotMessageStorageABC):
         )
         await session.delete(bot_message)
         await session.flush()
+
+    async def list_message_transaction_ids(
+        self, session: AsyncSession
+    ) -> Dict[int, int]:
+        log.info("Listing message_id to transaction_id mappings")
+        result = await session.execute(
+            select(BotMessage.message_id, BotMessage.transaction_id)
+        )
+        return {message_id: transaction_id for message_id, transaction_id in result}
@@ -1,9 +1,11 @@
 """SQLite implementation of CurrencyStorageABC."""
 
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Mapping, Optional
 
-from sqlalchemy import case, func, select, update
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import ColumnElement
@@ -13,7 +15,7 @@ from ledger_bot.errors import (
     CurrencyCreationError,
     CurrencyQueryError,
 )
-from ledger_bot.models import Currency
+from ledger_bot.models import Currency, CurrencyRate, Transaction
 
 from .abstracts import CurrencyStorageABC
 
@@ -48,6 +50,48 @@ class CurrencyStorage(CurrencyStorageABC):
             await session.rollback()
             raise CurrencyCreationError(currency, e)
 
+    async def upsert_currency(
+        self, currency: Currency, session: AsyncSession
+    ) -> Currency:
+        log.info(f"Upserting currency {currency.code}")
+        values = {
+            column.key: getattr(currency, column.key)
+            for column in Currency.__table__.columns
+            if getattr(currency, column.key) is not None
+        }
+        try:
+            # Updating on conflict, rather than doing nothing, means the row is always
+            # returned. An existing record only takes the new rate if it has none.
+            statement = sqlite_insert(Currency).values(**values)
+            missing_rate = Currency.rate.is_(None)
+            result = (
+                await session.scalars(
+                    statement.on_conflict_do_update(
+                        index_elements=[Currency.code],
+                        set_={
+                            "rate": func.coalesce(
+                                Currency.rate, statement.excluded.rate
+                            ),
+                            "last_updated": case(
+                                (missing_rate, statement.excluded.last_updated),
+                                else_=Currency.last_updated,
+                            ),
+                        },
+                    )
+                    .returning(Currency)
+                    .execution_options(populate_existing=True)
+                )
+            ).one()
+            log.info(f"Upserted currency {result.code}")
+            return result
+
+        except SQLAlchemyError as e:
+            log.exception(
+                f"Upserting currency {currency.code} raised an SQLAlchemyError"
+            )
+            await session.rollback()
+            raise CurrencyCreationError(currency, e)
+
     async def list_currencies(
         self, *filters: ColumnElement[bool], session: AsyncSession
     ) -> Optional[List[Currency]]:
@@ -91,3 +135,58 @@ class CurrencyStorage(CurrencyStorageABC):
         await session.commit()
         await session.refresh(db_currency)
         return db_currency
+
+    async def update_rates(
+        self,
+        rates: Mapping[str, float],
+        base_currency: str,
+        last_updated: datetime,
+        session: AsyncSession,
+    ) -> List[str]:
+        codes = list(
+            (
+                await session.execute(
+                    select(Currency.code).where(Currency.code.in_(list(rates)))
+                )
+            ).scalars()
+        )
+        log.info(f"Updating the rates for {len(codes)} currencies")
+
+        if codes:
+            # Bulk UPDATE by primary key, a single executemany rather than a statement per currency
+            await session.execute(
+                update(Currency),
+                [
+                    {"code": code, "rate": rates[code], "last_updated": last_updated}
+                    for code in codes
+                ],
+            )
+            await session.execute(
+                insert(CurrencyRate),
+                [
+                    {
+                        "currency_code": code,
+                        "base_currency": base_currency,
+                        "rate": rates[code],
+                        "recorded_at": last_updated,
+                    }
+                    for code in codes
+                ],
+            )
+
+            # Transactions created before their currency had a rate. They're updated through
+            # the ORM, rather than in bulk, so the stats rollups follow the new prices.
+            missing = await session.scalars(
+                select(Transaction).where(
+                    Transaction.currency_code.in_(codes),
+                    Transaction.exchange_rate.is_(None),
+                )
+            )
+            for transaction in missing.unique():
+                transaction.exchange_rate = rates[transaction.currency_code]
+                log.info(
+                    f"Snapshotting the exchange rate of transaction {transaction.id}"
+                )
+            await session.flush()
+
+        return codes
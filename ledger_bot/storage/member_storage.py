@@ -1,9 +1,10 @@
 """SQLite implementation of MemberStorageABC."""
 
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, cast
 
-from sqlalchemy import case, func, select, update
+from sqlalchemy import Table, case, func, select, update
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import ColumnElement
@@ -52,6 +53,67 @@ class MemberStorage(MemberStorageABC):
             await session.rollback()
             raise MemberCreationError(member, e)
 
+    async def upsert_member(self, member: Member, session: AsyncSession) -> Member:
+        log.info(f"Upserting member {member.username} ({member.discord_id})")
+        values = {
+            column.key: getattr(member, column.key)
+            for column in Member.__table__.columns
+            if getattr(member, column.key) is not None
+        }
+        try:
+            # Updating on conflict, rather than doing nothing, means the row is always
+            # returned, so an existing member doesn't need a second SELECT
+            statement = insert(Member).values(**values)
+            result = (
+                await session.scalars(
+                    statement.on_conflict_do_update(
+                        index_elements=[Member.discord_id],
+                        set_={"username": statement.excluded.username},
+                    )
+                    .returning(Member)
+                    .execution_options(populate_existing=True)
+                )
+            ).one()
+            log.info(f"Upserted member with id {result.id}")
+            return result
+
+        except SQLAlchemyError as e:
+            log.exception(
+                f"Upserting member {member.username} ({member.discord_id}) raised an SQLAlchemyError"
+            )
+            await session.rollback()
+            raise MemberCreationError(member, e)
+
+    async def upsert_members(
+        self, members: Sequence[Mapping[str, Any]], session: AsyncSession
+    ) -> None:
+        log.info(f"Upserting {len(members)} members")
+        # A Core statement on the table, so the batch is sent as a single executemany
+        statement = insert(cast(Table, Member.__table__))
+        try:
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[Member.discord_id],
+                    set_={
+                        "username": statement.excluded.username,
+                        "nickname": statement.excluded.nickname,
+                    },
+                ),
+                list(members),
+            )
+        except SQLAlchemyError as e:
+            log.exception(f"Upserting {len(members)} members raised an SQLAlchemyError")
+            raise MemberQueryError("Failed to upsert members", e)
+
+    async def get_member_names(
+        self, session: AsyncSession
+    ) -> Dict[int, Tuple[str, Optional[str]]]:
+        log.info("Getting every member's names")
+        result = await session.execute(
+            select(Member.discord_id, Member.username, Member.nickname)
+        )
+        return {row.discord_id: (row.username, row.nickname) for row in result}
+
     async def list_members(
         self, *filters: ColumnElement[bool], session: AsyncSession
     ) -> Optional[List[Member]]:
@@ -0,0 +1,489 @@
+"""SQLite implementation of StatsStorageABC.
+
+The `member_stats` and `server_stats` rollup tables are updated whenever transactions are
+flushed, inside the same database transaction, so reading stats never touches the
+transaction history.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, event, func, literal, union_all, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import get_history
+
+from ledger_bot.database import LedgerSession
+from ledger_bot.models import (
+    Member,
+    MemberStatsRollup,
+    ServerStats,
+    ServerStatsRollup,
+    Transaction,
+    TransactionStats,
+)
+
+from .abstracts import StatsStorageABC
+from .transaction_storage import STATUS_COLUMNS, status_conditions
+
+log = logging.getLogger(__name__)
+
+# The column holding the member a transaction counts towards, in each role
+ROLES = {"buyer": "buyer_id", "seller": "seller_id"}
+
+SUMMED_COLUMNS = (
+    "unapproved",
+    "approved",
+    "paid",
+    "delivered",
+    "completed",
+    "cancelled",
+    "total_count",
+    "total_price",
+)
+
+SERVER_STATS_ID = 1
+
+
+@dataclass(frozen=True, slots=True)
+class _TransactionState:
+    """The values of a transaction that the rollups are built from."""
+
+    id: int  # noqa: A003
+    buyer_id: int
+    seller_id: int
+    price: float
+    gbp_price: float
+    sale_approved: bool
+    buyer_paid: bool
+    seller_paid: bool
+    buyer_delivered: bool
+    seller_delivered: bool
+    cancelled: bool
+
+    @property
+    def statuses(self) -> Set[str]:
+        """The statuses the transaction is counted under, matching `status_conditions`."""
+        paid = self.buyer_paid and self.seller_paid
+        delivered = self.buyer_delivered and self.seller_delivered
+
+        if self.cancelled:
+            return {"cancelled"}
+
+        statuses = set()
+        if not any(
+            (
+                self.sale_approved,
+                self.buyer_paid,
+                self.seller_paid,
+                self.buyer_delivered,
+                self.seller_delivered,
+            )
+        ):
+            statuses.add("unapproved")
+        if self.sale_approved and not delivered and not paid:
+            statuses.add("approved")
+        if paid:
+            statuses.add("paid")
+        if delivered:
+            statuses.add("delivered")
+        if self.sale_approved and paid and delivered:
+            statuses.add("completed")
+        return statuses
+
+    @classmethod
+    def of(cls, transaction: Transaction, before: bool = False) -> "_TransactionState":
+        """Get the transaction's state, or its state before the changes being flushed."""
+
+        def value(name: str):
+            if before and (history := get_history(transaction, name)).deleted:
+                return history.deleted[0]
+            return getattr(transaction, name)
+
+        # Mirrors Transaction.gbp_price
+        price = value("price")
+        exchange_rate = value("exchange_rate")
+        gbp_price = price
+        if value("currency_code") != "GBP" and exchange_rate:
+            gbp_price = price * exchange_rate
+
+        return cls(
+            id=transaction.id,
+            buyer_id=value("buyer_id"),
+            seller_id=value("seller_id"),
+            price=price,
+            gbp_price=gbp_price,
+            **{column: bool(value(column)) for column in STATUS_COLUMNS},
+        )
+
+
+_Change = Tuple[Optional[_TransactionState], Optional[_TransactionState]]
+
+
+def _flushed_changes(session: Session) -> List[_Change]:
+    """The state of each transaction being flushed before and after, None if it didn't or won't exist."""
+    changes: List[_Change] = []
+    for instance in session.new:
+        if isinstance(instance, Transaction):
+            changes.append((None, _TransactionState.of(instance)))
+    for instance in session.dirty:
+        if isinstance(instance, Transaction) and session.is_modified(instance):
+            before = _TransactionState.of(instance, before=True)
+            after = _TransactionState.of(instance)
+            if before != after:
+                changes.append((before, after))
+    for instance in session.deleted:
+        if isinstance(instance, Transaction):
+            changes.append((_TransactionState.of(instance, before=True), None))
+    return changes
+
+
+def _apply_member_rollups(
+    connection: Connection,
+    deltas: Dict[Tuple[int, str], Dict[str, float]],
+    reranked: Set[Tuple[int, str]],
+) -> None:
+    for (member_id, role), delta in deltas.items():
+        if not any(delta.values()) and (member_id, role) not in reranked:
+            continue
+
+        upsert = insert(MemberStatsRollup).values(
+            member_id=member_id,
+            role=role,
+            **{column: delta[column] for column in SUMMED_COLUMNS},
+        )
+        connection.execute(
+            upsert.on_conflict_do_update(
+                index_elements=["member_id", "role"],
+                set_={
+                    column: getattr(MemberStatsRollup, column) + upsert.excluded[column]
+                    for column in SUMMED_COLUMNS
+                },
+            )
+        )
+
+    for member_id, role in reranked:
+        member_column = getattr(Transaction, ROLES[role])
+        connection.execute(
+            update(MemberStatsRollup)
+            .where(
+                MemberStatsRollup.member_id == member_id,
+                MemberStatsRollup.role == role,
+            )
+            .values(
+                first_transaction_id=select(func.min(Transaction.id))
+                .where(member_column == member_id)
+                .scalar_subquery(),
+                most_expensive_transaction_id=select(Transaction.id)
+                .where(member_column == member_id)
+                .order_by(
+                    Transaction.price.desc(), Transaction.creation_date, Transaction.id
+                )
+                .limit(1)
+                .scalar_subquery(),
+            )
+        )
+
+
+def _apply_server_rollup(
+    connection: Connection, delta: Dict[str, float], reranked: bool
+) -> None:
+    if not any(delta.values()) and not reranked:
+        return
+
+    upsert = insert(ServerStatsRollup).values(
+        id=SERVER_STATS_ID,
+        total_count=delta["total_count"],
+        total_value=delta["total_value"],
+    )
+    connection.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                column: getattr(ServerStatsRollup, column) + upsert.excluded[column]
+                for column in ("total_count", "total_value")
+            },
+        )
+    )
+
+    if reranked:
+        connection.execute(
+            update(ServerStatsRollup)
+            .where(ServerStatsRollup.id == SERVER_STATS_ID)
+            .values(
+                most_expensive_transaction_id=select(Transaction.id)
+                .order_by(Transaction.price.desc(), Transaction.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+        )
+
+
+def update_rollups(session: Session, flush_context) -> None:
+    """Apply the transactions flushed in a session to the rollup tables.
+
+    The contribution of each changed transaction's previous state is subtracted, and that
+    of its new state added. The most expensive and first transactions are only looked up
+    again when a transaction is added, removed, or changes price or members.
+    """
+    changes = _flushed_changes(session)
+    if not changes:
+        return
+
+    member_deltas: Dict[Tuple[int, str], Dict[str, float]] = defaultdict(
+        lambda: defaultdict(int)
+    )
+    server_delta: Dict[str, float] = defaultdict(int)
+    rerank_members: Set[Tuple[int, str]] = set()
+    rerank_server = False
+
+    for before, after in changes:
+        ranked = (
+            before is None
+            or after is None
+            or (before.price, before.buyer_id, before.seller_id)
+            != (after.price, after.buyer_id, after.seller_id)
+        )
+        rerank_server = rerank_server or ranked
+
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+
+            for role, member_column in ROLES.items():
+                key = (getattr(state, member_column), role)
+                delta = member_deltas[key]
+                for status in state.statuses:
+                    delta[status] += sign
+                delta["total_count"] += sign
+                delta["total_price"] += sign * state.gbp_price
+                if ranked:
+                    rerank_members.add(key)
+
+            server_delta["total_count"] += sign
+            server_delta["total_value"] += sign * state.price
+
+    connection = session.connection()
+    _apply_member_rollups(connection, member_deltas, rerank_members)
+    _apply_server_rollup(connection, server_delta, rerank_server)
+
+
+event.listen(LedgerSession, "after_flush", update_rollups)
+
+
+def member_rollups_query():
+    """Build every member's `member_stats` rows from the transaction history."""
+    branches = []
+    for role, member_column in ROLES.items():
+        column = getattr(Transaction, member_column)
+        branches.append(
+            select(
+                column.label("member_id"),
+                literal(role).label("role"),
+                Transaction.id,
+                Transaction.price,
+                Transaction.gbp_price.label("gbp_price"),
+                *[getattr(Transaction, status) for status in STATUS_COLUMNS],
+                func.row_number()
+                .over(
+                    partition_by=column,
+                    order_by=(
+                        Transaction.price.desc(),
+                        Transaction.creation_date,
+                        Transaction.id,
+                    ),
+                )
+                .label("price_rank"),
+            )
+        )
+
+    t = union_all(*branches).cte("role_transactions").c
+    return select(
+        t.member_id,
+        t.role,
+        *[
+            func.sum(case((condition, 1), else_=0)).label(status)
+            for status, condition in status_conditions(t).items()
+        ],
+        func.count().label("total_count"),
+        func.sum(t.gbp_price).label("total_price"),
+        func.min(t.id).label("first_transaction_id"),
+        func.max(case((t.price_rank == 1, t.id))).label(
+            "most_expensive_transaction_id"
+        ),
+    ).group_by(t.member_id, t.role)
+
+
+def server_rollup_query():
+    """Build the `server_stats` row from the transaction history."""
+    return select(
+        literal(SERVER_STATS_ID).label("id"),
+        func.count(Transaction.id).label("total_count"),
+        func.coalesce(func.sum(Transaction.price), 0).label("total_value"),
+        select(Transaction.id)
+        .order_by(Transaction.price.desc(), Transaction.id)
+        .limit(1)
+        .scalar_subquery()
+        .label("most_expensive_transaction_id"),
+    )
+
+
+class StatsStorage(StatsStorageABC):
+    """SQLite implementation of StatsStorageABC."""
+
+    async def get_member_stats(
+        self, member_id: int, session: AsyncSession
+    ) -> Dict[str, TransactionStats]:
+        log.debug(f"Getting rolled up stats for {member_id}")
+
+        result = await session.execute(
+            select(MemberStatsRollup, Transaction)
+            .join(
+                Transaction,
+                Transaction.id == MemberStatsRollup.most_expensive_transaction_id,
+            )
+            .where(
+                MemberStatsRollup.member_id == member_id,
+                MemberStatsRollup.total_count > 0,
+            )
+            .options(joinedload(Transaction.buyer), joinedload(Transaction.seller))
+            .execution_options(populate_existing=True)
+        )
+
+        stats = {}
+        for rollup, most_expensive in result:
+            stats[rollup.role] = TransactionStats(
+                unapproved=rollup.unapproved,
+                approved=rollup.approved,
+                paid=rollup.paid,
+                delivered=rollup.delivered,
+                completed=rollup.completed,
+                cancelled=rollup.cancelled,
+                # Matching TransactionStorage.get_member_stats, the total is held in
+                # avg_price and the average in total_price
+                avg_price=rollup.total_price,
+                total_price=rollup.total_price / rollup.total_count,
+                total_count=rollup.total_count,
+                most_expensive_name=most_expensive.wine,
+                most_expensive_member=most_expensive.seller,
+                most_expensive_price=most_expensive.price,
+            )
+        return stats
+
+    async def get_server_stats(self, session: AsyncSession) -> Optional[ServerStats]:
+        log.debug("Getting rolled up server stats")
+
+        result = await session.execute(
+            select(ServerStatsRollup, Transaction)
+            .join(
+                Transaction,
+                Transaction.id == ServerStatsRollup.most_expensive_transaction_id,
+            )
+            .where(
+                ServerStatsRollup.id == SERVER_STATS_ID,
+                ServerStatsRollup.total_count > 0,
+            )
+            .execution_options(populate_existing=True)
+        )
+        row = result.first()
+        if row is None:
+            return None
+
+        rollup, most_expensive = row
+        return ServerStats(
+            total_count=rollup.total_count,
+            total_value=rollup.total_value,
+            avg_price=rollup.total_value / rollup.total_count,
+            most_expensive_name=most_expensive.wine,
+            most_expensive_value=most_expensive.price,
+            top_buyers=await self._top_members("buyer", 3, session),
+            top_sellers=await self._top_members("seller", 3, session),
+        )
+
+    async def _top_members(
+        self, role: str, limit: int, session: AsyncSession
+    ) -> List[Member]:
+        result = await session.scalars(
+            select(Member)
+            .join(MemberStatsRollup, MemberStatsRollup.member_id == Member.id)
+            .where(MemberStatsRollup.role == role, MemberStatsRollup.total_count > 0)
+            .order_by(
+                MemberStatsRollup.total_count.desc(),
+                MemberStatsRollup.first_transaction_id,
+            )
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def rebuild_stats(self, session: AsyncSession) -> List[str]:
+        log.info("Rebuilding the stats rollups")
+
+        previous = await self._snapshot(session)
+
+        await session.execute(delete(MemberStatsRollup))
+        await session.execute(delete(ServerStatsRollup))
+
+        member_query = member_rollups_query()
+        await session.execute(
+            insert(MemberStatsRollup).from_select(
+                [column.name for column in member_query.selected_columns],
+                member_query,
+            )
+        )
+        server_query = server_rollup_query()
+        await session.execute(
+            insert(ServerStatsRollup).from_select(
+                [column.name for column in server_query.selected_columns],
+                server_query,
+            )
+        )
+
+        rebuilt = await self._snapshot(session)
+
+        mismatches = []
+        for key in sorted(previous.keys() | rebuilt.keys()):
+            if previous.get(key) != rebuilt.get(key):
+                mismatches.append(
+                    f"{key}: was {previous.get(key)}, rebuilt as {rebuilt.get(key)}"
+                )
+
+        log.info(f"Rebuilt the stats rollups with {len(mismatches)} mismatches")
+        return mismatches
+
+    async def _snapshot(self, session: AsyncSession) -> Dict[str, tuple]:
+        """Get every non-empty rollup row, keyed by the row it's for."""
+        snapshot: Dict[str, tuple] = {}
+
+        members = await session.execute(
+            select(MemberStatsRollup.member_id, MemberStatsRollup.role)
+            .add_columns(
+                *[
+                    getattr(MemberStatsRollup, column)
+                    for column in SUMMED_COLUMNS
+                    if column != "total_price"
+                ],
+                func.round(MemberStatsRollup.total_price, 2),
+                MemberStatsRollup.first_transaction_id,
+                MemberStatsRollup.most_expensive_transaction_id,
+            )
+            .where(MemberStatsRollup.total_count > 0)
+        )
+        for member_id, role, *values in members:
+            snapshot[f"member {member_id} as {role}"] = tuple(values)
+
+        server = await session.execute(
+            select(
+                ServerStatsRollup.total_count,
+                func.round(ServerStatsRollup.total_value, 2),
+                ServerStatsRollup.most_expensive_transaction_id,
+            ).where(ServerStatsRollup.total_count > 0)
+        )
+        for row in server:
+            snapshot["server"] = tuple(row)
+
+        return snapshot
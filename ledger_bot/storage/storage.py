@@ -7,6 +7,7 @@ from .currency_storage import CurrencyStorage
 from .member_storage import MemberStorage
 from .reaction_role_storage import ReactionRoleStorage
 from .reminder_storage import ReminderStorage
+from .stats_storage import StatsStorage
 from .transaction_storage import TransactionStorage
 
 
@@ -18,3 +19,4 @@ class Storage:
     reminder: ReminderStorage
     transaction: TransactionStorage
     currency: CurrencyStorage
+    stats: StatsStorage
@@ -1,21 +1,75 @@
 """SQLite implementation of TransactionStorageABC."""
 
 import logging
-from typing import List, Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import or_
+from sqlalchemy import and_, case, func, literal, or_, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import InstrumentedAttribute, aliased
 from sqlalchemy.sql import ColumnElement
 
-from ledger_bot.errors import InvalidRoleError
-from ledger_bot.models import Transaction
+from ledger_bot.models import (
+    BotMessage,
+    Currency,
+    Member,
+    ServerStats,
+    Transaction,
+    TransactionListRow,
+    TransactionStats,
+)
 
 from .abstracts import TransactionStorageABC
 
 log = logging.getLogger(__name__)
 
+STATUS_COLUMNS = (
+    "sale_approved",
+    "buyer_paid",
+    "seller_paid",
+    "buyer_delivered",
+    "seller_delivered",
+    "cancelled",
+)
+
+
+def status_conditions(t) -> Dict[str, ColumnElement[bool]]:
+    """The condition for a transaction to be counted under each status.
+
+    `t` is anything with the transaction status columns, e.g. `Transaction` or a CTE's columns.
+    """
+    not_cancelled = t.cancelled.is_(False)
+    return {
+        "unapproved": and_(
+            t.sale_approved.is_(False),
+            t.buyer_delivered.is_(False),
+            t.seller_delivered.is_(False),
+            t.buyer_paid.is_(False),
+            t.seller_paid.is_(False),
+            not_cancelled,
+        ),
+        "approved": and_(
+            t.sale_approved.is_(True),
+            or_(t.buyer_delivered.is_(False), t.seller_delivered.is_(False)),
+            or_(t.buyer_paid.is_(False), t.seller_paid.is_(False)),
+            not_cancelled,
+        ),
+        "paid": and_(t.buyer_paid.is_(True), t.seller_paid.is_(True), not_cancelled),
+        "delivered": and_(
+            t.buyer_delivered.is_(True), t.seller_delivered.is_(True), not_cancelled
+        ),
+        "completed": and_(
+            t.sale_approved.is_(True),
+            t.buyer_delivered.is_(True),
+            t.seller_delivered.is_(True),
+            t.buyer_paid.is_(True),
+            t.seller_paid.is_(True),
+            not_cancelled,
+        ),
+        "cancelled": t.cancelled.is_(True),
+    }
+
 
 class TransactionStorage(TransactionStorageABC):
     """SQLite implementation of TransactionStorageABC."""
@@ -36,6 +90,26 @@ class TransactionStorage(TransactionStorageABC):
         result = await session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_transaction_by_message_id(
+        self,
+        message_id: int,
+        session: AsyncSession,
+        options: Optional[List] = None,
+    ) -> Optional[Transaction]:
+        log.info(f"Getting transaction for bot message {message_id}")
+
+        query = (
+            select(Transaction)
+            .join(BotMessage, BotMessage.transaction_id == Transaction.id)
+            .where(BotMessage.message_id == message_id)
+        )
+
+        if options:
+            query = query.options(*options)
+
+        result = await session.execute(query)
+        return result.unique().scalar_one_or_none()
+
     async def add_transaction(
         self, transaction: Transaction, session: AsyncSession
     ) -> Transaction:
@@ -107,120 +181,235 @@ class TransactionStorage(TransactionStorageABC):
         await session.refresh(db_transaction)
         return db_transaction
 
-    async def get_count_by_status(
+    async def list_member_transaction_rows(
         self,
         member_id: int,
-        role: str,  # "buyer" or "seller"
-        status: str,  # "unapproved", "approved", "paid", "delivered", "complete", "cancelled", "all"
+        *filters: ColumnElement[bool],
+        after: Optional[Tuple[datetime, int]] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+        limit: Optional[int] = None,
         session: AsyncSession,
-    ) -> int:
-        """Returns the count of transactions for a member with a given role and status."""
-        if role == "buyer":
-            role_column = Transaction.buyer_id
-        elif role == "seller":
-            role_column = Transaction.seller_id
-        else:
-            raise InvalidRoleError(role=role)
-
-        # Map status to filters
-        status_filters = {
-            "unapproved": [
-                Transaction.sale_approved.is_(False),
-                Transaction.buyer_delivered.is_(False),
-                Transaction.seller_delivered.is_(False),
-                Transaction.buyer_paid.is_(False),
-                Transaction.seller_paid.is_(False),
-                Transaction.cancelled.is_(False),
-            ],
-            "approved": [
-                Transaction.sale_approved.is_(True),
-                or_(
-                    Transaction.buyer_delivered.is_(False),
-                    Transaction.seller_delivered.is_(False),
-                ),
-                or_(
-                    Transaction.buyer_paid.is_(False),
-                    Transaction.seller_paid.is_(False),
-                ),
-                Transaction.cancelled.is_(False),
-            ],
-            "delivered": [
-                Transaction.buyer_delivered.is_(True),
-                Transaction.seller_delivered.is_(True),
-                Transaction.cancelled.is_(False),
-            ],
-            "paid": [
-                Transaction.buyer_paid.is_(True),
-                Transaction.seller_paid.is_(True),
-                Transaction.cancelled.is_(False),
-            ],
-            "completed": [
-                Transaction.sale_approved.is_(True),
-                Transaction.buyer_delivered.is_(True),
-                Transaction.seller_delivered.is_(True),
-                Transaction.buyer_paid.is_(True),
-                Transaction.seller_paid.is_(True),
-                Transaction.cancelled.is_(False),
-            ],
-            "cancelled": [
-                Transaction.cancelled.is_(True),
-            ],
-            "all": [],
-        }
-
-        if status not in status_filters:
-            raise ValueError(f"Unknown status: {status}")
-
-        # Use list_transactions with filters
-        transactions = await self.list_transactions(  # type: ignore[misc]
-            role_column == member_id,
-            *status_filters[status],
-            session=session,
-        )
-
-        log.debug(f"Returned {transactions}")
-        log.debug(f"type {type(transactions)}")
+    ) -> List[TransactionListRow]:
         log.debug(
-            f"Length {len(transactions) if isinstance(transactions, list) else 'NONE'}"
+            f"Listing transaction rows for {member_id} matching {filters}, after {after}, before {before}, limited to {limit}"
         )
-        return len(transactions) if isinstance(transactions, list) else 0
 
-    async def get_price_stats(
-        self,
-        member_id: int,
-        role: str,  # "buyer" or "seller"
-        session: AsyncSession,
-        include_cancelled: bool = False,
-    ) -> Tuple[float, float]:
-        """Returns (total_price, avg_price) for a member's transactions."""
-        log.debug(f"Getting price stats for {member_id} as {role}")
-
-        if role == "buyer":
-            role_column = Transaction.buyer_id
-        elif role == "seller":
-            role_column = Transaction.seller_id
+        # Paging backwards walks the index in reverse, then the page is put back in order
+        backwards = before is not None
+        key = tuple_(Transaction.creation_date, Transaction.id)
+        keyset = []
+        if after is not None:
+            keyset.append(key > tuple_(literal(after[0]), literal(after[1])))
+        if before is not None:
+            keyset.append(key < tuple_(literal(before[0]), literal(before[1])))
+
+        # One branch per role, so each can walk its (member, creation_date) index and stop
+        # after `limit` rows, however many transactions the member has
+        roles = [
+            ("buying", Transaction.buyer_id, Transaction.seller_id),
+            ("selling", Transaction.seller_id, Transaction.buyer_id),
+        ]
+        branches = []
+        for role, member_column, other_column in roles:
+            branch = select(
+                Transaction.id,
+                Transaction.creation_date,
+                literal(role).label("role"),
+                other_column.label("other_party_id"),
+            ).where(member_column == member_id, *keyset, *filters)
+            if role == "buying":
+                # A member selling to themselves is listed once, as a sale
+                branch = branch.where(Transaction.seller_id != member_id)
+            if backwards:
+                branch = branch.order_by(
+                    Transaction.creation_date.desc(), Transaction.id.desc()
+                )
+            else:
+                branch = branch.order_by(Transaction.creation_date, Transaction.id)
+            branches.append(select(branch.limit(limit).subquery()))
+        page = union_all(*branches).subquery("page")
+
+        other_party = aliased(Member)
+        latest_message_id = (
+            select(func.max(BotMessage.id))
+            .where(BotMessage.transaction_id == page.c.id)
+            .scalar_subquery()
+        )
+        messages = aliased(BotMessage)
+
+        query = (
+            select(
+                Transaction.id,
+                Transaction.creation_date,
+                page.c.role,
+                Transaction.wine,
+                Transaction.price,
+                Currency.symbol,
+                other_party.discord_id.label("other_party_discord_id"),
+                *[getattr(Transaction, column) for column in STATUS_COLUMNS],
+                messages.guild_id,
+                messages.channel_id,
+                messages.message_id,
+            )
+            .select_from(page)
+            .join(Transaction, Transaction.id == page.c.id)
+            .join(Currency, Currency.code == Transaction.currency_code)
+            .join(other_party, other_party.id == page.c.other_party_id)
+            .outerjoin(messages, messages.id == latest_message_id)
+        )
+        if backwards:
+            query = query.order_by(page.c.creation_date.desc(), page.c.id.desc())
         else:
-            raise InvalidRoleError("role must be 'buyer' or 'seller'")
-
-        filters = [role_column == member_id]
-        if not include_cancelled:
-            filters.append(Transaction.cancelled.is_(False))
+            query = query.order_by(page.c.creation_date, page.c.id)
+
+        result = await session.execute(query.limit(limit))
+
+        rows = []
+        for row in result:
+            values: Dict[str, Any] = dict(row._mapping)
+            for column in STATUS_COLUMNS:
+                values[column] = bool(values[column])
+            rows.append(TransactionListRow(**values))
+
+        if backwards:
+            rows.reverse()
+        return rows
+
+    async def get_member_stats(
+        self, member_id: int, session: AsyncSession
+    ) -> Dict[str, TransactionStats]:
+        log.debug(f"Getting transaction stats for {member_id}")
+
+        # A member's transactions, once per role they had in it. The most expensive member
+        # has always been the transaction's seller, in either role.
+        roles = [
+            ("buyer", Transaction.buyer_id),
+            ("seller", Transaction.seller_id),
+        ]
+        member_transactions = union_all(
+            *[
+                select(
+                    literal(role).label("role"),
+                    Transaction.seller_id.label("counterparty_id"),
+                    Transaction.wine,
+                    Transaction.price,
+                    Transaction.gbp_price.label("gbp_price"),
+                    *[getattr(Transaction, column) for column in STATUS_COLUMNS],
+                    # Ties go to the earliest transaction, as they did when the top row of
+                    # the member's (creation_date, id) index was taken
+                    func.row_number()
+                    .over(
+                        order_by=(
+                            Transaction.price.desc(),
+                            Transaction.creation_date,
+                            Transaction.id,
+                        )
+                    )
+                    .label("price_rank"),
+                ).where(role_column == member_id)
+                for role, role_column in roles
+            ]
+        ).cte("member_transactions")
+
+        t = member_transactions.c
+        most_expensive = t.price_rank == 1
+        role_stats = (
+            select(
+                t.role,
+                *[
+                    func.sum(case((condition, 1), else_=0)).label(status)
+                    for status, condition in status_conditions(t).items()
+                ],
+                func.count().label("total_count"),
+                # TransactionStats has always held the total in avg_price, and the
+                # average in total_price
+                func.sum(t.gbp_price).label("avg_price"),
+                func.avg(t.gbp_price).label("total_price"),
+                func.max(case((most_expensive, t.wine))).label("most_expensive_name"),
+                func.max(case((most_expensive, t.price))).label("most_expensive_price"),
+                func.max(case((most_expensive, t.counterparty_id))).label(
+                    "counterparty_id"
+                ),
+            )
+            .group_by(t.role)
+            .subquery()
+        )
 
-        # Load all relevant transactions with currencies
         result = await session.execute(
-            select(Transaction)
-            .where(*filters)
-            .options(joinedload(Transaction.currency))
+            select(role_stats, Member).outerjoin(
+                Member, Member.id == role_stats.c.counterparty_id
+            )
         )
-        transactions = result.scalars().all()
-
-        # Calculate GBP-equivalent prices
-        gbp_prices = [t.gbp_price for t in transactions]
-
-        if not gbp_prices:
-            return 0.0, 0.0
 
-        total = sum(gbp_prices)
-        avg = total / len(gbp_prices)
+        stats = {}
+        for row in result:
+            stats[row.role] = TransactionStats(
+                unapproved=row.unapproved,
+                approved=row.approved,
+                paid=row.paid,
+                delivered=row.delivered,
+                completed=row.completed,
+                cancelled=row.cancelled,
+                avg_price=row.avg_price or 0,
+                total_price=row.total_price or 0,
+                total_count=row.total_count,
+                most_expensive_name=row.most_expensive_name,
+                most_expensive_member=row.Member,
+                most_expensive_price=row.most_expensive_price,
+            )
+        return stats
+
+    async def get_server_stats(self, session: AsyncSession) -> Optional[ServerStats]:
+        log.debug("Getting server stats")
+
+        most_expensive = (
+            select(Transaction.wine, Transaction.price)
+            .order_by(Transaction.price.desc(), Transaction.id)
+            .limit(1)
+            .subquery()
+        )
+        result = await session.execute(
+            select(
+                func.count(Transaction.id).label("total_count"),
+                func.sum(Transaction.price).label("total_value"),
+                func.avg(Transaction.price).label("avg_price"),
+                select(most_expensive.c.wine).scalar_subquery().label("wine"),
+                select(most_expensive.c.price).scalar_subquery().label("price"),
+            )
+        )
+        totals = result.one()
+
+        if totals.total_count == 0:
+            return None
+
+        return ServerStats(
+            total_count=totals.total_count,
+            total_value=totals.total_value,
+            avg_price=totals.avg_price,
+            most_expensive_name=totals.wine,
+            most_expensive_value=totals.price,
+            top_buyers=await self._top_members(Transaction.buyer_id, 3, session),
+            top_sellers=await self._top_members(Transaction.seller_id, 3, session),
+        )
 
-        return total, avg
+    async def _top_members(
+        self, role_column: InstrumentedAttribute[int], limit: int, session: AsyncSession
+    ) -> List[Member]:
+        """The members with the most transactions in a role, ties going to whoever was first."""
+        counts = (
+            select(
+                role_column.label("member_id"),
+                func.count().label("count"),
+                func.min(Transaction.id).label("first_id"),
+            )
+            .group_by(role_column)
+            .order_by(func.count().desc(), func.min(Transaction.id))
+            .limit(limit)
+            .subquery()
+        )
+        result = await session.scalars(
+            select(Member)
+            .join(counts, Member.id == counts.c.member_id)
+            .order_by(counts.c.count.desc(), counts.c.first_id)
+        )
+        return list(result.all())
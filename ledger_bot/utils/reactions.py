@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING, Optional
 import discord
 from emoji import is_emoji
 
+from ledger_bot.outbound_scheduler import Priority
+
 if TYPE_CHECKING:
     from ledger_bot.clients import ExtendedClient
 
@@ -19,101 +21,82 @@ def is_valid_emoji(emoji: str) -> bool:
     return is_emoji(emoji) or bool(pattern.match(emoji))
 
 
-async def _add_reaction_with_channel(
-    client: "ExtendedClient",
-    message_id: int,
-    reaction: str,
-    channel: discord.TextChannel,
-) -> bool:
+async def _add_reaction(message: discord.PartialMessage, reaction: str) -> bool:
     try:
-        log.info(f"Searching for {message_id} in {channel.name} - {channel.id}")
-        message = await channel.fetch_message(message_id)
-
-        try:
-            log.info(f"Adding {reaction} to {message.id}")
-            await message.add_reaction(reaction)
-
-            return True
-        except discord.NotFound as error:
-            log.error(f"The reaction was not found: {error}")
-        except discord.Forbidden as error:
-            log.error(f"You don't have permission to add the reaction: {error}")
-        except discord.HTTPException as error:
-            log.error(f"An error occured adding the reaction: {error}")
-        except TypeError as error:
-            log.error(f"The emoji paramater {reaction} is invalid: {error}")
-    except discord.NotFound:
-        log.info("Message not found")
-    except discord.errors.Forbidden:
-        log.info(
-            f"Skipping channel {channel.id} - {client.config.name} doesn't have access."
-        )
+        log.info(f"Adding {reaction} to {message.id}")
+        await message.add_reaction(reaction)
+        return True
+    except discord.NotFound as error:
+        log.error(f"The message or reaction was not found: {error}")
+    except discord.Forbidden as error:
+        log.error(f"You don't have permission to add the reaction: {error}")
+    except discord.HTTPException as error:
+        log.error(f"An error occured adding the reaction: {error}")
+    except TypeError as error:
+        log.error(f"The emoji paramater {reaction} is invalid: {error}")
 
     return False
 
 
-async def add_reaction(
+async def _remove_reaction(message: discord.PartialMessage, reaction: str) -> bool:
+    try:
+        log.info(f"Removing {reaction} from {message.id}")
+        await message.clear_reaction(reaction)
+        return True
+    except discord.NotFound as error:
+        log.error(f"The message or reaction was not found: {error}")
+    except discord.Forbidden as error:
+        log.error(f"You don't have permission to remove the reaction: {error}")
+    except discord.HTTPException as error:
+        log.error(f"An error occured removing the reaction: {error}")
+    except TypeError as error:
+        log.error(f"The emoji paramater {reaction} is invalid: {error}")
+
+    return False
+
+
+async def _partial_message(
     client: "ExtendedClient",
     message_id: int,
-    reaction: str,
-    channel_obj: Optional[discord.TextChannel] = None,
-) -> None:
-    """Adds the specified reaction to the given message."""
-    log.info(f"Adding {reaction} to message {message_id}")
-
-    if channel_obj is not None:
-        await _add_reaction_with_channel(
-            client=client, message_id=message_id, reaction=reaction, channel=channel_obj
-        )
+    channel: Optional[discord.TextChannel],
+) -> Optional[discord.PartialMessage]:
+    """Get a message to react to, without fetching it."""
+    if channel is None:
+        channel = await client.locate_message(message_id)
+        if channel is None:
+            log.warning(f"Couldn't find which channel message {message_id} is in")
+            return None
     else:
-        for guild in client.guilds:
-            for channel in guild.text_channels:
-                success = await _add_reaction_with_channel(
-                    client=client,
-                    message_id=message_id,
-                    reaction=reaction,
-                    channel=channel,
-                )
+        client.remember_message_location(message_id, channel.id)
 
-                if success:
-                    break
+    return channel.get_partial_message(message_id)
 
 
-async def _remove_reaction_with_channel(
+async def add_reaction(
     client: "ExtendedClient",
     message_id: int,
     reaction: str,
-    channel: discord.TextChannel,
+    channel_obj: Optional[discord.TextChannel] = None,
 ) -> bool:
-    try:
-        log.info(f"Searching for {message_id} in {channel.name} - {channel.id}")
-        message = await channel.fetch_message(message_id)
-
-        try:
-            log.info(f"Removing {reaction} from {message.id}")
-            await message.clear_reaction(reaction)
-
-            return True
-        except discord.NotFound as error:
-            log.error(f"The reaction was not found: {error}")
-        except discord.Forbidden as error:
-            log.error(
-                f"You don't have permission to remove the reaction: {error}"
-                f"You're permissions are: "
-            )
-        except discord.HTTPException as error:
-            log.error(f"An error occured remove the reaction: {error}")
-        except TypeError as error:
-            log.error(f"The emoji paramater {reaction} is invalid: {error}")
-
-    except discord.NotFound:
-        log.info("Message not found")
-    except discord.Forbidden as error:
-        log.error(f"You don't have permission to read from that channel: {error}")
-    except discord.HTTPException as error:
-        log.error(f"An error occured reading the message: {error}")
+    """Adds the specified reaction to the given message, returning whether it was added.
 
-    return False
+    The message isn't fetched. If `channel_obj` isn't given, the message's channel is
+    looked up with `ExtendedClient.locate_message`.
+    """
+    log.info(f"Adding {reaction} to message {message_id}")
+
+    message = await _partial_message(client, message_id, channel_obj)
+    if message is None:
+        return False
+
+    # Adding then removing a reaction before either is sent leaves just the removal
+    added = await client.outbound.run(
+        ("reactions", message.channel.id),
+        Priority.COSMETIC,
+        lambda: _add_reaction(message, reaction),
+        merge_key=(message_id, reaction),
+    )
+    return bool(added)
 
 
 async def remove_reaction(
@@ -121,25 +104,22 @@ async def remove_reaction(
     message_id: int,
     reaction: str,
     channel_obj: Optional[discord.TextChannel] = None,
-) -> None:
-    """Removes the specified reaction from the given message."""
+) -> bool:
+    """Removes the specified reaction from the given message, returning whether it was removed.
+
+    The message isn't fetched. If `channel_obj` isn't given, the message's channel is
+    looked up with `ExtendedClient.locate_message`.
+    """
     log.info(f"Removing {reaction} from message {message_id}")
 
-    if channel_obj is not None:
-        await _remove_reaction_with_channel(
-            client=client, message_id=message_id, reaction=reaction, channel=channel_obj
-        )
-    else:
-        log.info("No channel ID was specified, iterating through all known channels")
-
-        for guild in client.guilds:
-            for channel in guild.text_channels:
-                success = await _remove_reaction_with_channel(
-                    client=client,
-                    message_id=message_id,
-                    reaction=reaction,
-                    channel=channel,
-                )
-
-                if success:
-                    break
+    message = await _partial_message(client, message_id, channel_obj)
+    if message is None:
+        return False
+
+    removed = await client.outbound.run(
+        ("reactions", message.channel.id),
+        Priority.COSMETIC,
+        lambda: _remove_reaction(message, reaction),
+        merge_key=(message_id, reaction),
+    )
+    return bool(removed)
@@ -2,5 +2,6 @@
 
 from .reminder_form import CreateReminderButton
 from .settings_form import CreateSettingsButtons
+from .transaction_list_view import TransactionListView
 
-__all__ = ["CreateReminderButton", "CreateSettingsButtons"]
+__all__ = ["CreateReminderButton", "CreateSettingsButtons", "TransactionListView"]
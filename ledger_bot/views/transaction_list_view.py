@@ -0,0 +1,110 @@
+"""A paginated view of a member's transactions."""
+
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+import discord
+
+from ledger_bot.database import profile_handler
+from ledger_bot.message_generators import generate_list_page_message
+from ledger_bot.message_generators.generate_list_page_message import FILTER_TITLES
+from ledger_bot.models import Member, TransactionListPage
+
+if TYPE_CHECKING:
+    from ledger_bot.LedgerBot import LedgerBot
+
+log = logging.getLogger(__name__)
+
+
+class TransactionListView(discord.ui.View):
+    """Pages through a member's transactions, one query per click.
+
+    Only the current page is held; Previous and Next fetch the neighbouring page from the
+    keys at either end of it.
+    """
+
+    page: TransactionListPage
+
+    def __init__(
+        self,
+        client: "LedgerBot",
+        requestor: Member,
+        list_filter: str = "all",
+        timeout: float = 300,
+    ) -> None:
+        super().__init__(timeout=timeout)
+        self.client = client
+        self.requestor = requestor
+        self.list_filter = "all"
+        self.page_number = 1
+        self.page = TransactionListPage(rows=())
+
+        self._set_filter(self.filter_select, list_filter)
+
+    async def load(
+        self,
+        after: Optional[Tuple[datetime, int]] = None,
+        before: Optional[Tuple[datetime, int]] = None,
+    ) -> str:
+        """Fetch a page and update the buttons to match it.
+
+        Returns
+        -------
+        str
+            The content of the message showing the page
+        """
+        async with profile_handler("view:transaction_list"):
+            self.page = (
+                await self.client.service.transaction.get_member_transaction_page(
+                    self.requestor, self.list_filter, after=after, before=before
+                )
+            )
+
+        self.previous_button.disabled = not self.page.has_previous
+        self.next_button.disabled = not self.page.has_next
+        return generate_list_page_message(self.page, self.list_filter, self.page_number)
+
+    def _set_filter(self, select: discord.ui.Select, list_filter: str) -> None:
+        self.list_filter = list_filter
+        # New options each time, as the decorator's options are shared between views
+        select.options = [
+            discord.SelectOption(label=title, value=value, default=value == list_filter)
+            for value, title in FILTER_TITLES.items()
+        ]
+
+    async def interaction_check(self, interaction: discord.Interaction[Any]) -> bool:
+        return interaction.user.id == self.requestor.discord_id
+
+    @discord.ui.select(
+        placeholder="Show...",
+        options=[
+            discord.SelectOption(label=title, value=list_filter)
+            for list_filter, title in FILTER_TITLES.items()
+        ],
+        row=0,
+    )
+    async def filter_select(
+        self, interaction: discord.Interaction[Any], select: discord.ui.Select
+    ) -> None:
+        self._set_filter(select, select.values[0])
+
+        self.page_number = 1
+        content = await self.load()
+        await interaction.response.edit_message(content=content, view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, row=1)
+    async def previous_button(
+        self, interaction: discord.Interaction[Any], button: discord.ui.Button
+    ) -> None:
+        self.page_number = max(self.page_number - 1, 1)
+        content = await self.load(before=self.page.first_key)
+        await interaction.response.edit_message(content=content, view=self)
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.primary, row=1)
+    async def next_button(
+        self, interaction: discord.Interaction[Any], button: discord.ui.Button
+    ) -> None:
+        self.page_number += 1
+        content = await self.load(after=self.page.last_key)
+        await interaction.response.edit_message(content=content, view=self)
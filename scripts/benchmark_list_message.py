@@ -0,0 +1,85 @@
+"""Benchmark rendering and splitting long transaction lists.
+
+Times `generate_list_message` over lists of increasing length. The time per line should stay
+roughly flat as the list grows, as the chunker is linear in the length of the content.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from functools import partial
+
+import typer
+
+from ledger_bot.message_generators import generate_list_message
+from ledger_bot.message_generators.split_message import split_message
+from ledger_bot.models import TransactionListRow
+
+
+def _rows(count: int) -> list[TransactionListRow]:
+    return [
+        TransactionListRow(
+            id=i,
+            creation_date=datetime(2025, 1, 1),
+            role=random.choice(("buying", "selling")),  # nosec B311
+            wine=f"Wine {i}",
+            price=random.randint(5, 500),  # nosec B311
+            symbol="£",
+            other_party_discord_id=random.randint(1, 50),  # nosec B311
+            sale_approved=random.random() < 0.8,  # nosec B311
+            buyer_paid=random.random() < 0.5,  # nosec B311
+            seller_paid=random.random() < 0.5,  # nosec B311
+            buyer_delivered=random.random() < 0.5,  # nosec B311
+            seller_delivered=random.random() < 0.5,  # nosec B311
+            cancelled=random.random() < 0.1,  # nosec B311
+            guild_id=1,
+            channel_id=2,
+            message_id=i,
+        )
+        for i in range(count)
+    ]
+
+
+def _render(rows: list[TransactionListRow]) -> list[str]:
+    return asyncio.run(generate_list_message(transactions=rows))
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(lines: int = 10000, steps: int = 3, repeat: int = 5):
+    """Time rendering transaction lists of `lines`, then 10x and 100x as many, and so on.
+
+    --lines: transactions in the smallest list
+    --steps: number of list sizes to time
+    --repeat: runs of each size, the fastest is reported
+    """
+    logging.basicConfig(level=logging.WARNING)
+
+    for step in range(steps):
+        count = lines * 10**step
+        rows = _rows(count)
+        text = [f"- line {i}" for i in range(count)]
+
+        render = _best_of(repeat, partial(_render, rows))
+        split = _best_of(repeat, partial(split_message, text))
+        messages = _render(rows)
+
+        typer.echo(
+            f"{count:>9} lines: "
+            f"render {render * 1000:8.1f}ms ({render / count * 1e6:5.2f}us/line), "
+            f"split {split * 1000:8.1f}ms ({split / count * 1e6:5.2f}us/line), "
+            f"{len(messages)} messages"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,152 @@
+"""Benchmark concurrent read/write throughput with SQLite's defaults against the configured connection profile.
+
+Each run seeds a scratch database, then for a fixed duration runs reader tasks (transaction lookups, as
+reactions do) alongside writer tasks (status updates, as reactions and the cleanup job do).
+"""
+
+import asyncio
+import logging
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import typer
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ledger_bot.core import Config
+from ledger_bot.core.config import DatabaseConfig
+from ledger_bot.database import setup_database
+from ledger_bot.models import Member, Transaction
+from ledger_bot.models.base import Base
+
+# SQLite's own defaults, keeping the 5 second busy timeout that Python's sqlite3 module applies
+DEFAULT_PROFILE = DatabaseConfig(
+    journal_mode="delete",
+    synchronous="full",
+    busy_timeout=5000,
+    cache_size=-2000,
+    mmap_size=0,
+    temp_store="default",
+)
+
+
+@dataclass
+class BenchmarkResult:
+    reads: int = 0
+    writes: int = 0
+    errors: int = 0
+
+
+async def _seed(session_factory: async_sessionmaker[AsyncSession], rows: int) -> None:
+    async with session_factory() as session:
+        members = [Member(username=f"member{i}", discord_id=i) for i in range(50)]
+        session.add_all(members)
+        await session.flush()
+
+        session.add_all(
+            Transaction(
+                wine=f"Wine {i}",
+                price=random.randint(5, 500),  # nosec B311
+                seller_id=random.choice(members).id,  # nosec B311
+                buyer_id=random.choice(members).id,  # nosec B311
+                bot_id="benchmark",
+            )
+            for i in range(rows)
+        )
+        await session.commit()
+
+
+async def _reader(session_factory, rows: int, deadline: float, result: BenchmarkResult):
+    while time.perf_counter() < deadline:
+        try:
+            async with session_factory() as session:
+                await session.execute(
+                    select(Transaction).where(
+                        Transaction.id == random.randint(1, rows)  # nosec B311
+                    )
+                )
+            result.reads += 1
+        except OperationalError:
+            result.errors += 1
+
+
+async def _writer(session_factory, rows: int, deadline: float, result: BenchmarkResult):
+    while time.perf_counter() < deadline:
+        try:
+            async with session_factory() as session:
+                await session.execute(
+                    update(Transaction)
+                    .where(Transaction.id == random.randint(1, rows))  # nosec B311
+                    .values(buyer_paid=random.randint(0, 1))  # nosec B311
+                )
+                await session.commit()
+            result.writes += 1
+        except OperationalError:
+            result.errors += 1
+
+
+async def _run(
+    profile: DatabaseConfig,
+    readers: int,
+    writers: int,
+    rows: int,
+    duration: float,
+) -> BenchmarkResult:
+    with tempfile.TemporaryDirectory() as folder:
+        config = Config()
+        config.database_path = Path(folder) / "benchmark.sql"
+        config.database = profile
+
+        session_factory = setup_database(config)
+        engine = session_factory.kw["bind"]
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await _seed(session_factory, rows)
+
+        result = BenchmarkResult()
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(
+            *[_reader(session_factory, rows, deadline, result) for _ in range(readers)],
+            *[_writer(session_factory, rows, deadline, result) for _ in range(writers)],
+        )
+
+        await engine.dispose()
+        return result
+
+
+def main(readers: int = 8, writers: int = 2, rows: int = 5000, duration: float = 5.0):
+    """Compare SQLite's default connection profile with the one from config.json.
+
+    --readers: concurrent reader tasks
+    --writers: concurrent writer tasks
+    --rows: transactions to seed
+    --duration: seconds to run each profile for
+    """
+    logging.basicConfig(level=logging.WARNING)
+    configured = Config.load().database
+
+    for name, profile in (("default", DEFAULT_PROFILE), ("configured", configured)):
+        result = asyncio.run(
+            _run(
+                profile,
+                readers=readers,
+                writers=writers,
+                rows=rows,
+                duration=duration,
+            )
+        )
+        typer.echo(
+            f"{name:>10} ({profile.journal_mode}/{profile.synchronous}): "
+            f"{result.reads / duration:8.0f} reads/s "
+            f"{result.writes / duration:8.0f} writes/s "
+            f"{result.errors} errors"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,181 @@
+"""Shared fixtures."""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from ledger_bot.core.config import ExchangeRateConfig
+from ledger_bot.database import LedgerSession
+from ledger_bot.models import Currency, Member, Transaction
+from ledger_bot.models.base import Base
+
+
+@pytest_asyncio.fixture
+async def db_engine():
+    """An in-memory database containing the full schema."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session_factory(db_engine):
+    """A session factory matching the one built by setup_database."""
+    return async_sessionmaker(
+        db_engine,
+        class_=AsyncSession,
+        sync_session_class=LedgerSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+@pytest_asyncio.fixture
+async def transaction(session_factory):
+    """A transaction between two members."""
+    async with session_factory() as session:
+        seller = Member(username="seller", discord_id=1)
+        buyer = Member(username="buyer", discord_id=2)
+        session.add_all([seller, buyer])
+        await session.flush()
+
+        transaction = Transaction(
+            wine="Claret", price=10, seller_id=seller.id, buyer_id=buyer.id, bot_id=""
+        )
+        session.add(transaction)
+        await session.commit()
+        return transaction
+
+
+@pytest_asyncio.fixture
+async def members(session_factory):
+    """A member with a mix of purchases and sales, in GBP and other currencies."""
+    async with session_factory() as session:
+        alice = Member(username="alice", discord_id=1)
+        bob = Member(username="bob", discord_id=2)
+        carol = Member(username="carol", discord_id=3)
+        rates = {"GBP": 1, "USD": 0.5, "EUR": None}
+        session.add_all(
+            [
+                alice,
+                bob,
+                carol,
+                *[
+                    Currency(code=code, symbol=symbol, rate=rates[code])
+                    for code, symbol in (("GBP", "£"), ("USD", "$"), ("EUR", "€"))
+                ],
+            ]
+        )
+        await session.flush()
+
+        def transaction(wine, price, seller, buyer, currency="GBP", **status):
+            return Transaction(
+                wine=wine,
+                price=price,
+                seller_id=seller.id,
+                buyer_id=buyer.id,
+                currency_code=currency,
+                exchange_rate=rates[currency],
+                bot_id="",
+                **status,
+            )
+
+        session.add_all(
+            [
+                # Alice's purchases
+                transaction("Claret", 10, bob, alice),
+                transaction("Rioja", 40, carol, alice, "USD", sale_approved=True),
+                transaction(
+                    "Barolo",
+                    30,
+                    bob,
+                    alice,
+                    sale_approved=True,
+                    buyer_paid=True,
+                    seller_paid=True,
+                    buyer_delivered=True,
+                    seller_delivered=True,
+                ),
+                transaction("Chablis", 20, carol, alice, "EUR", cancelled=True),
+                # Alice's sale
+                transaction(
+                    "Port", 50, alice, carol, buyer_paid=True, seller_paid=True
+                ),
+                # Nothing to do with Alice
+                transaction("Sherry", 100, bob, carol),
+            ]
+        )
+        await session.commit()
+        return alice, bob, carol
+
+
+@dataclass
+class RateServerState:
+    """What the stand-in exchange rate API returns.
+
+    `failures` are used up one per request before answering normally: an HTTP status to
+    return, or "error" for an API error response.
+    """
+
+    rates: Dict[str, float] = field(default_factory=lambda: {"USD": 1.25, "EUR": 1.15})
+    latency: float = 0
+    failures: List[int | str] = field(default_factory=list)
+    requests: int = 0
+    config: ExchangeRateConfig = field(default_factory=ExchangeRateConfig)
+
+
+@pytest_asyncio.fixture
+async def rate_server():
+    """A local stand-in for the exchange rate API, with injectable latency and errors."""
+    state = RateServerState()
+
+    async def latest(request: web.Request) -> web.Response:
+        state.requests += 1
+        await asyncio.sleep(state.latency)
+
+        failure = state.failures.pop(0) if state.failures else None
+        if failure == "error":
+            return web.json_response(
+                {"result": "error", "error-type": "inactive-account"}, status=403
+            )
+        if failure is not None:
+            return web.json_response({"result": "error"}, status=int(failure))
+
+        return web.json_response(
+            {
+                "result": "success",
+                "base_code": request.match_info["base"],
+                "conversion_rates": {request.match_info["base"]: 1, **state.rates},
+            }
+        )
+
+    app = web.Application()
+    app.router.add_get("/v6/{api_key}/latest/{base}", latest)
+
+    server = TestServer(app)
+    await server.start_server()
+    # Short timeouts and backoff, so failures don't slow the tests down
+    state.config = ExchangeRateConfig(
+        base_url=str(server.make_url("/v6")),
+        timeout=0.5,
+        retries=2,
+        retry_backoff=0.01,
+        circuit_failure_threshold=2,
+        circuit_reset_after=60,
+    )
+
+    yield state
+
+    await server.close()
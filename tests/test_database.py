@@ -0,0 +1,132 @@
+"""Tests covering the connection profile and query profiler in ledger_bot.database."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from ledger_bot.core import Config
+from ledger_bot.core.config import DatabaseConfig
+from ledger_bot.database import (
+    UNTRACKED_HANDLER,
+    QueryProfiler,
+    build_pragmas,
+    setup_database,
+)
+
+
+@pytest.fixture
+def profiler(db_engine):
+    profiler = QueryProfiler()
+    profiler.attach(db_engine.sync_engine)
+    return profiler
+
+
+async def _run(db_engine, *statements):
+    async with db_engine.connect() as conn:
+        for statement in statements:
+            await conn.execute(text(statement))
+
+
+@pytest.mark.asyncio
+async def test_profile_attributes_statements(profiler, db_engine):
+    async with profiler.profile("reaction_add"):
+        await _run(db_engine, "SELECT 1 UNION SELECT 2", "SELECT 1")
+
+    stats = profiler.stats["reaction_add"]
+    assert stats.invocations == 1
+    assert stats.statements == 2
+    assert stats.rows == 3
+    assert stats.max_statements == 2
+    assert stats.sql_time > 0
+    assert stats.wall_time >= stats.sql_time
+
+
+@pytest.mark.asyncio
+async def test_profile_as_decorator(profiler, db_engine):
+    @profiler.profile("job:cleanup")
+    async def cleanup():
+        await _run(db_engine, "SELECT 1")
+
+    await cleanup()
+    await cleanup()
+
+    stats = profiler.stats["job:cleanup"]
+    assert stats.invocations == 2
+    assert stats.statements_per_invocation == 1
+
+
+@pytest.mark.asyncio
+async def test_nested_profile_keeps_outer_handler(profiler, db_engine):
+    async with profiler.profile("dm:!dev"):
+        async with profiler.profile("job:cleanup"):
+            await _run(db_engine, "SELECT 1")
+
+    assert profiler.stats["dm:!dev"].statements == 1
+    assert "job:cleanup" not in profiler.stats
+
+
+@pytest.mark.asyncio
+async def test_untracked_statements(profiler, db_engine):
+    await _run(db_engine, "SELECT 1")
+
+    assert profiler.stats[UNTRACKED_HANDLER].statements == 1
+    assert profiler.stats[UNTRACKED_HANDLER].invocations == 0
+
+
+@pytest.mark.asyncio
+async def test_start_records_when_task_finishes(profiler, db_engine):
+    async def command(name, count):
+        profiler.start(name)
+        await _run(db_engine, *["SELECT 1"] * count)
+
+    await asyncio.gather(
+        asyncio.create_task(command("slash:list", 3)),
+        asyncio.create_task(command("slash:stats", 1)),
+    )
+    # Done callbacks are scheduled on the loop
+    await asyncio.sleep(0)
+
+    assert profiler.stats["slash:list"].statements == 3
+    assert profiler.stats["slash:list"].invocations == 1
+    assert profiler.stats["slash:stats"].statements == 1
+
+
+@pytest.mark.asyncio
+async def test_summary_and_reset(profiler, db_engine):
+    async with profiler.profile("slash:stats"):
+        await _run(db_engine, "SELECT 1")
+    async with profiler.profile("slash:list"):
+        await _run(db_engine, "SELECT 1", "SELECT 1")
+
+    lines = profiler.summary()
+    assert lines[0].startswith("slash:list: 1 calls, 2 queries")
+    assert lines[1].startswith("slash:stats")
+
+    profiler.reset()
+    assert profiler.summary() == []
+    assert profiler.totals["slash:list"].statements == 2
+
+
+@pytest.mark.asyncio
+async def test_setup_database_applies_pragmas(tmp_path):
+    config = Config()
+    config.database_path = tmp_path / "ledger_bot.sql"
+    session_factory = setup_database(config)
+
+    async with session_factory() as session:
+
+        async def pragma(name):
+            return (await session.execute(text(f"PRAGMA {name}"))).scalar()
+
+        assert await pragma("journal_mode") == "wal"
+        assert await pragma("synchronous") == 1
+        assert await pragma("busy_timeout") == 5000
+        assert await pragma("temp_store") == 2
+
+    await session_factory.kw["bind"].dispose()
+
+
+def test_build_pragmas_rejects_unknown_modes():
+    with pytest.raises(ValueError, match="journal_mode"):
+        build_pragmas(DatabaseConfig(journal_mode="wall"))
@@ -0,0 +1,136 @@
+"""Tests covering ledger_bot.event_queue."""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from ledger_bot.core.config import EventQueueConfig
+from ledger_bot.event_queue import EventQueue
+
+
+@pytest_asyncio.fixture
+async def events():
+    events = EventQueue(EventQueueConfig(workers=2, max_queued=3, overflow="drop"))
+    yield events
+    await events.close()
+
+
+async def wait_for_events(events, name, count):
+    """Wait until `count` events called `name` have finished processing."""
+    async with asyncio.timeout(1):
+        while events.processed[name] + events.failed[name] < count:
+            await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_events_with_a_key_are_processed_in_order(events):
+    processed = []
+    running = set()
+
+    async def process(key, number):
+        assert key not in running
+        running.add(key)
+        await asyncio.sleep(0.001 * (3 - number))
+        processed.append((key, number))
+        running.discard(key)
+
+    for number in range(3):
+        assert await events.submit(
+            "reaction_add", lambda n=number: process("a", n), key="a"
+        )
+
+    await wait_for_events(events, "reaction_add", 3)
+
+    assert processed == [("a", 0), ("a", 1), ("a", 2)]
+    assert events.processed["reaction_add"] == 3
+    assert events.wait_times["reaction_add"].count == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_events(events):
+    release = asyncio.Event()
+
+    async def process():
+        await release.wait()
+
+    # Two events keep the workers busy, then three fill the queue
+    results = [await events.submit("message", process) for _ in range(2)]
+    await asyncio.sleep(0)
+    results += [await events.submit("message", process) for _ in range(4)]
+
+    assert results == [True] * 5 + [False]
+    assert events.dropped["message"] == 1
+
+    release.set()
+    await wait_for_events(events, "message", 5)
+    assert events.processed["message"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_queue_waits_for_space():
+    events = EventQueue(EventQueueConfig(workers=1, max_queued=1, overflow="wait"))
+    release = asyncio.Event()
+
+    async def process():
+        await release.wait()
+
+    await events.submit("message", process)
+    await asyncio.sleep(0)
+    await events.submit("message", process)
+
+    waiting = asyncio.create_task(events.submit("message", process))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    release.set()
+    assert await waiting
+    await events.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("overflow", ["drop", "wait"])
+async def test_burst_never_exceeds_max_queued(overflow):
+    events = EventQueue(EventQueueConfig(workers=1, max_queued=3, overflow=overflow))
+    depths = []
+
+    async def process():
+        depths.append(events.queue_depth())
+        await asyncio.sleep(0)
+
+    async def submit():
+        queued = await events.submit("message", process)
+        depths.append(events.queue_depth())
+        return queued
+
+    results = await asyncio.gather(*(submit() for _ in range(20)))
+    await wait_for_events(events, "message", results.count(True))
+
+    assert max(depths) <= 3
+    assert events.dropped["message"] == results.count(False)
+    if overflow == "drop":
+        assert results.count(False) > 0
+    else:
+        assert all(results)
+    await events.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_event_does_not_stop_the_worker(events):
+    async def fail():
+        raise RuntimeError("Boom")
+
+    async def succeed():
+        return None
+
+    await events.submit("message", fail, key="a")
+    await events.submit("message", succeed, key="a")
+    await wait_for_events(events, "message", 2)
+
+    assert events.failed["message"] == 1
+    assert events.processed["message"] == 1
+
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        EventQueue(EventQueueConfig(overflow="ignore"))
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from ledger_bot.errors import (
+    ExchangeRateRequestError,
+    ExchangeRateResponseError,
+    ExchangeRateUnavailableError,
+)
+from ledger_bot.exchange_rate_client import CircuitBreaker, ExchangeRateClient
+
+
+@pytest_asyncio.fixture
+async def client(rate_server):
+    client = ExchangeRateClient(rate_server.config, api_key="key")
+    yield client
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_get_rates_reuses_session(client, rate_server):
+    assert (await client.get_rates("GBP"))["USD"] == 1.25
+    session = client._session
+
+    assert (await client.get_rates("GBP"))["EUR"] == 1.15
+    assert client._session is session
+    assert rate_server.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried(client, rate_server):
+    rate_server.failures = [503, 429]
+
+    assert (await client.get_rates("GBP"))["USD"] == 1.25
+    assert rate_server.requests == 3
+    assert client.circuit.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_timeouts_exhaust_retries(client, rate_server):
+    rate_server.latency = 1
+
+    with pytest.raises(ExchangeRateRequestError):
+        await client.get_rates("GBP")
+
+    assert rate_server.requests == 3
+    assert client.circuit.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_api_errors_are_not_retried(client, rate_server):
+    rate_server.failures = ["error"]
+
+    with pytest.raises(ExchangeRateResponseError) as error:
+        await client.get_rates("GBP")
+
+    assert error.value.error_type == "inactive-account"
+    assert rate_server.requests == 1
+    assert client.circuit.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures(client, rate_server):
+    rate_server.failures = [500] * 6
+
+    for _ in range(2):
+        with pytest.raises(ExchangeRateRequestError):
+            await client.get_rates("GBP")
+
+    with pytest.raises(ExchangeRateUnavailableError):
+        await client.get_rates("GBP")
+
+    assert client.circuit.state == "open"
+    assert rate_server.requests == 6
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_lets_another_call_through(client, rate_server):
+    client.circuit.opened_at = time.monotonic() - rate_server.config.circuit_reset_after
+    rate_server.latency = 1
+
+    trial = asyncio.create_task(client.get_rates("GBP"))
+    await asyncio.sleep(0.1)
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+
+    rate_server.latency = 0
+    assert (await client.get_rates("GBP"))["USD"] == 1.25
+    assert client.circuit.state == "closed"
+
+
+def test_circuit_half_open_allows_one_trial():
+    now = 0.0
+    circuit = CircuitBreaker(failure_threshold=1, reset_after=10, clock=lambda: now)
+
+    circuit.record_failure()
+    with pytest.raises(ExchangeRateUnavailableError):
+        circuit.before_call()
+
+    now = 10
+    assert circuit.state == "half_open"
+    circuit.before_call()
+    with pytest.raises(ExchangeRateUnavailableError):
+        circuit.before_call()
+
+    # A failed trial opens the circuit again, a successful one closes it
+    circuit.record_failure()
+    assert circuit.state == "open"
+
+    now = 20
+    circuit.before_call()
+    circuit.record_success()
+    assert circuit.state == "closed"
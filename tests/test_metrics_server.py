@@ -0,0 +1,121 @@
+"""Tests covering ledger_bot.metrics_server."""
+
+from collections import Counter
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from apscheduler import events
+
+from ledger_bot.core.config import EventQueueConfig, MetricsConfig, OutboundConfig
+from ledger_bot.database import profiler
+from ledger_bot.event_queue import EventQueue
+from ledger_bot.metrics_server import (
+    CONTENT_TYPE,
+    JobMetrics,
+    MetricsServer,
+    render_metrics,
+)
+from ledger_bot.outbound_scheduler import OutboundScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def job_metrics(clock):
+    scheduler = MagicMock()
+    scheduler.get_job.return_value = SimpleNamespace(name="Reminder: 12")
+    return JobMetrics(scheduler, clock=clock)
+
+
+@pytest.fixture
+def client(job_metrics):
+    events_queue = EventQueue(EventQueueConfig())
+    events_queue.processed["reaction_add"] = 3
+    events_queue.wait_times["reaction_add"].record(0.25)
+
+    return SimpleNamespace(
+        latency=0.05,
+        events=events_queue,
+        outbound=OutboundScheduler(OutboundConfig()),
+        job_metrics=job_metrics,
+        service=SimpleNamespace(
+            member=SimpleNamespace(cache=SimpleNamespace(hits=3, misses=1))
+        ),
+        message_location_lookups=Counter(hit=1),
+    )
+
+
+def test_job_metrics(job_metrics, clock):
+    run_time = datetime(2025, 1, 1)
+    job_metrics.handle_submitted(
+        events.JobSubmissionEvent(
+            events.EVENT_JOB_SUBMITTED, "r-12", "default", [run_time]
+        )
+    )
+    clock.now = 2.0
+    job_metrics.handle_finished(
+        events.JobExecutionEvent(events.EVENT_JOB_EXECUTED, "r-12", "default", run_time)
+    )
+    job_metrics.handle_missed(
+        events.JobExecutionEvent(events.EVENT_JOB_MISSED, "r-13", "default", run_time)
+    )
+
+    assert job_metrics.runs == {("Reminder", "success"): 1}
+    assert job_metrics.durations["Reminder"].total == 2.0
+    assert job_metrics.misfires == {"Reminder": 1}
+
+
+def test_render_metrics(client):
+    lines = render_metrics(client).splitlines()
+
+    assert "ledger_bot_gateway_latency_seconds 0.05" in lines
+    assert (
+        'ledger_bot_events_total{event="reaction_add",outcome="processed"} 3.0' in lines
+    )
+    assert 'ledger_bot_event_queue_wait_seconds_sum{event="reaction_add"} 0.25' in lines
+    assert 'ledger_bot_event_queue_wait_seconds_count{event="reaction_add"} 1' in lines
+    assert 'ledger_bot_outbound_queue_depth{priority="status"} 0.0' in lines
+    assert 'ledger_bot_cache_hit_ratio{cache="member"} 0.75' in lines
+    assert 'ledger_bot_cache_hit_ratio{cache="message_location"} 1.0' in lines
+    assert "# TYPE ledger_bot_db_statements_total counter" in lines
+
+
+@pytest.mark.asyncio
+async def test_handler_counters_survive_a_profile_reset(client):
+    async with profiler.profile("metrics:test"):
+        pass
+    profiler.reset()
+
+    assert (
+        'ledger_bot_handler_invocations_total{handler="metrics:test"} 1.0'
+        in render_metrics(client).splitlines()
+    )
+
+
+def test_render_metrics_before_connecting(client):
+    client.latency = float("nan")
+
+    assert "ledger_bot_gateway_latency_seconds NaN" in render_metrics(client)
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    server = MetricsServer(client, MetricsConfig(enabled=True))
+
+    response = await server.handle_metrics(MagicMock())
+
+    assert response.headers["Content-Type"] == CONTENT_TYPE
+    assert b"ledger_bot_events_total" in response.body
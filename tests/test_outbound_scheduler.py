@@ -0,0 +1,89 @@
+"""Tests covering ledger_bot.outbound_scheduler."""
+
+import asyncio
+
+import pytest
+
+from ledger_bot.core.config import OutboundConfig
+from ledger_bot.outbound_scheduler import OutboundScheduler, Priority, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    assert bucket.time_until_token() == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.try_take()
+    assert not bucket.try_take()
+
+
+@pytest.fixture
+def scheduler():
+    # A single token on each route, refilled every 10ms
+    return OutboundScheduler(
+        OutboundConfig(message_rate=100, message_burst=1, max_route_backlog=2)
+    )
+
+
+@pytest.mark.asyncio
+async def test_status_updates_jump_the_queue(scheduler):
+    sent = []
+
+    async def send(name):
+        sent.append(name)
+        return name
+
+    route = ("messages", 1)
+    results = await asyncio.gather(
+        scheduler.run(route, Priority.DM, lambda: send("first")),
+        scheduler.run(route, Priority.DM, lambda: send("dm")),
+        scheduler.run(route, Priority.STATUS, lambda: send("status")),
+    )
+
+    assert results == ["first", "dm", "status"]
+    assert sent == ["status", "first", "dm"]
+    assert scheduler.sent == {"dm": 2, "status": 1}
+    assert scheduler.wait_times["dm"].max > 0
+    assert scheduler.queue_depth() == {"status": 0, "dm": 0, "cosmetic": 0}
+
+
+@pytest.mark.asyncio
+async def test_cosmetic_requests_merge_and_drop(scheduler):
+    sent = []
+
+    async def send(name):
+        sent.append(name)
+
+    route = ("messages", 1)
+    await asyncio.gather(
+        scheduler.run(route, Priority.STATUS, lambda: send("status")),
+        scheduler.run(route, Priority.COSMETIC, lambda: send("add"), merge_key="⏳"),
+        scheduler.run(route, Priority.COSMETIC, lambda: send("remove"), merge_key="⏳"),
+        scheduler.run(route, Priority.STATUS, lambda: send("status again")),
+        scheduler.run(route, Priority.COSMETIC, lambda: send("dropped")),
+    )
+
+    assert sent == ["status", "status again", "remove"]
+    assert scheduler.merged == {"cosmetic": 1}
+    assert scheduler.dropped == {"cosmetic": 1}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_to_the_caller(scheduler):
+    async def send():
+        raise ValueError("Nope")
+
+    with pytest.raises(ValueError):
+        await scheduler.run(("dm", 1), Priority.DM, send)
@@ -0,0 +1,81 @@
+"""Tests covering ledger_bot.routing_table."""
+
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from ledger_bot.core.config import ChannelsConfig
+from ledger_bot.routing_table import (
+    DM_CHANNEL,
+    ChannelHandler,
+    RoutingTable,
+    channel_key,
+)
+
+
+def text_channel(channel_id, name):
+    channel = MagicMock(spec=discord.TextChannel)
+    channel.id = channel_id
+    channel.name = name
+    return channel
+
+
+@pytest.fixture
+def routes():
+    routes = RoutingTable(ChannelsConfig(include=["sales", "old"], exclude=["old"]))
+    routes.rebuild(
+        [text_channel(1, "sales"), text_channel(2, "general"), text_channel(3, "old")]
+    )
+    return routes
+
+
+@pytest.mark.parametrize(
+    "channel_id, handlers",
+    [
+        (1, ChannelHandler.TRANSACTIONS | ChannelHandler.HELP),
+        (2, ChannelHandler.HELP),
+        (3, ChannelHandler.NONE),
+        (4, ChannelHandler.NONE),
+        (DM_CHANNEL, ChannelHandler.HELP),
+    ],
+)
+def test_channel_routes(routes, channel_id, handlers):
+    for handler in (ChannelHandler.TRANSACTIONS, ChannelHandler.HELP):
+        assert routes.allows(channel_id, handler) == (handler in handlers)
+
+
+def test_reaction_handler(routes):
+    approve = MagicMock()
+    routes.register_reaction("👍", approve)
+
+    assert routes.reaction_handler(1, "👍") is approve
+    assert routes.reaction_handler(1, "🍷") is None
+    assert routes.reaction_handler(2, "👍") is None
+    assert routes.reaction_handler(1, None) is None
+
+
+def test_renamed_and_deleted_channels(routes):
+    routes.update_channel(text_channel(2, "sales"))
+    assert routes.allows(2, ChannelHandler.TRANSACTIONS)
+
+    routes.update_channel(text_channel(1, "general"))
+    assert not routes.allows(1, ChannelHandler.TRANSACTIONS)
+
+    routes.remove_channel(2)
+    assert not routes.allows(2, ChannelHandler.HELP)
+
+
+def test_channel_key():
+    assert channel_key(text_channel(1, "sales")) == 1
+    assert channel_key(MagicMock(spec=discord.DMChannel)) == DM_CHANNEL
+    assert channel_key(None) == DM_CHANNEL
+
+
+def test_unknown_channels_are_routed_by_name():
+    channels = {1: text_channel(1, "sales")}
+    routes = RoutingTable(ChannelsConfig(include=["sales"]), get_channel=channels.get)
+
+    assert routes.allows(1, ChannelHandler.TRANSACTIONS)
+    assert 1 in routes.channels
+    assert not routes.allows(2, ChannelHandler.HELP)
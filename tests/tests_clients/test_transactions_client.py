@@ -0,0 +1,107 @@
+"""Tests covering the per-transaction locking and rendering in ledger_bot.clients.transactions_client."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from weakref import WeakValueDictionary
+
+import pytest
+
+from ledger_bot.clients import transactions_client
+from ledger_bot.clients.transactions_client import TransactionsClient
+from ledger_bot.core import Config
+from ledger_bot.database import profile_handler, profiler
+from ledger_bot.outbound_scheduler import OutboundScheduler
+from ledger_bot.services import TransactionService
+from ledger_bot.storage import TransactionStorage
+
+
+@pytest.fixture
+def client(session_factory, monkeypatch):
+    """A client with just enough set up to render transaction statuses."""
+    client = TransactionsClient.__new__(TransactionsClient)
+    client.config = Config(status_render_delay=0.01)
+    client.session_factory = session_factory
+    client.service = SimpleNamespace(
+        transaction=TransactionService(
+            TransactionStorage(), client.config, session_factory
+        )
+    )
+    client.transaction_locks = WeakValueDictionary()
+    client.pending_renders = {}
+    client.status_renders = set()
+    client.outbound = OutboundScheduler(client.config.outbound)
+
+    monkeypatch.setattr(
+        transactions_client,
+        "generate_transaction_status_message",
+        AsyncMock(return_value="Status"),
+    )
+    monkeypatch.setattr(transactions_client, "send_message", AsyncMock())
+    return client
+
+
+@pytest.mark.asyncio
+async def test_burst_of_reactions_renders_once(client, transaction):
+    for _ in range(3):
+        client.schedule_status_render(transaction.id, channel=None)
+
+    [render] = client.pending_renders.values()
+    await render
+
+    transactions_client.send_message.assert_awaited_once()
+    assert not client.pending_renders
+
+
+@pytest.mark.asyncio
+async def test_render_waits_for_changes_in_progress(client, transaction):
+    lock = client.transaction_lock(transaction.id)
+    assert client.transaction_lock(transaction.id) is lock
+
+    async with lock:
+        client.schedule_status_render(transaction.id, channel=None)
+        render = client.pending_renders[transaction.id]
+        await asyncio.sleep(0.05)
+        transactions_client.send_message.assert_not_awaited()
+
+    await render
+    transactions_client.send_message.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_render_is_profiled_separately(client, transaction):
+    profiler.reset()
+
+    async with profile_handler("reaction_add"):
+        client.schedule_status_render(transaction.id, channel=None)
+    await client.pending_renders[transaction.id]
+
+    assert profiler.stats["task:render_status"].invocations == 1
+    assert profiler.stats["reaction_add"].invocations == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_render_is_logged(client, transaction, caplog):
+    transactions_client.send_message.side_effect = RuntimeError("Boom")
+
+    client.schedule_status_render(transaction.id, channel=None)
+    render = client.pending_renders[transaction.id]
+    with pytest.raises(RuntimeError):
+        await render
+    await asyncio.sleep(0)
+
+    assert f"Rendering the status of transaction {transaction.id} failed" in caplog.text
+    assert not client.status_renders
+
+
+@pytest.mark.asyncio
+async def test_cancel_status_renders(client, transaction):
+    client.schedule_status_render(transaction.id, channel=None)
+    render = client.pending_renders[transaction.id]
+
+    await client.cancel_status_renders()
+
+    assert render.cancelled()
+    assert not client.pending_renders
+    assert not client.status_renders
+    transactions_client.send_message.assert_not_awaited()
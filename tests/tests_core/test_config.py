@@ -252,3 +252,14 @@ def test_apply_dict_partial_nested_update():
     assert auth.airtable_key == ""
     assert auth.airtable_base == ""
     assert auth.exchangerate_api == ""
+
+
+def test_apply_dict_database_profile():
+    data = {"database": {"journal_mode": "delete", "busy_timeout": "250"}}
+
+    config = Config()
+    config._apply_dict(config, data)
+
+    assert config.database.journal_mode == "delete"
+    assert config.database.busy_timeout == 250
+    assert config.database.synchronous == "normal"
@@ -0,0 +1,78 @@
+"""Tests covering ledger_bot.message_generators.send_message."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+import pytest
+
+from ledger_bot.core import Config
+from ledger_bot.message_generators import send_message
+
+
+@pytest.fixture
+def channel():
+    channel = MagicMock()
+    channel.send = AsyncMock(return_value=SimpleNamespace(id=200))
+    channel.fetch_message = AsyncMock()
+    channel.get_partial_message.return_value.edit = AsyncMock()
+    channel.get_partial_message.return_value.delete = AsyncMock()
+    return channel
+
+
+@pytest.fixture
+def service():
+    return SimpleNamespace(bot_message=AsyncMock())
+
+
+async def _send(channel, service, config):
+    await send_message(
+        response_contents="Updated",
+        channel=channel,
+        target_transaction=SimpleNamespace(id=1),
+        previous_message_id=100,
+        service=service,
+        config=config,
+    )
+
+
+@pytest.mark.asyncio
+async def test_repost_by_default(channel, service):
+    await _send(channel, service, Config())
+
+    channel.send.assert_awaited_once_with("Updated")
+    channel.get_partial_message.assert_called_once_with(100)
+    channel.get_partial_message.return_value.delete.assert_awaited_once_with()
+    channel.fetch_message.assert_not_awaited()
+    service.bot_message.save_bot_message.assert_awaited_once()
+    service.bot_message.delete_bot_message.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_edit_in_place(channel, service):
+    await _send(channel, service, Config(edit_status_messages=True))
+
+    channel.get_partial_message.assert_called_once_with(100)
+    channel.get_partial_message.return_value.edit.assert_awaited_once_with(
+        content="Updated"
+    )
+    channel.send.assert_not_awaited()
+    channel.get_partial_message.return_value.delete.assert_not_awaited()
+    assert service.bot_message.mock_calls == []
+
+
+@pytest.mark.asyncio
+async def test_edit_reposts_missing_message(channel, service):
+    channel.get_partial_message.return_value.edit.side_effect = discord.NotFound(
+        SimpleNamespace(status=404, reason="Not Found"), "Unknown Message"
+    )
+
+    await _send(channel, service, Config(edit_status_messages=True))
+
+    channel.send.assert_awaited_once_with("Updated")
+    channel.get_partial_message.return_value.delete.assert_not_awaited()
+    service.bot_message.save_bot_message.assert_awaited_once()
+    service.bot_message.get_bot_message_by_message_id.assert_awaited_once_with(
+        100, session=None
+    )
+    service.bot_message.delete_bot_message.assert_awaited_once()
@@ -0,0 +1,32 @@
+"""Tests covering ledger_bot.message_generators.split_message."""
+
+from ledger_bot.message_generators.split_message import chunk_lines, split_message
+
+
+def test_short_content_is_one_message():
+    assert split_message(["Intro", "**Sales**\nPort"]) == ["Intro\n**Sales**\nPort"]
+
+
+def test_chunks_fit_and_repeat_headings():
+    lines = ["You have some sales.", "**Sales**", "Awaiting Payment:"]
+    lines += [f"- Wine {i}" for i in range(100)]
+    lines += ["Completed:", "- Port"]
+
+    chunks = list(chunk_lines(lines, chunk_length=100))
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert all(chunk.startswith("**Sales**\n") for chunk in chunks[1:])
+    assert all(
+        chunk.startswith("**Sales**\nAwaiting Payment:\n- Wine")
+        for chunk in chunks[1:-1]
+    )
+
+    # Nothing is lost or reordered, only the headings are repeated
+    items = [line for chunk in chunks for line in chunk.split("\n") if line[:2] == "- "]
+    assert items == [line for line in lines if line[:2] == "- "]
+
+
+def test_overlong_line_is_split():
+    chunks = list(chunk_lines(["Intro", "x" * 250], chunk_length=100))
+
+    assert chunks == ["Intro", "x" * 100, "x" * 100, "x" * 50]
@@ -0,0 +1,89 @@
+"""Tests covering the bot_message index in ledger_bot.services.bot_message_service."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from ledger_bot.core import Config
+from ledger_bot.services import BotMessageService, unit_of_work
+from ledger_bot.storage import BotMessageStorage
+
+
+def _fake_message(message_id: int, channel_id: int = 10, guild_id: int = 20):
+    return SimpleNamespace(
+        id=message_id,
+        channel=SimpleNamespace(id=channel_id),
+        guild=SimpleNamespace(id=guild_id),
+    )
+
+
+@pytest.fixture
+def service(session_factory):
+    return BotMessageService(BotMessageStorage(), Config(), session_factory)
+
+
+@pytest.mark.asyncio
+async def test_index_starts_unloaded(service):
+    assert service.message_index_loaded is False
+    assert service.get_indexed_transaction_id(123) is None
+
+
+@pytest.mark.asyncio
+async def test_save_bot_message_updates_index(service, transaction):
+    await service.save_bot_message(_fake_message(123), transaction)
+
+    assert service.get_indexed_transaction_id(123) == transaction.id
+
+
+@pytest.mark.asyncio
+async def test_delete_bot_message_updates_index(service, transaction):
+    bot_message = await service.save_bot_message(_fake_message(123), transaction)
+
+    await service.delete_bot_message(bot_message)
+
+    assert service.get_indexed_transaction_id(123) is None
+
+
+@pytest.mark.asyncio
+async def test_load_message_index(service, session_factory, transaction):
+    await service.save_bot_message(_fake_message(123), transaction)
+    await service.save_bot_message(_fake_message(456), transaction)
+
+    fresh_service = BotMessageService(BotMessageStorage(), Config(), session_factory)
+    await fresh_service.load_message_index()
+
+    assert fresh_service.message_index_loaded is True
+    assert fresh_service.message_index == {123: transaction.id, 456: transaction.id}
+
+
+@pytest.mark.asyncio
+async def test_unindex_message(service, transaction):
+    await service.save_bot_message(_fake_message(123), transaction)
+
+    service.unindex_message(123)
+    service.unindex_message(999)
+
+    assert service.get_indexed_transaction_id(123) is None
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_indexes_after_commit(service, session_factory, transaction):
+    async with unit_of_work(session_factory) as session:
+        await service.save_bot_message(_fake_message(123), transaction, session=session)
+
+        assert service.get_indexed_transaction_id(123) is None
+
+    assert service.get_indexed_transaction_id(123) == transaction.id
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rollback_skips_index(service, session_factory, transaction):
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(session_factory) as session:
+            await service.save_bot_message(
+                _fake_message(123), transaction, session=session
+            )
+            raise RuntimeError
+
+    assert service.get_indexed_transaction_id(123) is None
+    assert await service.get_bot_message_by_message_id(123) is None
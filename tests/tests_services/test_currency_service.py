@@ -0,0 +1,92 @@
+"""Tests covering the rate table in ledger_bot.services.currency_service."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+
+from ledger_bot.core import Config
+from ledger_bot.exchange_rate_client import ExchangeRateClient
+from ledger_bot.models import CurrencyRate
+from ledger_bot.services import CurrencyService
+from ledger_bot.storage import CurrencyStorage
+
+
+@pytest_asyncio.fixture
+async def service(session_factory, rate_server):
+    config = Config()
+    config.exchange_rates = rate_server.config
+    client = ExchangeRateClient(rate_server.config, api_key="key")
+
+    yield CurrencyService(CurrencyStorage(), config, session_factory, client)
+
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_refresh_updates_currencies_in_one_statement(
+    service, rate_server, db_engine
+):
+    for code in ("GBP", "USD", "EUR"):
+        await service.get_or_add_currency(code)
+
+    updates = []
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: (
+            updates.append(statement) if statement.startswith("UPDATE") else None
+        ),
+    )
+
+    rate_table = await service.refresh_rates()
+
+    assert rate_server.requests == 1
+    assert len(updates) == 1
+    assert service.rates is rate_table
+    assert {
+        currency.code: currency.rate for currency in await service.list_all_currencies()
+    } == {"GBP": 1, "USD": 1.25, "EUR": 1.15}
+
+    async with service._session_factory() as session:
+        history = (await session.scalars(select(CurrencyRate))).all()
+    assert {(rate.currency_code, rate.rate) for rate in history} == {
+        ("GBP", 1),
+        ("USD", 1.25),
+        ("EUR", 1.15),
+    }
+
+
+@pytest.mark.asyncio
+async def test_new_currencies_use_the_rate_table(service, rate_server):
+    await service.refresh_rates()
+    rate_server.rates["USD"] = 2
+
+    currency = await service.get_or_add_currency("usd")
+
+    assert currency.rate == 1.25
+    assert rate_server.requests == 1
+    with pytest.raises(TypeError):
+        service.rates.rates["USD"] = 2  # type: ignore[index]
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_the_rate_table(service, rate_server):
+    rate_table = await service.refresh_rates()
+    rate_server.failures = ["error"]
+
+    assert await service.refresh_rates() is rate_table
+    assert service.rates is rate_table
+    assert not service.rates_stale
+
+
+@pytest.mark.asyncio
+async def test_load_rates_without_the_api(service, rate_server):
+    await service.refresh_rates()
+    await service.get_or_add_currency("EUR")
+    service.rates = type(service.rates)(base="GBP")
+
+    rate_table = await service.load_rates()
+
+    assert rate_table.get("EUR") == 1.15
+    assert rate_table.get("GBP") == 1
+    assert rate_server.requests == 1
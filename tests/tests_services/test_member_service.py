@@ -0,0 +1,147 @@
+"""Tests covering the member cache in ledger_bot.services.member_service."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from ledger_bot.core import Config
+from ledger_bot.services import MemberService, unit_of_work
+from ledger_bot.storage import MemberStorage
+
+
+@pytest.fixture
+def service(session_factory):
+    return MemberService(MemberStorage(), Config(), session_factory)
+
+
+@pytest.fixture
+def statements(db_engine):
+    executed = []
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement),
+    )
+    return executed
+
+
+def _discord_user(discord_id=10, name="dave"):
+    return SimpleNamespace(id=discord_id, name=name)
+
+
+@pytest.mark.asyncio
+async def test_cached_members_need_no_queries(service, session_factory, statements):
+    member = await service.get_or_add_member(_discord_user())
+    statements.clear()
+
+    cached = await service.get_or_add_member(_discord_user())
+    async with session_factory() as session:
+        merged = await service.get_or_add_member(_discord_user(), session=session)
+        assert object_session(merged) is session.sync_session
+
+    assert statements == []
+    assert (cached.id, merged.id) == (member.id, member.id)
+    assert cached is not member
+    assert (service.cache.hits, service.cache.misses) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_uncached_members_need_one_statement(service, statements):
+    await service.get_or_add_member(_discord_user())
+    assert len(statements) == 1
+
+    service.cache.clear()
+    statements.clear()
+    member = await service.get_or_add_member(_discord_user(name="david"))
+
+    assert len(statements) == 1
+    assert member.username == "david"
+
+
+@pytest.mark.asyncio
+async def test_changes_to_returned_members_are_not_cached(service):
+    member = await service.get_or_add_member(_discord_user())
+    member.timezone = "Europe/Paris"
+
+    assert (await service.get_or_add_member(_discord_user())).timezone is None
+
+
+@pytest.mark.asyncio
+async def test_updates_invalidate_the_cache(service):
+    await service.get_or_add_member(_discord_user())
+
+    await service.set_timezone(_discord_user(), "Europe/London")
+
+    assert len(service.cache) == 0
+    member = await service.get_or_add_member(_discord_user())
+    assert member.timezone == "Europe/London"
+
+
+@pytest.mark.asyncio
+async def test_lookups_racing_an_update_do_not_re_cache_it(service, monkeypatch):
+    await service.get_or_add_member(_discord_user())
+    service.cache.clear()
+
+    read = asyncio.Event()
+    resume = asyncio.Event()
+    commit = service._commit
+
+    async def slow_commit(session):
+        await commit(session)
+        read.set()
+        await resume.wait()
+
+    monkeypatch.setattr(service, "_commit", slow_commit)
+
+    # The lookup reads the old values, then the update is committed before it caches them
+    lookup = asyncio.create_task(service.get_or_add_member(_discord_user()))
+    await read.wait()
+    monkeypatch.undo()
+    await service.set_timezone(_discord_user(), "Europe/London")
+    resume.set()
+    assert (await lookup).timezone is None
+
+    assert len(service.cache) == 0
+    member = await service.get_or_add_member(_discord_user())
+    assert member.timezone == "Europe/London"
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_members_are_not_cached(service, session_factory):
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(session_factory) as session:
+            await service.get_or_add_member(_discord_user(), session=session)
+            raise RuntimeError
+
+    assert len(service.cache) == 0
+    assert await service.list_all_members() == []
+
+
+@pytest.mark.asyncio
+async def test_sync_members_writes_changes_in_chunks(service, statements):
+    await service.get_or_add_member(_discord_user(10, "dave"))
+    await service.get_or_add_member(_discord_user(11, "erin"))
+    statements.clear()
+
+    guild_members = [
+        SimpleNamespace(id=10, name="dave", nick="Dave"),
+        SimpleNamespace(id=11, name="erin", nick=None),
+        SimpleNamespace(id=12, name="frank", nick=None),
+        SimpleNamespace(id=13, name="grace", nick="G"),
+    ]
+    assert await service.sync_members(guild_members, chunk_size=2) == 3
+
+    # One read, then an executemany per chunk
+    assert [statement.split()[0] for statement in statements] == [
+        "SELECT",
+        "INSERT",
+        "INSERT",
+    ]
+    assert 10 not in service.cache._cache
+    assert {
+        member.discord_id: member.display_name
+        for member in await service.list_all_members()
+    } == {10: "Dave", 11: "erin", 12: "frank", 13: "G"}
@@ -0,0 +1,144 @@
+"""Tests covering reaction processing in ledger_bot.services.transaction_service."""
+
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, inspect
+
+from ledger_bot.core import Config
+from ledger_bot.models import BotMessage
+from ledger_bot.services import TransactionService, unit_of_work
+from ledger_bot.storage import TransactionStorage
+
+
+@pytest.fixture
+def service(session_factory):
+    return TransactionService(TransactionStorage(), Config(), session_factory)
+
+
+@pytest.fixture
+def statements(db_engine):
+    """The statements executed against the database, in order."""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executed.append(statement.split()[0])
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest_asyncio.fixture
+async def bot_message(session_factory, transaction):
+    async with session_factory() as session:
+        bot_message = BotMessage(
+            message_id=123,
+            channel_id=10,
+            guild_id=20,
+            transaction_id=transaction.id,
+            bot_id="",
+        )
+        session.add(bot_message)
+        await session.commit()
+        return bot_message
+
+
+@pytest.mark.asyncio
+async def test_get_transaction_by_bot_message_id_loads_relationships(
+    service, transaction, bot_message
+):
+    found = await service.get_transaction_by_bot_message_id(bot_message.message_id)
+
+    assert found is not None
+    assert found.id == transaction.id
+    assert inspect(found).unloaded.isdisjoint({"buyer", "seller", "bot_messages"})
+    assert found.buyer.username == "buyer"
+    assert [m.message_id for m in found.bot_messages] == [123]
+
+
+@pytest.mark.asyncio
+async def test_get_transaction_by_bot_message_id_unknown_message(service, bot_message):
+    assert await service.get_transaction_by_bot_message_id(999) is None
+
+
+@pytest.mark.asyncio
+async def test_approve_in_unit_of_work_commits_once(
+    service, session_factory, statements, transaction, bot_message
+):
+    async with unit_of_work(session_factory) as session:
+        target = await service.get_transaction_by_bot_message_id(
+            bot_message.message_id, session=session
+        )
+        statements.clear()
+
+        approved = await service.approve_transaction(
+            target,
+            reactor=SimpleNamespace(id=target.buyer_id, username="buyer"),
+            session=session,
+        )
+
+        # The loaded transaction is reused, and nothing is written until the unit of work commits
+        assert approved is target
+        assert statements == []
+
+    # The transaction, then the buyer's and seller's stats rollups, all in the one commit
+    assert statements == ["UPDATE", "INSERT", "INSERT"]
+
+    saved = await service.get_transaction(transaction.id)
+    assert saved.sale_approved
+    assert saved.approved_date is not None
+
+
+@pytest.mark.asyncio
+async def test_approve_without_unit_of_work(service, transaction):
+    reactor = SimpleNamespace(id=transaction.buyer_id, username="buyer")
+
+    approved = await service.approve_transaction(transaction, reactor=reactor)
+
+    assert approved.sale_approved
+    assert approved.buyer.username == "buyer"
+    assert (await service.get_transaction(transaction.id)).sale_approved
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "list_filter, wines",
+    [
+        ("all", ["Claret", "Rioja", "Barolo", "Chablis", "Port"]),
+        ("open", ["Claret", "Rioja", "Port"]),
+        ("purchases", ["Claret", "Rioja", "Barolo", "Chablis"]),
+        ("sales", ["Port"]),
+        ("completed", ["Barolo"]),
+        ("cancelled", ["Chablis"]),
+    ],
+)
+async def test_get_member_transaction_page_filters(
+    service, members, list_filter, wines
+):
+    alice, bob, carol = members
+
+    page = await service.get_member_transaction_page(alice, list_filter, page_size=10)
+
+    assert [row.wine for row in page.rows] == wines
+    assert not page.has_previous and not page.has_next
+
+
+@pytest.mark.asyncio
+async def test_get_member_transaction_page_next_and_previous(service, members):
+    alice, bob, carol = members
+
+    first = await service.get_member_transaction_page(alice, page_size=2)
+    second = await service.get_member_transaction_page(
+        alice, after=first.last_key, page_size=2
+    )
+    back = await service.get_member_transaction_page(
+        alice, before=second.first_key, page_size=2
+    )
+
+    assert [row.wine for row in first.rows] == ["Claret", "Rioja"]
+    assert (first.has_previous, first.has_next) == (False, True)
+    assert [row.wine for row in second.rows] == ["Barolo", "Chablis"]
+    assert (second.has_previous, second.has_next) == (True, True)
+    assert back == first
@@ -0,0 +1,60 @@
+"""Tests covering ledger_bot.storage.currency_storage."""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from ledger_bot.models import Currency, Transaction
+from ledger_bot.storage import CurrencyStorage
+
+
+@pytest.mark.asyncio
+async def test_upsert_currency_keeps_the_existing_record(session_factory):
+    async with session_factory() as session:
+        await CurrencyStorage().upsert_currency(
+            Currency(code="USD", symbol="$", rate=1.25), session=session
+        )
+        await session.commit()
+
+    async with session_factory() as session:
+        currency = await CurrencyStorage().upsert_currency(
+            Currency(code="USD", symbol="US$", rate=2), session=session
+        )
+
+    assert (currency.symbol, currency.rate) == ("$", 1.25)
+
+
+@pytest.mark.asyncio
+async def test_upsert_currency_fills_in_a_missing_rate(session_factory):
+    async with session_factory() as session:
+        await CurrencyStorage().upsert_currency(
+            Currency(code="USD", symbol="$"), session=session
+        )
+        await session.commit()
+
+    async with session_factory() as session:
+        currency = await CurrencyStorage().upsert_currency(
+            Currency(code="USD", symbol="US$", rate=2), session=session
+        )
+
+    assert (currency.symbol, currency.rate) == ("$", 2)
+
+
+@pytest.mark.asyncio
+async def test_update_rates_fills_in_missing_snapshots(session_factory, members):
+    async with session_factory() as session:
+        await CurrencyStorage().update_rates(
+            {"USD": 2.0, "EUR": 3.0}, "GBP", datetime.now(timezone.utc), session=session
+        )
+        await session.commit()
+
+        rates = dict(
+            (await session.execute(select(Transaction.wine, Transaction.exchange_rate)))
+            .tuples()
+            .all()
+        )
+
+    # Chablis is in EUR, which had no rate when it was created
+    assert rates["Chablis"] == 3.0
+    assert rates["Rioja"] == 0.5
@@ -0,0 +1,70 @@
+"""Tests covering ledger_bot.storage.member_storage."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from ledger_bot.models import Member
+from ledger_bot.storage import MemberStorage
+
+
+@pytest.mark.asyncio
+async def test_upsert_member_adds_in_one_statement(db_engine, session_factory):
+    statements = []
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    async with session_factory() as session:
+        member = await MemberStorage().upsert_member(
+            Member(username="dave", discord_id=10), session=session
+        )
+        await session.commit()
+
+    assert len(statements) == 1
+    assert member.id is not None
+    assert member.creation_date is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_return_the_same_member(session_factory):
+    async def upsert(username):
+        async with session_factory() as session:
+            member = await MemberStorage().upsert_member(
+                Member(username=username, discord_id=10), session=session
+            )
+            await session.commit()
+            return member
+
+    first, second = await asyncio.gather(upsert("dave"), upsert("david"))
+
+    assert first.id == second.id
+    # The later upsert updates the username
+    assert (first.username, second.username) == ("dave", "david")
+
+
+@pytest.mark.asyncio
+async def test_upsert_existing_member_in_one_statement(db_engine, session_factory):
+    async with session_factory() as session:
+        await MemberStorage().upsert_member(
+            Member(username="dave", discord_id=10, timezone="Europe/Paris"),
+            session=session,
+        )
+        await session.commit()
+
+    statements = []
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    async with session_factory() as session:
+        member = await MemberStorage().upsert_member(
+            Member(username="david", discord_id=10), session=session
+        )
+
+    assert len(statements) == 1
+    assert (member.username, member.timezone) == ("david", "Europe/Paris")
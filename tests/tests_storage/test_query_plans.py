@@ -0,0 +1,166 @@
+"""Query-plan regression tests for the filtered queries issued by ledger_bot.storage.
+
+Each storage method is called with the filters the services use, and every statement it
+emits is run through EXPLAIN QUERY PLAN. A full scan of a table fails the test.
+"""
+
+import re
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from ledger_bot.models import BotMessage, Member, Reminder, Transaction
+from ledger_bot.models.base import Base
+from ledger_bot.storage import (
+    BotMessageStorage,
+    MemberStorage,
+    ReminderStorage,
+    StatsStorage,
+    TransactionStorage,
+)
+
+# A full scan; "SCAN <table> USING [COVERING] INDEX" walks an index instead
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@pytest_asyncio.fixture
+async def statements(db_engine, transaction):
+    """The queries executed against the database, with their parameters."""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            executed.append((statement, parameters))
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(db_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def query_plans(db_engine, statements):
+    """The EXPLAIN QUERY PLAN details of each statement."""
+    plans = []
+    async with db_engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)
+            )
+            plans.append([row.detail for row in result])
+    return plans
+
+
+async def assert_no_full_scans(db_engine, statements):
+    assert statements
+    for (statement, _), plan in zip(
+        statements, await query_plans(db_engine, statements)
+    ):
+        # Scanning a CTE or subquery is fine, as long as it doesn't scan a table itself
+        scans = [
+            detail
+            for detail in plan
+            if (match := FULL_SCAN.match(detail))
+            and match.group(1) in Base.metadata.tables
+        ]
+        assert not scans, f"{scans} in plan {plan} for:\n{statement}"
+
+
+QUERIES = {
+    "transaction by id": lambda t, s: TransactionStorage().get_transaction(
+        t.id, session=s
+    ),
+    "transaction by bot message": lambda t, s: (
+        TransactionStorage().get_transaction_by_message_id(1234, session=s)
+    ),
+    "transaction by display id": lambda t, s: TransactionStorage().list_transactions(
+        Transaction.display_id == 123, session=s
+    ),
+    "most expensive purchase": lambda t, s: TransactionStorage().list_transactions(
+        Transaction.buyer_id == t.buyer_id,
+        order_by=Transaction.price.desc(),
+        limit=1,
+        session=s,
+    ),
+    "most expensive sale": lambda t, s: TransactionStorage().list_transactions(
+        Transaction.seller_id == t.seller_id,
+        order_by=Transaction.price.desc(),
+        limit=1,
+        session=s,
+    ),
+    "open transactions": lambda t, s: TransactionStorage().list_transactions(
+        Transaction.open_filter(), session=s
+    ),
+    "transaction bot messages": lambda t, s: TransactionStorage().list_transactions(
+        Transaction.id == t.id,
+        options=[selectinload(Transaction.bot_messages)],
+        session=s,
+    ),
+    "bot message by message id": lambda t, s: BotMessageStorage().list_bot_message(
+        BotMessage.message_id == 1234, session=s
+    ),
+    "bot messages by transaction": lambda t, s: BotMessageStorage().list_bot_message(
+        BotMessage.transaction_id == t.id, session=s
+    ),
+    "upcoming reminders": lambda t, s: ReminderStorage().list_reminders(
+        Reminder.reminder_date >= datetime(2025, 1, 1), session=s
+    ),
+    "reminders by transaction": lambda t, s: ReminderStorage().list_reminders(
+        Reminder.transaction_id == t.id, session=s
+    ),
+    "member transaction rows": lambda t, s: (
+        TransactionStorage().list_member_transaction_rows(t.buyer_id, session=s)
+    ),
+    "member transaction rows page": lambda t, s: (
+        TransactionStorage().list_member_transaction_rows(
+            t.buyer_id,
+            Transaction.open_filter(),
+            after=(t.creation_date, t.id),
+            limit=9,
+            session=s,
+        )
+    ),
+    "member stats": lambda t, s: TransactionStorage().get_member_stats(
+        t.buyer_id, session=s
+    ),
+    "member stats rollups": lambda t, s: StatsStorage().get_member_stats(
+        t.buyer_id, session=s
+    ),
+    "server stats rollups": lambda t, s: StatsStorage().get_server_stats(session=s),
+    "member by discord id": lambda t, s: MemberStorage().list_members(
+        Member.discord_id == 1, session=s
+    ),
+    "member transaction summary": lambda t, s: (
+        MemberStorage().get_transaction_summary(t.buyer, session=s)
+    ),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", QUERIES)
+async def test_query_uses_indexes(db_engine, session_factory, statements, query):
+    async with session_factory() as session:
+        transaction = await TransactionStorage().get_transaction(
+            1,
+            session=session,
+            options=[selectinload(Transaction.buyer)],
+        )
+        statements.clear()
+
+        await QUERIES[query](transaction, session)
+
+    await assert_no_full_scans(db_engine, statements)
+
+
+@pytest.mark.asyncio
+async def test_open_transactions_use_partial_index(
+    db_engine, session_factory, statements
+):
+    async with session_factory() as session:
+        await TransactionStorage().list_transactions(
+            Transaction.open_filter(), session=session
+        )
+
+    [plan] = await query_plans(db_engine, statements)
+    assert any("ix_transactions_open" in detail for detail in plan), plan
@@ -0,0 +1,174 @@
+"""Tests covering the stats rollups in ledger_bot.storage.stats_storage."""
+
+import importlib.util
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, text, update
+
+from ledger_bot.core import Config
+from ledger_bot.models import MemberStatsRollup, ServerStatsRollup, Transaction
+from ledger_bot.services import TransactionService, unit_of_work
+from ledger_bot.storage import CurrencyStorage, StatsStorage, TransactionStorage
+
+ROLLUPS_MIGRATION = (
+    Path(__file__).parents[2] / "alembic/versions/453421f8b465_add_stats_rollups.py"
+)
+
+
+def load_migration(path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def comparable(stats):
+    """The stats with members reduced to their ids, and prices to pennies."""
+    if stats is None:
+        return None
+    if hasattr(stats, "top_buyers"):
+        return (
+            stats.total_count,
+            round(stats.total_value, 2),
+            round(stats.avg_price, 2),
+            stats.most_expensive_name,
+            stats.most_expensive_value,
+            [member.id for member in stats.top_buyers],
+            [member.id for member in stats.top_sellers],
+        )
+    return (
+        stats.unapproved,
+        stats.approved,
+        stats.paid,
+        stats.delivered,
+        stats.completed,
+        stats.cancelled,
+        round(stats.avg_price, 2),
+        round(stats.total_price, 2),
+        stats.total_count,
+        stats.most_expensive_name,
+        stats.most_expensive_member.id,
+        stats.most_expensive_price,
+    )
+
+
+async def assert_rollups_match_history(session_factory, members):
+    async with session_factory() as session:
+        for member in members:
+            rollup = await StatsStorage().get_member_stats(member.id, session=session)
+            history = await TransactionStorage().get_member_stats(
+                member.id, session=session
+            )
+            assert {role: comparable(stats) for role, stats in rollup.items()} == {
+                role: comparable(stats) for role, stats in history.items()
+            }
+
+        assert comparable(
+            await StatsStorage().get_server_stats(session=session)
+        ) == comparable(await TransactionStorage().get_server_stats(session=session))
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_transaction_changes(session_factory, members):
+    alice, bob, carol = members
+    await assert_rollups_match_history(session_factory, members)
+
+    service = TransactionService(TransactionStorage(), Config(), session_factory)
+    claret, rioja, _, _, port, sherry = await service.list_all_transactions()
+
+    def as_member(member):
+        return SimpleNamespace(id=member.id, username=member.username)
+
+    await service.approve_transaction(claret, reactor=as_member(alice))
+    await service.mark_transaction_paid(port, reactor=as_member(carol))
+    await service.cancel_transaction(sherry, reactor=as_member(bob))
+    async with unit_of_work(session_factory) as session:
+        await service.mark_transaction_delivered(
+            rioja, reactor=as_member(alice), session=session
+        )
+        await service.mark_transaction_delivered(
+            rioja, reactor=as_member(carol), session=session
+        )
+    await service.save_transaction(
+        Transaction(wine="Krug", price=500, seller_id=carol.id, buyer_id=bob.id)
+    )
+    await assert_rollups_match_history(session_factory, members)
+
+    async with session_factory() as session:
+        sherry = await service.get_transaction(sherry.id, session=session)
+        await service.delete_transaction(sherry, session=session)
+        await session.commit()
+    await assert_rollups_match_history(session_factory, members)
+
+    async with session_factory() as session:
+        assert await StatsStorage().rebuild_stats(session=session) == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_stats_repairs_rollups(session_factory, members):
+    alice = members[0]
+    async with session_factory() as session:
+        await session.execute(
+            update(MemberStatsRollup)
+            .where(MemberStatsRollup.member_id == alice.id)
+            .values(paid=MemberStatsRollup.paid + 1)
+        )
+        mismatches = await StatsStorage().rebuild_stats(session=session)
+        await session.commit()
+
+    assert len(mismatches) == 2
+    assert all(f"member {alice.id}" in mismatch for mismatch in mismatches)
+    await assert_rollups_match_history(session_factory, members)
+
+
+@pytest.mark.asyncio
+async def test_rate_refresh_leaves_rollups_valid(session_factory, members):
+    alice = members[0]
+    async with session_factory() as session:
+        before = await StatsStorage().get_member_stats(alice.id, session=session)
+
+        await CurrencyStorage().update_rates(
+            {"USD": 2.0, "EUR": 3.0}, "GBP", datetime.now(timezone.utc), session=session
+        )
+        await session.commit()
+
+        after = await StatsStorage().get_member_stats(alice.id, session=session)
+        assert await StatsStorage().rebuild_stats(session=session) == []
+
+    # avg_price holds the total, see TransactionStorage.get_member_stats. Only Chablis,
+    # which had no EUR rate to snapshot, is converted at the new rate.
+    assert before["buyer"].avg_price == 80
+    assert after["buyer"].avg_price == 80 - 20 + 20 * 3.0
+    await assert_rollups_match_history(session_factory, members)
+
+
+@pytest.mark.asyncio
+async def test_migration_backfill_matches_rebuild_stats(session_factory, members):
+    _, bob, carol = members
+    migration = load_migration(ROLLUPS_MIGRATION)
+
+    async with session_factory() as session:
+        # Ties with Sherry, bob's and carol's most expensive, but was created first
+        session.add(
+            Transaction(
+                wine="Sherry Reserve",
+                price=100,
+                seller_id=bob.id,
+                buyer_id=carol.id,
+                creation_date=datetime(2019, 12, 31),
+                bot_id="",
+            )
+        )
+        await session.commit()
+
+    async with session_factory() as session:
+        await session.execute(delete(MemberStatsRollup))
+        await session.execute(delete(ServerStatsRollup))
+        await session.execute(text(migration.BACKFILL_MEMBER_STATS))
+        await session.execute(text(migration.BACKFILL_SERVER_STATS))
+        await session.commit()
+
+        assert await StatsStorage().rebuild_stats(session=session) == []
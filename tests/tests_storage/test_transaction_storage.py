@@ -0,0 +1,272 @@
+"""Tests covering ledger_bot.storage.transaction_storage."""
+
+import pytest
+from sqlalchemy import delete, event, func, select
+from sqlalchemy.orm import selectinload
+
+from ledger_bot.models import BotMessage, Member, Transaction, TransactionStats
+from ledger_bot.storage import TransactionStorage
+from ledger_bot.storage.transaction_storage import status_conditions
+
+
+@pytest.mark.asyncio
+async def test_get_member_stats(db_engine, session_factory, members):
+    alice, bob, carol = members
+    statements = []
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    async with session_factory() as session:
+        stats = await TransactionStorage().get_member_stats(alice.id, session=session)
+
+    assert len(statements) == 1
+    assert set(stats) == {"buyer", "seller"}
+
+    purchase = stats["buyer"]
+    assert purchase == TransactionStats(
+        unapproved=1,
+        approved=1,
+        paid=1,
+        delivered=1,
+        completed=1,
+        cancelled=1,
+        # The total, 10 + 40 * 0.5 + 30 + 20 (no rate, so taken as is), then the average
+        avg_price=80,
+        total_price=20,
+        total_count=4,
+        most_expensive_name="Rioja",
+        most_expensive_member=purchase.most_expensive_member,
+        most_expensive_price=40,
+    )
+    assert purchase.most_expensive_member.id == carol.id
+
+    sale = stats["seller"]
+    assert (sale.total_count, sale.paid, sale.unapproved) == (1, 1, 0)
+    assert (sale.avg_price, sale.total_price) == (50, 50)
+    assert sale.most_expensive_name == "Port"
+    assert sale.most_expensive_member.id == alice.id
+
+
+async def legacy_member_stats(member_id, role, session):
+    """The stats as StatsService built them before get_member_stats, a query at a time."""
+    role_column = Transaction.buyer_id if role == "buyer" else Transaction.seller_id
+    storage = TransactionStorage()
+    transactions = await storage.list_transactions(
+        role_column == member_id, session=session
+    )
+    if not transactions:
+        return None
+
+    counts = {
+        status: len(
+            await storage.list_transactions(
+                role_column == member_id, condition, session=session
+            )
+            or []
+        )
+        for status, condition in status_conditions(Transaction).items()
+    }
+    total = sum(transaction.gbp_price for transaction in transactions)
+    [most_expensive] = await storage.list_transactions(
+        role_column == member_id,
+        order_by=Transaction.price.desc(),
+        limit=1,
+        options=[selectinload(Transaction.seller)],
+        session=session,
+    )
+    return TransactionStats(
+        **counts,
+        avg_price=total,
+        total_price=total / len(transactions),
+        total_count=len(transactions),
+        most_expensive_name=most_expensive.wine,
+        most_expensive_member=most_expensive.seller,
+        most_expensive_price=most_expensive.price,
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_member_stats_matches_legacy_stats(session_factory, members):
+    alice, bob, carol = members
+    async with session_factory() as session:
+        # Ties with Rioja on price, but was added later
+        session.add(
+            Transaction(
+                wine="Rioja Reserva",
+                price=40,
+                seller_id=bob.id,
+                buyer_id=alice.id,
+                currency_code="GBP",
+                bot_id="",
+            )
+        )
+        await session.commit()
+
+        for member in members:
+            stats = await TransactionStorage().get_member_stats(
+                member.id, session=session
+            )
+            for role in ("buyer", "seller"):
+                assert stats.get(role) == await legacy_member_stats(
+                    member.id, role, session
+                )
+
+
+@pytest.mark.asyncio
+async def test_get_member_stats_without_counterparty(session_factory, members):
+    alice, bob, carol = members
+    async with session_factory() as session:
+        await session.execute(delete(Member).where(Member.id == carol.id))
+
+        stats = await TransactionStorage().get_member_stats(alice.id, session=session)
+
+    assert set(stats) == {"buyer", "seller"}
+    assert stats["buyer"].most_expensive_name == "Rioja"
+    assert stats["buyer"].most_expensive_member is None
+
+
+@pytest.mark.asyncio
+async def test_get_member_stats_without_transactions(session_factory, members):
+    async with session_factory() as session:
+        bob = members[1]
+        stats = await TransactionStorage().get_member_stats(bob.id, session=session)
+
+    assert set(stats) == {"seller"}
+    assert stats["seller"].total_count == 3
+
+
+@pytest.mark.asyncio
+async def test_get_server_stats(session_factory, members):
+    alice, bob, carol = members
+    async with session_factory() as session:
+        stats = await TransactionStorage().get_server_stats(session=session)
+
+    assert stats.total_count == 6
+    assert stats.total_value == 250
+    assert stats.avg_price == pytest.approx(250 / 6)
+    assert (stats.most_expensive_name, stats.most_expensive_value) == ("Sherry", 100)
+    # Carol and Bob have bought and sold two each, Carol first
+    assert [m.id for m in stats.top_buyers] == [alice.id, carol.id]
+    assert [m.id for m in stats.top_sellers] == [bob.id, carol.id, alice.id]
+
+
+@pytest.mark.asyncio
+async def test_get_server_stats_without_transactions(session_factory):
+    async with session_factory() as session:
+        assert await TransactionStorage().get_server_stats(session=session) is None
+
+
+@pytest.mark.asyncio
+async def test_gbp_price_matches_in_sql(session_factory, members):
+    async with session_factory() as session:
+        rows = (
+            await session.execute(
+                select(Transaction, Transaction.gbp_price).order_by(
+                    Transaction.gbp_price.desc()
+                )
+            )
+        ).all()
+        total = await session.scalar(select(func.sum(Transaction.gbp_price)))
+
+    assert [gbp_price for _, gbp_price in rows] == sorted(
+        (transaction.gbp_price for transaction, _ in rows), reverse=True
+    )
+    assert total == sum(transaction.gbp_price for transaction, _ in rows)
+
+
+@pytest.mark.asyncio
+async def test_add_transaction_snapshots_exchange_rate(session_factory, members):
+    alice, bob, _ = members
+    async with session_factory() as session:
+        transaction = await TransactionStorage().add_transaction(
+            Transaction(
+                wine="Zinfandel",
+                price=20,
+                seller_id=bob.id,
+                buyer_id=alice.id,
+                currency_code="USD",
+                bot_id="",
+            ),
+            session=session,
+        )
+
+    assert transaction.exchange_rate == 0.5
+    assert transaction.gbp_price == 10
+
+
+@pytest.mark.asyncio
+async def test_list_member_transaction_rows(db_engine, session_factory, members):
+    alice, bob, carol = members
+    async with session_factory() as session:
+        rioja = (
+            await TransactionStorage().list_transactions(
+                Transaction.wine == "Rioja", session=session
+            )
+        )[0]
+        for message_id in (100, 101):
+            session.add(
+                BotMessage(
+                    message_id=message_id,
+                    channel_id=2,
+                    guild_id=1,
+                    transaction_id=rioja.id,
+                )
+            )
+        await session.commit()
+
+    statements = []
+    event.listen(
+        db_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    async with session_factory() as session:
+        rows = await TransactionStorage().list_member_transaction_rows(
+            alice.id, session=session
+        )
+
+    assert len(statements) == 1
+    assert [(row.wine, row.role, row.status) for row in rows] == [
+        ("Claret", "buying", "awaiting_approval"),
+        ("Rioja", "buying", "awaiting_payment_and_delivery"),
+        ("Barolo", "buying", "completed"),
+        ("Chablis", "buying", "cancelled"),
+        ("Port", "selling", "awaiting_approval"),
+    ]
+    assert [row.other_party_discord_id for row in rows] == [2, 3, 2, 3, 3]
+    assert rows[1].symbol == "$"
+    assert rows[1].message_link == "https://discord.com/channels/1/2/101"
+    assert rows[0].message_link is None
+
+
+@pytest.mark.asyncio
+async def test_list_member_transaction_rows_keyset_pages(session_factory, members):
+    alice, bob, carol = members
+    storage = TransactionStorage()
+    async with session_factory() as session:
+        rows = await storage.list_member_transaction_rows(alice.id, session=session)
+
+        pages = []
+        after = None
+        while page := await storage.list_member_transaction_rows(
+            alice.id, after=after, limit=2, session=session
+        ):
+            pages.append([row.wine for row in page])
+            after = (page[-1].creation_date, page[-1].id)
+
+        before = await storage.list_member_transaction_rows(
+            alice.id,
+            before=(rows[-1].creation_date, rows[-1].id),
+            limit=2,
+            session=session,
+        )
+        sales = await storage.list_member_transaction_rows(
+            alice.id, Transaction.seller_id == alice.id, session=session
+        )
+
+    assert pages == [["Claret", "Rioja"], ["Barolo", "Chablis"], ["Port"]]
+    assert [row.wine for row in before] == ["Barolo", "Chablis"]
+    assert [(row.wine, row.role) for row in sales] == [("Port", "selling")]
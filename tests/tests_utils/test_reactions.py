@@ -0,0 +1,62 @@
+"""Tests covering ledger_bot.utils.reactions."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from ledger_bot.core.config import OutboundConfig
+from ledger_bot.outbound_scheduler import OutboundScheduler
+from ledger_bot.utils import add_reaction, remove_reaction
+
+
+@pytest.fixture
+def channel():
+    channel = MagicMock(id=10)
+    channel.fetch_message = AsyncMock()
+    message = channel.get_partial_message.return_value
+    message.channel = channel
+    message.add_reaction = AsyncMock()
+    message.clear_reaction = AsyncMock()
+    return channel
+
+
+@pytest.fixture
+def client(channel):
+    # No guilds, so finding the message any other way would fail
+    return SimpleNamespace(
+        outbound=OutboundScheduler(OutboundConfig()),
+        locate_message=AsyncMock(return_value=channel),
+        remember_message_location=MagicMock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_add_reaction_uses_partial_message(client, channel):
+    assert await add_reaction(client, 100, "⏳", channel_obj=channel)
+
+    channel.get_partial_message.assert_called_once_with(100)
+    channel.get_partial_message.return_value.add_reaction.assert_awaited_once_with("⏳")
+    channel.fetch_message.assert_not_awaited()
+    client.locate_message.assert_not_awaited()
+    client.remember_message_location.assert_called_once_with(100, 10)
+
+
+@pytest.mark.asyncio
+async def test_remove_reaction_locates_message(client, channel):
+    assert await remove_reaction(client, 100, "⏳")
+
+    client.locate_message.assert_awaited_once_with(100)
+    channel.get_partial_message.return_value.clear_reaction.assert_awaited_once_with(
+        "⏳"
+    )
+    channel.fetch_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unknown_message(client, channel):
+    client.locate_message.return_value = None
+
+    assert not await add_reaction(client, 100, "⏳")
+
+    channel.get_partial_message.assert_not_called()